@@ -0,0 +1,182 @@
+"""Measure how checking for new seasons scales with the watchlist size.
+
+For every watchlist size, a synthetic database is created through the
+Sql layer and all TV shows in it are checked against a local fake TMDB
+server, in a fresh interpreter. Run from the repository root:
+
+    python benchmarks/check_path.py --sizes 10 100 1000 10000 --latency 20
+"""
+
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import SUPPRESS, ArgumentParser, Namespace
+from pathlib import Path
+
+from fake_tmdb import FakeTmdbServer
+
+REPOSITORY: Path = Path(__file__).resolve().parent.parent
+# Series are written to the synthetic database in batches of this size.
+SEED_BATCH: int = 10_000
+
+
+def seed(size: int) -> None:
+    """Fill the database with ``size`` synthetic TV shows."""
+    from seasonwatch.sql import Sql, WatchlistEntry
+
+    Sql.ensure_table()
+    for start in range(0, size, SEED_BATCH):
+        with Sql.transaction() as cursor:
+            for id in range(start + 1, min(start + SEED_BATCH, size) + 1):
+                Sql.import_series(
+                    cursor,
+                    WatchlistEntry(id=str(id), title=f"Show {id}", last_season=id % 5),
+                )
+
+
+def worker(args: Namespace) -> None:
+    """Seed a database, check all of it and print the timings as JSON.
+
+    Runs in its own interpreter, with the environment pointing
+    Seasonwatch at a temporary data directory and the fake TMDB.
+    """
+    from seasonwatch.client import TmdbClient
+    from seasonwatch.constants import Lookup
+    from seasonwatch.exceptions import SeasonwatchException
+    from seasonwatch.media_watcher import MediaWatcher
+    from seasonwatch.sql import Sql
+    from seasonwatch.transport import Transport, TransportSettings
+
+    seed(args.worker)
+
+    # Time spent writing the results of the check to the database.
+    db_write_time = 0.0
+    update_many_series = Sql.update_many_series
+
+    def timed_update_many_series(*update_args: object, **kwargs: object) -> None:
+        nonlocal db_write_time
+        start = time.perf_counter()
+        update_many_series(*update_args, **kwargs)  # type: ignore[arg-type]
+        db_write_time += time.perf_counter() - start
+
+    Sql.update_many_series = timed_update_many_series  # type: ignore[method-assign]
+
+    transport = Transport.create(TransportSettings(pool_size=args.concurrency))
+    watcher = MediaWatcher()
+    error = None
+    start = time.perf_counter()
+    try:
+        watcher.check_for_new_seasons(
+            TmdbClient(transport, rate=args.rate or None),
+            concurrency=args.concurrency,
+            cache=None,
+            force=True,
+            lookup=Lookup(args.lookup),
+        )
+    except SeasonwatchException as e:
+        error = str(e)
+    wall_time = time.perf_counter() - start
+
+    print(
+        json.dumps(
+            {
+                "wall_time": wall_time,
+                "db_write_time": db_write_time,
+                # Kibibytes on Linux
+                "peak_rss": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                "results": watcher.report.count(),
+                "error": error,
+                "failed": watcher.report.count("failed"),
+            }
+        )
+    )
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 100, 1000, 10_000],
+        help="Watchlist sizes to measure, up to 100000 is reasonable",
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=20, help="Milliseconds")
+    parser.add_argument("--payload-size", type=int, default=10_000, help="Bytes")
+    parser.add_argument("--error-rate", type=float, default=0)
+    parser.add_argument(
+        "--rate", type=float, default=0, help="Requests per second, 0 for no limit"
+    )
+    parser.add_argument("--lookup", choices=["show", "season"], default="show")
+    # Used internally to run the measurement of one size
+    parser.add_argument("--worker", type=int, help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker is not None:
+        worker(args)
+        return 0
+
+    server = FakeTmdbServer(
+        latency=args.latency / 1000,
+        payload_size=args.payload_size,
+        error_rate=args.error_rate,
+    )
+    server.start()
+
+    print(
+        f"{'shows':>8}{'wall (s)':>10}{'req/s':>9}{'DB write (s)':>14}"
+        f"{'KiB/show':>10}{'peak RSS (MiB)':>16}  result"
+    )
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as data:
+            env = {
+                **os.environ,
+                "PYTHONPATH": str(REPOSITORY),
+                "XDG_DATA_HOME": data,
+                "SEASONWATCH_API_BASE_URL": server.base_url,
+            }
+            requests_before = server.requests
+            bytes_before = server.bytes_sent
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    __file__,
+                    "--worker",
+                    str(size),
+                    "--concurrency",
+                    str(args.concurrency),
+                    "--lookup",
+                    args.lookup,
+                    "--rate",
+                    str(args.rate),
+                ],
+                env=env,
+                stdout=subprocess.PIPE,
+                text=True,
+                check=True,
+            ).stdout
+            result = json.loads(output.splitlines()[-1])
+            requests = server.requests - requests_before
+            kib_per_show = (server.bytes_sent - bytes_before) / 1024 / size
+            outcome = result["error"] or "ok"
+            if result["failed"]:
+                outcome = f"{result['failed']} shows failed"
+            print(
+                f"{size:>8}{result['wall_time']:>10.2f}"
+                f"{requests / result['wall_time']:>9.0f}"
+                f"{result['db_write_time']:>14.3f}"
+                f"{kib_per_show:>10.1f}"
+                f"{result['peak_rss'] / 1024:>16.1f}"
+                f"  {outcome}"
+            )
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
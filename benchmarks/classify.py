@@ -0,0 +1,115 @@
+"""Compare categorizing air dates one by one with doing it in batches.
+
+The per-row path is the one checks used to take for every TV show:
+parse the air date with dateutil, get today's date, categorize it and
+format it with strftime for the database. The batch path parses ISO
+8601 dates directly, and categorizes a whole batch against a single
+reference date. Run from the repository root:
+
+    python benchmarks/classify.py --shows 100000
+"""
+
+import random
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable
+
+from dateutil.parser import parse
+
+REPOSITORY: Path = Path(__file__).resolve().parent.parent
+# Measure the Seasonwatch in the repository, even if another one is
+# installed.
+sys.path.insert(0, str(REPOSITORY))
+
+from seasonwatch.media_watcher import CLASSIFY_BATCH  # noqa: E402
+from seasonwatch.scheduler import Scheduler  # noqa: E402
+from seasonwatch.utils import Utils  # noqa: E402
+
+
+def air_dates(shows: int, seed: int = 0) -> list[str | None]:
+    """Return a mix of air dates like TMDB returns for a watchlist.
+
+    About a fifth have no air date, and the rest are spread from two
+    years ago to two years ahead.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    return [
+        None
+        if rng.random() < 0.2
+        else (today + timedelta(days=rng.randint(-730, 730))).isoformat()
+        for _ in range(shows)
+    ]
+
+
+def per_row(raw_dates: list[str | None]) -> list[str]:
+    categories = []
+    for raw in raw_dates:
+        today = date.today()
+        air_date = None if raw is None else parse(raw)
+        categories.append(
+            Scheduler.categorize(None if air_date is None else air_date.date(), today)
+        )
+        if air_date is not None:
+            air_date.strftime("%Y-%m-%d 00:00:00")
+    return categories
+
+
+def batched(raw_dates: list[str | None]) -> list[str]:
+    categories = []
+    today = date.today()
+    for start in range(0, len(raw_dates), CLASSIFY_BATCH):
+        parsed = [
+            None if raw is None else Scheduler.parse_air_date(raw)
+            for raw in raw_dates[start : start + CLASSIFY_BATCH]
+        ]
+        categories.extend(Scheduler.categorize_many(parsed, today))
+        for air_date in parsed:
+            if air_date is not None:
+                Utils.python_date_to_sql_date(air_date)
+    return categories
+
+
+def measure(
+    classify: Callable[[list[str | None]], list[str]],
+    raw_dates: list[str | None],
+    runs: int,
+) -> tuple[float, list[str]]:
+    """Return the median time of ``runs`` runs, and the categories."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        categories = classify(raw_dates)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), categories
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--shows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    raw_dates = air_dates(args.shows)
+    per_row_time, expected = measure(per_row, raw_dates, args.runs)
+    batched_time, categories = measure(batched, raw_dates, args.runs)
+    if categories != expected:
+        print("The batch path categorized differently!", file=sys.stderr)
+        return 1
+
+    print(f"{'path':>10}{'total (ms)':>12}{'per show (µs)':>15}")
+    for name, seconds in [("per row", per_row_time), ("batched", batched_time)]:
+        print(
+            f"{name:>10}{seconds * 1000:>12.1f}"
+            f"{seconds / args.shows * 1_000_000:>15.2f}"
+        )
+    print(f"Batched is {per_row_time / batched_time:.1f}x as fast.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
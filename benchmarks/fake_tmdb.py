@@ -0,0 +1,256 @@
+"""A local stand-in for the TMDB API, for benchmarking.
+
+Serves synthetic responses for the endpoints used by Seasonwatch, with a
+configurable latency, payload size and error rate. It can be used from
+other benchmarks or run on its own, for example:
+
+    python benchmarks/fake_tmdb.py --port 8000 --latency 50
+
+and then pointed at with SEASONWATCH_API_BASE_URL=http://127.0.0.1:8000.
+"""
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeTmdbServer(ThreadingHTTPServer):
+    """HTTP server answering like TMDB does, with synthetic data.
+
+    Every TV show has a number of seasons and air dates derived from its
+    ID, so the same database gives the same mix of new, soon, later and
+    nothing results on every run.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        payload_size: int = 0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Bind the server to localhost.
+
+        :param port: Port to listen on, or 0 for any free port.
+        :param latency: Seconds to wait before answering each request.
+        :param payload_size: Bytes of filler added to every TV show,
+            standing in for cast, networks, production companies etc.
+        :param error_rate: Fraction of requests answered with an error,
+            alternating between 429 and 503.
+        :param seed: Seed for choosing which requests fail.
+        """
+        super().__init__(("127.0.0.1", port), FakeTmdbHandler)
+        self.latency = latency
+        self.filler = "x" * payload_size
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.bytes_sent = 0
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> None:
+        """Serve requests from a background thread."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def should_fail(self) -> bool:
+        with self.lock:
+            self.requests += 1
+            fail = self.random.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return fail
+
+    def tv_show(self, id: int) -> dict[str, Any]:
+        """Return the details of a synthetic TV show."""
+        today = date.today()
+        seasons: list[dict[str, Any]] = []
+        for number in range(1, id % 7 + 2):
+            # Some of the last seasons are out, some are coming up and
+            # some don't have an air date yet.
+            offset = [-400, -30, 20, 60, 200, 800][(id + number) % 6]
+            air_date = today + timedelta(days=offset * number)
+            seasons.append(
+                {
+                    "air_date": None if id % 11 == 0 else air_date.isoformat(),
+                    "episode_count": 10,
+                    "id": id * 100 + number,
+                    "name": f"Season {number}",
+                    "overview": "",
+                    "season_number": number,
+                }
+            )
+        return {
+            "id": id,
+            "name": f"Show {id}",
+            "original_name": f"Show {id}",
+            "overview": self.filler,
+            "seasons": seasons,
+        }
+
+    def season(self, id: int, number: int) -> dict[str, Any] | None:
+        """Return the details of a season, or None if there is none."""
+        seasons = [
+            s for s in self.tv_show(id)["seasons"] if s["season_number"] == number
+        ]
+        if not seasons:
+            return None
+        episodes = [
+            {
+                "episode_number": episode,
+                "name": f"Episode {episode}",
+                # Stands in for the guest stars and crew of the episode.
+                "overview": self.filler[: len(self.filler) // 10],
+            }
+            for episode in range(1, 11)
+        ]
+        return {**seasons[0], "episodes": episodes}
+
+    def find(self, imdb_id: str) -> dict[str, Any]:
+        """Return the result of looking up an IMDb ID."""
+        id = int(imdb_id.lstrip("t") or 0)
+        return {
+            "tv_results": [{"id": id, "name": f"Show {id}", "original_name": ""}],
+        }
+
+    def search(self, query: str) -> dict[str, Any]:
+        """Return the TV shows among the first thousand matching ``query``."""
+        names = [f"Show {id}" for id in range(1, 1001)]
+        results = [
+            {
+                "id": int(name.split()[1]),
+                "name": name,
+                "original_name": name,
+                "first_air_date": "2020-01-01",
+            }
+            for name in names
+            if query.casefold() in name.casefold()
+        ][:20]
+        return {"results": results, "page": 1, "total_pages": 1}
+
+    def release_dates(self, id: int) -> dict[str, Any]:
+        """Return the releases of a synthetic movie in two countries."""
+        today = date.today()
+        offset = [-200, -40, 10, 50, 300][id % 5]
+        theatrical = today + timedelta(days=offset)
+        digital = theatrical + timedelta(days=45)
+        return {
+            "id": id,
+            "results": [
+                {
+                    "iso_3166_1": country,
+                    "release_dates": [
+                        {"type": 3, "release_date": f"{theatrical}T00:00:00.000Z"},
+                        {"type": 4, "release_date": f"{digital}T00:00:00.000Z"},
+                    ]
+                    if id % 7
+                    else [],
+                }
+                for country in ["US", "SE"]
+            ],
+        }
+
+    def changes(self, page: int) -> dict[str, Any]:
+        """Return a page of changed TV shows, every tenth ID."""
+        total_pages = 10
+        results = [
+            {"id": (page - 1) * 100 + i * 10, "adult": False} for i in range(100)
+        ]
+        return {"results": results, "page": page, "total_pages": total_pages}
+
+
+class FakeTmdbHandler(BaseHTTPRequestHandler):
+    server: FakeTmdbServer
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately, which would otherwise
+    # make every keep-alive response wait for a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        path = url.path.removeprefix("/3")
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        if self.server.should_fail():
+            status = 429 if self.server.errors % 2 else 503
+            self.send_json(status, {"status_message": "Fake failure"}, retry_after=1)
+            return
+
+        if match := re.fullmatch(r"/tv/(\d+)", path):
+            self.send_json(200, self.server.tv_show(int(match.group(1))))
+        elif match := re.fullmatch(r"/tv/(\d+)/season/(\d+)", path):
+            season = self.server.season(int(match.group(1)), int(match.group(2)))
+            if season is None:
+                self.send_json(404, {"status_message": "Not found"})
+            else:
+                self.send_json(200, season)
+        elif match := re.fullmatch(r"/find/(\w+)", path):
+            self.send_json(200, self.server.find(match.group(1)))
+        elif match := re.fullmatch(r"/movie/(\d+)/release_dates", path):
+            self.send_json(200, self.server.release_dates(int(match.group(1))))
+        elif path == "/search/tv":
+            query = parse_qs(url.query).get("query", [""])[0]
+            self.send_json(200, self.server.search(query))
+        elif path == "/tv/changes":
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            self.send_json(200, self.server.changes(page))
+        else:
+            self.send_json(404, {"status_message": "Not found"})
+
+    def send_json(
+        self, status: int, body: dict[str, Any], retry_after: int | None = None
+    ) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json;charset=utf-8")
+        self.send_header("Content-Length", str(len(content)))
+        if retry_after is not None:
+            self.send_header("Retry-After", str(retry_after))
+        self.end_headers()
+        self.wfile.write(content)
+        with self.server.lock:
+            self.server.bytes_sent += len(content)
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="Milliseconds")
+    parser.add_argument("--payload-size", type=int, default=0, help="Bytes")
+    parser.add_argument("--error-rate", type=float, default=0)
+    args = parser.parse_args()
+
+    server = FakeTmdbServer(
+        port=args.port,
+        latency=args.latency / 1000,
+        payload_size=args.payload_size,
+        error_rate=args.error_rate,
+    )
+    print(f"Serving fake TMDB on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Measure the cold-start latency of every Seasonwatch command.
+
+Every command is run in a fresh interpreter against a throwaway
+configuration and database, so nothing is cached between runs and no
+request is made to TMDB. Run from the repository root:
+
+    python benchmarks/startup.py [--runs N] [--imports N]
+"""
+
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+REPOSITORY: Path = Path(__file__).resolve().parent.parent
+
+# The TV show is scheduled far into the future, so that the check
+# command does everything except contacting TMDB.
+SEED = """
+from seasonwatch.constants import Source
+from seasonwatch.sql import Sql
+Sql.ensure_table()
+Sql.update_series(
+    "63639", "The Expanse", 3, 0, "1970-01-01 00:00:00",
+    "1970-01-01 00:00:00", Source.TMDB, next_check="2999-01-01 00:00:00",
+)
+"""
+
+RUN = """
+import sys
+from seasonwatch.app import main
+sys.argv = ["seasonwatch", *sys.argv[1:]]
+try:
+    main()
+except SystemExit:
+    pass
+"""
+
+COMMANDS: dict[str, list[str] | None] = {
+    "interpreter": None,
+    "--help": ["--help"],
+    "tv --list": ["tv", "--list"],
+    "check": [],
+}
+
+
+def run(arguments: list[str] | None, env: dict[str, str], *options: str) -> str:
+    """Run a command in a new interpreter and return what it wrote to stderr."""
+    code = "pass" if arguments is None else RUN
+    result = subprocess.run(
+        [sys.executable, *options, "-c", code, *(arguments or [])],
+        env=env,
+        cwd=REPOSITORY,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        check=True,
+    )
+    return result.stderr
+
+
+def slowest_imports(stderr: str, count: int) -> list[tuple[int, str]]:
+    """Return the top-level imports with the highest cumulative time."""
+    imports: list[tuple[int, str]] = []
+    for line in stderr.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line)
+        if match and len(match.group(2)) <= 1:
+            imports.append((int(match.group(1)), match.group(3)))
+    return sorted(imports, reverse=True)[:count]
+
+
+def main() -> int:
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command")
+    parser.add_argument(
+        "--imports",
+        type=int,
+        default=5,
+        help="Number of slowest imports to show per command",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config, tempfile.TemporaryDirectory() as data:
+        Path(config, "seasonwatchrc").write_text("[Tokens]\ntmdb_token = benchmark\n")
+        env = {
+            **os.environ,
+            "PYTHONPATH": str(REPOSITORY),
+            "XDG_CONFIG_HOME": config,
+            "XDG_DATA_HOME": data,
+        }
+        subprocess.run(
+            [sys.executable, "-c", SEED], env=env, cwd=REPOSITORY, check=True
+        )
+
+        print(f"{'command':<14}{'min (ms)':>10}{'median (ms)':>13}")
+        for name, arguments in COMMANDS.items():
+            timings: list[float] = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                run(arguments, env)
+                timings.append((time.perf_counter() - start) * 1000)
+            print(f"{name:<14}{min(timings):>10.1f}{statistics.median(timings):>13.1f}")
+            if arguments is not None and args.imports > 0:
+                stderr = run(arguments, env, "-X", "importtime")
+                for microseconds, module in slowest_imports(stderr, args.imports):
+                    print(f"    {module:<30}{microseconds / 1000:>8.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,27 @@
-import logging
 import sys
+from argparse import Namespace
 from configparser import ConfigParser
-
-import gi
-import requests
-from prettytable.prettytable import SINGLE_BORDER
-from requests import RequestException, Session
-from requests.exceptions import HTTPError
-
-gi.require_version("Notify", "0.7")
-
-from colorama import Fore, init
-from gi.repository import Notify
+from typing import TYPE_CHECKING
 
 from seasonwatch.cli import Cli
-from seasonwatch.config import Configure
 from seasonwatch.constants import Constants
-from seasonwatch.exceptions import SeasonwatchException
-from seasonwatch.media_watcher import MediaWatcher
-from seasonwatch.sql import Sql
+from seasonwatch.exceptions import ConfigException
 
-init(autoreset=True)
+if TYPE_CHECKING:
+    from seasonwatch.client import TmdbClient
 
+# Only what every command needs is imported at the top. Each command
+# imports the rest itself, so that for example listing the TV shows
+# doesn't have to load requests or GObject introspection.
 
-def main() -> int:
-    Sql.backup_database()
-    Sql.ensure_table()
 
+def read_config() -> ConfigParser:
+    """Read the configuration file, creating it if needed."""
     if not Constants.CONFIG_DIRECTORY.exists():
         Constants.CONFIG_DIRECTORY.mkdir(parents=True, exist_ok=True)
     if not (Constants.CONFIG_PATH).exists():
         (Constants.CONFIG_PATH).touch()
 
-    args = Cli.parse()
-
     config = ConfigParser()
     config.read(Constants.CONFIG_PATH)
     if not config.has_section("Tokens"):
@@ -41,6 +29,119 @@ def main() -> int:
         # Appending should preserve comments that the user has written.
         with open(Constants.CONFIG_PATH, mode="a") as fp:
             config.write(fp)
+    return config
+
+
+def main() -> int:
+    args = Cli.parse()
+    if args.profile is None and args.cprofile is None:
+        return run(args)
+    return profile(args)
+
+
+def profile(args: Namespace) -> int:
+    """Run the command while recording timings of its phases."""
+    import cProfile
+
+    from seasonwatch.profiling import Profiler
+
+    profiler = cProfile.Profile() if args.cprofile is not None else None
+    Profiler.enable()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        with Profiler.span("main", command=args.subparser_name or "check"):
+            return run(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+        if args.profile is not None:
+            Profiler.write(args.profile)
+
+
+def run(args: Namespace) -> int:
+    """Run the command given on the command line."""
+    if args.subparser_name == "report" or (
+        args.subparser_name is None and args.offline
+    ):
+        # Answers from the database alone, so should be as quick as it
+        # gets: no configuration, backup or TMDB token needed.
+        return report()
+
+    if args.subparser_name is None:
+        return locked_check(args)
+    return command(args)
+
+
+def locked_check(args: Namespace) -> int:
+    """Check for new seasons, unless another check is already running.
+
+    A check started while another one is running, for example by cron
+    when a check takes longer than the interval, waits for that check
+    and prints what it found instead of doing the same work again, or
+    exits right away with ``--if-running exit``.
+    """
+    from seasonwatch.lock import RunLock
+    from seasonwatch.profiling import Profiler
+
+    lock = RunLock()
+    if not lock.acquire(wait=False):
+        holder = lock.holder()
+        running = "A check" if holder is None else f"A check (PID {holder})"
+        if args.if_running == "exit":
+            print(f"{running} is already running, not starting another.")
+            return 0
+        print(f"{running} is already running, waiting for it to finish...")
+        with Profiler.span("wait for lock"):
+            lock.acquire()
+        if lock.crashed is None:
+            lock.release()
+            return report()
+    if lock.crashed is not None:
+        print(
+            f"The last check (PID {lock.crashed}) didn't finish, checking again.",
+            file=sys.stderr,
+        )
+    try:
+        return command(args)
+    finally:
+        lock.release()
+
+
+def command(args: Namespace) -> int:
+    """Run a command that needs the configuration file."""
+    from seasonwatch.profiling import Profiler
+
+    with Profiler.span("read config"):
+        config = read_config()
+
+    from seasonwatch.sql import Sql
+
+    # Only commands that change the database need a backup first.
+    writes = args.subparser_name in [None, "migrate"] or (
+        args.subparser_name == "tv"
+        and (
+            args.add is not None
+            or args.remove is not None
+            or args.step_up is not None
+            or args.import_file
+        )
+        or (args.subparser_name == "movie" and (args.add or args.remove))
+    )
+    if writes:
+        from seasonwatch.backup import Backup
+
+        try:
+            with Profiler.span("backup"):
+                Backup.backup_from_config(config)
+        except ConfigException as e:
+            return invalid_config(e)
+    # Commands that only read the database leave migrating it to the
+    # others, so that they never wait for a check writing to it. The
+    # team command only migrates the databases it checks.
+    if writes or args.subparser_name == "daemon":
+        Sql.ensure_table()
 
     tmdb_token: str | None = config.get("Tokens", "tmdb_token", fallback=None)
     if tmdb_token is None and args.subparser_name != "configure":
@@ -48,92 +149,329 @@ def main() -> int:
         sys.exit(1)
 
     if args.subparser_name == "configure":
-        new_tmdb_token = input("TMDB API Read Access Token: ")
-        print("Testing token...")
-        url = f"{Constants.API_BASE_URL}/movie/11"
-        try:
-            requests.get(
-                url,
-                headers={
-                    "accept": "application/json",
-                    "Authorization": f"Bearer {new_tmdb_token}",
-                },
-            ).raise_for_status()
-        except HTTPError as e:
-            if e.response is not None and e.response.status_code == 401:
-                print("Invalid token. Please correct it.", file=sys.stderr)
-            else:
-                print(f"Error testing token: '{e}'", file=sys.stderr)
-            sys.exit(1)
-        except RequestException as e:
-            print(f"There was an error fetching {url}: {e}")
-            sys.exit(1)
-        print("Token is valid!")
-        config.set(section="Tokens", option="tmdb_token", value=new_tmdb_token)
-        overwrite_config = input("Write new config file, losing all comments? (Y/n): ")
-        if overwrite_config == "n" or overwrite_config == "N":
-            print(
-                f"Please manually update '{Constants.CONFIG_PATH}' with 'tmdb_token' "
-                "under [Tokens]"
-            )
-            sys.exit(0)
-        with open(Constants.CONFIG_PATH, mode="w") as fp:
-            config.write(fp)
-        print("Successfully set TMDB token!")
-        sys.exit(0)
+        return configure(config)
 
-    if args.subparser_name == "tv":
-        if args.add:
-            Configure.add_series()
-        if args.remove:
-            Configure.remove_series()
-        if args.step_up:
-            Configure.step_up_series()
-        if args.list_shows:
-            table = Sql.get_printable_series_table()
-            table.set_style(SINGLE_BORDER)
-            table.align = "l"
-            print(table)
-        return 0
-
-    Notify.init("Seasonwatch")
-    watcher = MediaWatcher()
-
-    tmdb_session = Session()
-    tmdb_session.headers.update(
-        {
-            "accept": "application/json",
-            "Authorization": f"Bearer {tmdb_token}",
-        }
+    try:
+        if args.subparser_name == "tv":
+            return tv(args, config)
+
+        if args.subparser_name == "movie":
+            return movie(args, config)
+
+        if args.subparser_name == "daemon":
+            return daemon(args, config)
+
+        if args.subparser_name == "migrate":
+            return migrate(args, config)
+
+        if args.subparser_name == "team":
+            return team(args, config)
+
+        return check(args, config)
+    except ConfigException as e:
+        return invalid_config(e)
+
+
+def invalid_config(error: ConfigException) -> int:
+    """Tell the user that the configuration file is invalid.
+
+    :return: Exit code for the command.
+    """
+    print(
+        f"Invalid configuration in '{Constants.CONFIG_PATH}': {error}", file=sys.stderr
     )
+    return 1
+
+
+def report() -> int:
+    """Print what the last checks found about every TV show."""
+    from datetime import date
+
+    from seasonwatch.report import Report
+    from seasonwatch.scheduler import Scheduler
 
+    # Only read, since the configuration file isn't needed otherwise.
+    config = ConfigParser()
+    config.read(Constants.CONFIG_PATH)
     try:
-        watcher.check_for_new_seasons(session=tmdb_session)
-    except SeasonwatchException as e:
-        logging.error(
-            f"Seasonwatch encountered an error when checking for new seasons: {e}"
+        soon_window = Scheduler.soon_window_from_config(config)
+    except ConfigException as e:
+        return invalid_config(e)
+    if not database_ready():
+        return 1
+    with Report.from_database(date.today(), soon_window) as lines:
+        Report.show(lines)
+    return 0
+
+
+def database_ready() -> bool:
+    """Return whether the database can be read, telling the user if not.
+
+    Commands that only read the database don't set it up or migrate it.
+    """
+    from seasonwatch.sql import Sql
+
+    if Sql.schema_current():
+        return True
+    print(
+        "The database hasn't been set up for this version of Seasonwatch yet. "
+        "Run 'seasonwatch' to set it up.",
+        file=sys.stderr,
+    )
+    return False
+
+
+def configure(config: ConfigParser) -> int:
+    """Interactively set and test the TMDB token."""
+    from seasonwatch.exceptions import HttpException, TransportException
+    from seasonwatch.transport import Transport, TransportSettings
+
+    new_tmdb_token = input("TMDB API Read Access Token: ")
+    print("Testing token...")
+    url = f"{Constants.API_BASE_URL}/movie/11"
+    try:
+        transport = Transport.create(TransportSettings.from_config(config, 1))
+    except ConfigException as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    try:
+        transport.get(
+            url,
+            headers={
+                "accept": "application/json",
+                "Authorization": f"Bearer {new_tmdb_token}",
+            },
+        ).raise_for_status()
+    except HttpException as e:
+        if e.status_code == 401:
+            print("Invalid token. Please correct it.", file=sys.stderr)
+        else:
+            print(f"Error testing token: '{e}'", file=sys.stderr)
+        sys.exit(1)
+    except TransportException as e:
+        print(e)
+        sys.exit(1)
+    finally:
+        transport.close()
+    print("Token is valid!")
+    config.set(section="Tokens", option="tmdb_token", value=new_tmdb_token)
+    overwrite_config = input("Write new config file, losing all comments? (Y/n): ")
+    if overwrite_config == "n" or overwrite_config == "N":
+        print(
+            f"Please manually update '{Constants.CONFIG_PATH}' with 'tmdb_token' "
+            "under [Tokens]"
         )
+        sys.exit(0)
+    with open(Constants.CONFIG_PATH, mode="w") as fp:
+        config.write(fp)
+    print("Successfully set TMDB token!")
+    sys.exit(0)
+
+
+def tv(args: Namespace, config: ConfigParser) -> int:
+    """Add, remove, step up, list, import or export TV shows.
+
+    Also lists the TV shows with a season airing soon.
+
+    :raises ConfigException: If the schedule settings are invalid.
+    """
+    from seasonwatch.config import Configure
+    from seasonwatch.exceptions import SeasonwatchException
+    from seasonwatch.scheduler import Scheduler
+    from seasonwatch.sql import Sql
+    from seasonwatch.transfer import Transfer
+
+    exit_code = 0
+    if args.import_file is not None:
+        try:
+            result = Transfer.import_watchlist(args.import_file)
+        except SeasonwatchException as e:
+            print(f"Nothing was imported: {e}", file=sys.stderr)
+            return 1
+        print(f"Imported {result.imported} TV shows from '{args.import_file}'.")
+        if result.errors:
+            print(f"Skipped {len(result.errors)} invalid rows:", file=sys.stderr)
+            for line, message in result.errors:
+                print(f"  line {line}: {message}", file=sys.stderr)
+            exit_code = 1
+    if args.export_file is not None:
+        if not database_ready():
+            return 1
+        try:
+            exported = Transfer.export_watchlist(args.export_file)
+        except SeasonwatchException as e:
+            print(f"Couldn't export the TV shows: {e}", file=sys.stderr)
+            return 1
+        print(f"Exported {exported} TV shows to '{args.export_file}'.")
+    if args.add == "":
+        try:
+            Configure.add_series()
+        except SeasonwatchException as e:
+            print(f"Data was not saved: {e}", file=sys.stderr)
+            exit_code = 1
+    elif args.add is not None:
+        from seasonwatch.runner import Runner
+
+        runners: list[Runner] = []
+
+        def client() -> "TmdbClient":
+            # Only set up when TMDB has to be searched.
+            runners.append(Runner(args, config))
+            return runners[-1].client
+
+        try:
+            Configure.add_found_series(args.add, client)
+        except SeasonwatchException as e:
+            print(f"Couldn't add '{args.add}': {e}", file=sys.stderr)
+            exit_code = 1
+        finally:
+            for runner in runners:
+                runner.close()
+    if args.remove is not None:
+        Configure.remove_series(args.remove or None)
+    if args.step_up is not None:
+        Configure.step_up_series(args.step_up or None)
+    if (args.list_shows or args.upcoming is not None) and not database_ready():
         return 1
+    if args.list_shows:
+        from prettytable.prettytable import SINGLE_BORDER
+
+        table = Sql.get_printable_series_table(
+            Scheduler.soon_window_from_config(config)
+        )
+        table.set_style(SINGLE_BORDER)
+        table.align = "l"
+        print(table)
+    if args.upcoming is not None:
+        from prettytable.prettytable import SINGLE_BORDER
 
-    for title, message in watcher.series["new"].items():
-        print(Fore.BLUE + message)
-        notification = Notify.Notification.new(title, message)
-        notification.set_timeout(10000)
-        notification.show()
+        table = Sql.get_printable_upcoming_table(args.upcoming)
+        table.set_style(SINGLE_BORDER)
+        table.align = "l"
+        print(table)
+    return exit_code
 
-    for title, message in watcher.series["soon"].items():
-        print(Fore.GREEN + message)
-        notification = Notify.Notification.new(title, message)
-        notification.show()
 
-    for title, message in watcher.series["later"].items():
-        print(message)
+def movie(args: Namespace, config: ConfigParser) -> int:
+    """Add, remove or list movies.
 
-    for title, message in watcher.series["nothing"].items():
-        print(message)
+    :raises ConfigException: If the schedule settings are invalid.
+    """
+    from seasonwatch.config import Configure
+    from seasonwatch.exceptions import SeasonwatchException
+    from seasonwatch.scheduler import Scheduler
+    from seasonwatch.sql import Sql
 
+    if args.add:
+        try:
+            Configure.add_movie()
+        except SeasonwatchException as e:
+            print(f"Couldn't add the movie: {e}", file=sys.stderr)
+            return 1
+    if args.remove:
+        Configure.remove_movies()
+    if args.list_movies:
+        from prettytable.prettytable import SINGLE_BORDER
+
+        if not database_ready():
+            return 1
+
+        table = Sql.get_printable_movies_table(
+            Scheduler.soon_window_from_config(config)
+        )
+        table.set_style(SINGLE_BORDER)
+        table.align = "l"
+        print(table)
     return 0
 
 
+def check(args: Namespace, config: ConfigParser) -> int:
+    """Check for new seasons and movie releases and report them."""
+    from seasonwatch.runner import Runner
+
+    runner = Runner(args, config)
+    try:
+        return runner.run()
+    finally:
+        runner.close()
+
+
+def team(args: Namespace, config: ConfigParser) -> int:
+    """Check the watchlists in several databases at once."""
+    from seasonwatch.backup import BackupSettings
+    from seasonwatch.exceptions import SeasonwatchException
+    from seasonwatch.runner import Runner
+    from seasonwatch.team import Team
+
+    if args.delta:
+        print("--delta can't be used with 'team'", file=sys.stderr)
+        return 1
+    try:
+        databases = Team.find_databases(args.databases)
+    except SeasonwatchException as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    runner = Runner(args, config)
+    try:
+        return Team(
+            databases,
+            runner.client,
+            concurrency=args.concurrency,
+            cache=runner.cache,
+            lookup=args.lookup,
+            soon_window=runner.soon_window,
+            backup=BackupSettings.from_config(config),
+        ).run(force=args.force)
+    finally:
+        runner.close()
+
+
+def migrate(args: Namespace, config: ConfigParser) -> int:
+    """Move the TV shows with IMDb IDs to TMDB."""
+    from seasonwatch.migration import Migrator
+    from seasonwatch.runner import Runner
+
+    runner = Runner(args, config)
+    try:
+        result = Migrator(runner.client, args.concurrency).run()
+    finally:
+        runner.close()
+
+    for title in result.migrated:
+        print(f"Successfully migrated series '{title}' from IMDb to TMDB")
+    for title, error in result.failed.items():
+        print(f"Couldn't look up '{title}' on TMDB: {error}", file=sys.stderr)
+    if result.pending or result.unmatched:
+        print(
+            f"{len(result.pending)} TV shows need to be reviewed, and TMDB found "
+            f"nothing for {len(result.unmatched)}."
+        )
+        if args.review:
+            print("")
+            Migrator.review()
+        else:
+            print("Run 'seasonwatch migrate --review' to move them.")
+    elif not result.failed:
+        print("All TV shows use TMDB IDs.")
+    return 1 if result.failed else 0
+
+
+def daemon(args: Namespace, config: ConfigParser) -> int:
+    """Check for new seasons on a schedule until stopped."""
+    import logging
+    from datetime import timedelta
+
+    from seasonwatch.daemon import Daemon
+    from seasonwatch.runner import Runner
+
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    return Daemon(
+        Runner(args, config),
+        interval=timedelta(minutes=args.interval),
+        read_config=read_config,
+    ).run()
+
+
 if __name__ == "__main__":
     sys.exit(main())
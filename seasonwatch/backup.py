@@ -0,0 +1,207 @@
+import gzip
+import os
+import re
+import shutil
+from configparser import ConfigParser
+from datetime import datetime
+from pathlib import Path
+from typing import Final, NamedTuple
+
+import apsw
+
+from seasonwatch.exceptions import ConfigException
+from seasonwatch.sql import Sql
+from seasonwatch.utils import Utils
+
+# Start of the names of both current backups, which record the data
+# version they were taken at, and the plain copies made by earlier
+# versions of Seasonwatch. The name of the database file follows.
+BACKUP_PREFIX: Final[str] = (
+    r"^(?P<timestamp>\d{4}-\d{2}-\d{2}_\d{2}-\d{2}-\d{2})" r"(?:_v(?P<version>\d+))?"
+)
+TIMESTAMP_FORMAT: Final[str] = "%Y-%m-%d_%H-%M-%S"
+# Number of pages copied per step of the online backup.
+PAGES_PER_STEP: Final[int] = 256
+
+
+class RetentionPolicy(NamedTuple):
+    """How many backups to keep per period.
+
+    The newest backup of each of the last ``hourly`` hours, ``daily``
+    days and ``weekly`` weeks that have any backups is kept. The newest
+    backup overall is always kept.
+    """
+
+    hourly: int = 24
+    daily: int = 7
+    weekly: int = 4
+
+    @classmethod
+    def from_config(cls, config: ConfigParser) -> "RetentionPolicy":
+        """Read the policy from the [Backup] section of ``config``.
+
+        :raises ConfigException: If a count is not a whole number of at
+            least 0.
+        """
+        default = cls()
+        try:
+            policy = cls(
+                hourly=config.getint("Backup", "hourly", fallback=default.hourly),
+                daily=config.getint("Backup", "daily", fallback=default.daily),
+                weekly=config.getint("Backup", "weekly", fallback=default.weekly),
+            )
+        except ValueError as e:
+            raise ConfigException(f"Invalid setting in [Backup]: {e}")
+        for period, count in policy._asdict().items():
+            if count < 0:
+                raise ConfigException(
+                    f"Invalid setting in [Backup]: {period} can't be negative: {count}"
+                )
+        return policy
+
+
+class BackupSettings(NamedTuple):
+    """How backups are taken, as set in the [Backup] section."""
+
+    compress: bool = False
+    policy: RetentionPolicy = RetentionPolicy()
+
+    @classmethod
+    def from_config(cls, config: ConfigParser) -> "BackupSettings":
+        """Read the settings from the [Backup] section of ``config``.
+
+        :raises ConfigException: If a setting is not a valid value.
+        """
+        try:
+            compress = config.getboolean("Backup", "compress", fallback=False)
+        except ValueError as e:
+            raise ConfigException(f"Invalid setting in [Backup]: {e}")
+        return cls(compress=compress, policy=RetentionPolicy.from_config(config))
+
+
+class BackupFile(NamedTuple):
+    path: Path
+    taken_at: datetime
+    version: int | None
+
+
+class Backup:
+    """Snapshots of the Seasonwatch database.
+
+    Backups are taken of the database in use, and kept next to it.
+    """
+
+    @staticmethod
+    def list_backups() -> list[BackupFile]:
+        """Return all backups of the database in use, newest first."""
+        database = Sql.database_path()
+        pattern = re.compile(
+            rf"{BACKUP_PREFIX}_{re.escape(database.name)}(?P<gzip>\.gz)?$"
+        )
+        backups: list[BackupFile] = []
+        for file in os.listdir(database.parent):
+            match = pattern.match(file)
+            if match is None:
+                continue
+            version = match.group("version")
+            backups.append(
+                BackupFile(
+                    path=database.parent / file,
+                    taken_at=datetime.strptime(
+                        match.group("timestamp"), TIMESTAMP_FORMAT
+                    ),
+                    version=None if version is None else int(version),
+                )
+            )
+        # Backups taken within the same second are told apart by version
+        backups.sort(
+            key=lambda backup: (backup.taken_at, backup.version or 0), reverse=True
+        )
+        return backups
+
+    @staticmethod
+    def backup_database(
+        compress: bool = False,
+        policy: RetentionPolicy = RetentionPolicy(),
+    ) -> Path | None:
+        """Snapshot the database in use if it has changed.
+
+        A snapshot is only taken if the data version of the database
+        differs from the one of the newest backup. The snapshot is made
+        with the online backup API of SQLite, so it is consistent even
+        if the database is being written to. Afterwards, backups that
+        are not covered by ``policy`` are removed.
+
+        :param compress: Compress the snapshot with gzip.
+        :param policy: Which backups to keep.
+        :return: The path to the new backup, if one was taken.
+        """
+        database = Sql.database_path()
+        if not database.exists():
+            # Nothing to backup if the database doesn't exist
+            return None
+
+        version = Sql.data_version()
+        backups = Backup.list_backups()
+        if version is not None and backups and backups[0].version == version:
+            return None
+
+        name = Utils.timestamp()
+        if version is not None:
+            name += f"_v{version}"
+        backup_path = database.parent / f"{name}_{database.name}"
+        partial_path = backup_path.with_name(backup_path.name + ".partial")
+
+        destination = apsw.Connection(str(partial_path))
+        try:
+            with destination.backup("main", Sql.connection(), "main") as backup:
+                while not backup.done:
+                    backup.step(PAGES_PER_STEP)
+        finally:
+            destination.close()
+
+        if compress:
+            backup_path = backup_path.with_name(backup_path.name + ".gz")
+            with open(partial_path, "rb") as source, gzip.open(
+                backup_path, "wb"
+            ) as target:
+                shutil.copyfileobj(source, target)
+            partial_path.unlink()
+        else:
+            partial_path.rename(backup_path)
+
+        Backup.remove_old_backups(policy)
+        return backup_path
+
+    @staticmethod
+    def backup_from_config(config: ConfigParser) -> Path | None:
+        """Snapshot the database with the settings in ``config``.
+
+        :raises ConfigException: If a setting is not a valid value.
+        """
+        settings = BackupSettings.from_config(config)
+        return Backup.backup_database(settings.compress, settings.policy)
+
+    @staticmethod
+    def remove_old_backups(policy: RetentionPolicy) -> None:
+        """Remove the backups that ``policy`` doesn't keep."""
+        backups = Backup.list_backups()
+        keep: set[Path] = {backups[0].path} if backups else set()
+        for count, period_format in [
+            (policy.hourly, "%Y-%m-%d %H"),
+            (policy.daily, "%Y-%m-%d"),
+            (policy.weekly, "%G-%V"),
+        ]:
+            periods: set[str] = set()
+            for backup in backups:
+                period = backup.taken_at.strftime(period_format)
+                if period in periods:
+                    continue
+                if len(periods) == count:
+                    break
+                periods.add(period)
+                keep.add(backup.path)
+
+        for backup in backups:
+            if backup.path not in keep:
+                backup.path.unlink()
@@ -0,0 +1,266 @@
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Final, NamedTuple
+
+from seasonwatch.sql import DATA_DIRECTORY, Sql
+
+if TYPE_CHECKING:
+    from seasonwatch.client import TmdbClient
+    from seasonwatch.transport import HttpResponse
+
+CACHE_FILE: Final[str] = "cache.sqlite"
+CACHE_PATH: Final[str] = str(DATA_DIRECTORY / CACHE_FILE)
+CACHE_TABLE: Final[str] = "responses"
+
+# Used when TMDB doesn't say for how long a response stays fresh.
+DEFAULT_MAX_AGE: Final[int] = 6 * 60 * 60
+# Responses that haven't been validated for this long are evicted.
+MAX_ENTRY_AGE: Final[int] = 30 * 24 * 60 * 60
+MAX_SIZE: Final[int] = 64 * 1024 * 1024
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+
+class ResponseCache:
+    """Persistent cache of HTTP responses from TMDB.
+
+    Responses are stored in an SQLite database next to the Seasonwatch
+    database, together with the validators (ETag and Last-Modified)
+    returned by TMDB. A response is reused without contacting TMDB as
+    long as it is fresh according to its Cache-Control max-age. After
+    that a conditional request is made, so that an unchanged resource
+    only costs a "304 Not Modified".
+
+    Old responses are only removed by ``evict``, which is meant to be
+    called once per check, so that a cache kept open between checks,
+    like by the daemon, keeps within its size too.
+
+    The cache can be shared by several threads.
+    """
+
+    def __init__(
+        self,
+        path: str = CACHE_PATH,
+        max_age: int = DEFAULT_MAX_AGE,
+        max_size: int = MAX_SIZE,
+        max_entry_age: int = MAX_ENTRY_AGE,
+    ) -> None:
+        """Open the cache, creating it if needed.
+
+        :param path: Path to the SQLite database holding the cache.
+        :param max_age: Seconds a response is considered fresh when the
+            response doesn't include a max-age.
+        :param max_size: Total size in bytes of the stored bodies above
+            which the least recently validated responses are evicted.
+        :param max_entry_age: Seconds after the last validation when a
+            response is evicted.
+        """
+        self.max_age = max_age
+        self.max_size = max_size
+        self.max_entry_age = max_entry_age
+        self._lock = threading.Lock()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection = Sql.open(path)
+        cursor = self._connection.cursor()
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CACHE_TABLE} (
+                url TEXT NOT NULL PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                cache_control TEXT,
+                validated_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+
+    def close(self) -> None:
+        """Close the connection to the cache database."""
+        with self._lock:
+            self._connection.close()
+
+    def lookup(self, url: str) -> CachedResponse | None:
+        """Return the stored response for ``url``, fresh or not."""
+        with self._lock:
+            row = self._connection.execute(
+                f"""
+                SELECT body, etag, last_modified, expires_at
+                FROM {CACHE_TABLE}
+                WHERE url = ?;
+                """,
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        body, etag, last_modified, expires_at = row
+        return CachedResponse(bytes(body), etag, last_modified, expires_at)
+
+    def store(self, url: str, response: "HttpResponse") -> None:
+        """Save a successful response, unless it forbids storing."""
+        cache_control = response.headers.get("Cache-Control")
+        directives = self._parse_cache_control(cache_control)
+        if "no-store" in directives:
+            return
+        now = time.time()
+        body = response.content
+        with self._lock:
+            self._connection.execute(
+                f"""
+                INSERT OR REPLACE INTO {CACHE_TABLE} (
+                    url,
+                    body,
+                    size,
+                    etag,
+                    last_modified,
+                    cache_control,
+                    validated_at,
+                    expires_at
+                )
+                VALUES(?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                (
+                    url,
+                    body,
+                    len(body),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    cache_control,
+                    now,
+                    now + self._freshness_lifetime(directives),
+                ),
+            )
+
+    def refresh(self, url: str, response: "HttpResponse") -> None:
+        """Mark a stored response as fresh again after a 304 response.
+
+        Validators and caching directives sent with the "Not Modified"
+        response replace the stored ones.
+        """
+        cache_control = response.headers.get("Cache-Control")
+        directives = self._parse_cache_control(cache_control)
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                f"""
+                UPDATE {CACHE_TABLE}
+                SET etag = COALESCE(?, etag),
+                    last_modified = COALESCE(?, last_modified),
+                    cache_control = COALESCE(?, cache_control),
+                    validated_at = ?,
+                    expires_at = ?
+                WHERE url = ?;
+                """,
+                (
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    cache_control,
+                    now,
+                    now + self._freshness_lifetime(directives),
+                    url,
+                ),
+            )
+
+    def fetch(self, client: "TmdbClient", url: str, revalidate: bool = False) -> bytes:
+        """Get the body of ``url``, using the cache when possible.
+
+        A fresh cached response is returned without any request. A stale
+        one is revalidated with a conditional request, and anything else
+        is downloaded and stored.
+
+        :param client: Client used for requests that need to be made.
+        :param url: URL to get.
+        :param revalidate: Revalidate a cached response even if it is
+            fresh, for example since TMDB reported that it has changed.
+        :raises TmdbException: If TMDB can't be reached.
+        :raises HttpException: If TMDB responds with an error status.
+        :return: The body of the response.
+        """
+        cached = self.lookup(url)
+        if cached is not None and not revalidate and cached.expires_at > time.time():
+            return cached.body
+
+        headers: dict[str, str] = {}
+        if cached is not None:
+            if cached.etag is not None:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified is not None:
+                headers["If-Modified-Since"] = cached.last_modified
+
+        response = client.get(url, headers=headers)
+        if cached is not None and response.status_code == 304:
+            self.refresh(url, response)
+            return cached.body
+
+        response.raise_for_status()
+        self.store(url, response)
+        return response.content
+
+    def evict(self) -> None:
+        """Remove responses that are too old or don't fit in the cache.
+
+        Responses not validated within ``max_entry_age`` are always
+        removed. If the remaining bodies are larger than ``max_size`` in
+        total, the least recently validated responses are removed until
+        the rest fits.
+        """
+        with self._lock:
+            cursor = self._connection.cursor()
+            cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+            cursor.execute(
+                f"""
+                DELETE FROM {CACHE_TABLE}
+                WHERE validated_at < ?;
+                """,
+                (time.time() - self.max_entry_age,),
+            )
+            cursor.execute(
+                f"""
+                DELETE FROM {CACHE_TABLE}
+                WHERE url IN (
+                    SELECT url FROM (
+                        SELECT
+                            url,
+                            SUM(size) OVER (ORDER BY validated_at DESC, url)
+                                AS total_size
+                        FROM {CACHE_TABLE}
+                    )
+                    WHERE total_size > ?
+                );
+                """,
+                (self.max_size,),
+            )
+            cursor.execute("COMMIT TRANSACTION")
+
+    def _freshness_lifetime(self, directives: dict[str, str | None]) -> int:
+        """Return for how many seconds a response is fresh."""
+        if "no-cache" in directives:
+            return 0
+        max_age = directives.get("max-age")
+        if max_age is not None:
+            try:
+                return max(int(max_age), 0)
+            except ValueError:
+                pass
+        return self.max_age
+
+    @staticmethod
+    def _parse_cache_control(cache_control: str | None) -> dict[str, str | None]:
+        """Split a Cache-Control header into its directives."""
+        directives: dict[str, str | None] = {}
+        if not cache_control:
+            return directives
+        for directive in cache_control.split(","):
+            name, _, value = directive.strip().partition("=")
+            if name:
+                directives[name.lower()] = value.strip('"') if value else None
+        return directives
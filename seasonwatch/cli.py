@@ -1,7 +1,21 @@
-from argparse import ArgumentParser, Namespace
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from pathlib import Path
+
+from seasonwatch.constants import Constants, Lookup
 
 
 class Cli:
+    @staticmethod
+    def positive_int(value: str) -> int:
+        """Parse a command line value as an integer larger than zero."""
+        try:
+            number = int(value)
+        except ValueError:
+            raise ArgumentTypeError(f"'{value}' is not an integer")
+        if number < 1:
+            raise ArgumentTypeError(f"'{value}' must be larger than zero")
+        return number
+
     @staticmethod
     def parse() -> Namespace:
         """
@@ -9,6 +23,106 @@ class Cli:
         """
         parser = ArgumentParser(prog="Seasonwatch")
 
+        parser.add_argument(
+            "-c",
+            "--concurrency",
+            help=(
+                "Number of TV shows to look up on TMDB at the same time when "
+                f"checking for new seasons (default: {Constants.DEFAULT_CONCURRENCY})"
+            ),
+            type=Cli.positive_int,
+            default=Constants.DEFAULT_CONCURRENCY,
+            metavar="N",
+            dest="concurrency",
+            required=False,
+        )
+
+        parser.add_argument(
+            "--no-cache",
+            help="Always download fresh data from TMDB instead of using the cache",
+            action="store_false",
+            dest="use_cache",
+            required=False,
+        )
+
+        parser.add_argument(
+            "-f",
+            "--force",
+            help="Check all TV shows, even those that are not due for a check yet",
+            action="store_true",
+            dest="force",
+            required=False,
+        )
+
+        parser.add_argument(
+            "-d",
+            "--delta",
+            help=(
+                "Only check TV shows that have changed on TMDB since the last "
+                "run with --delta"
+            ),
+            action="store_true",
+            dest="delta",
+            required=False,
+        )
+
+        parser.add_argument(
+            "-o",
+            "--offline",
+            help=(
+                "Report what the last checks found instead of checking, without "
+                "contacting TMDB"
+            ),
+            action="store_true",
+            dest="offline",
+            required=False,
+        )
+
+        parser.add_argument(
+            "--lookup",
+            help=(
+                "Look up the whole TV show, or only its next season, on TMDB "
+                f"(default: {Lookup.SHOW.value})"
+            ),
+            type=Lookup,
+            choices=list(Lookup),
+            default=Lookup.SHOW,
+            metavar="{" + ",".join(lookup.value for lookup in Lookup) + "}",
+            dest="lookup",
+            required=False,
+        )
+
+        parser.add_argument(
+            "--if-running",
+            help=(
+                "When another check is already running, wait for it and report "
+                "what it found, or exit right away (default: wait)"
+            ),
+            choices=["wait", "exit"],
+            default="wait",
+            dest="if_running",
+            required=False,
+        )
+
+        parser.add_argument(
+            "--profile",
+            help=(
+                "Write timings of the phases of the run to TRACE_FILE, in Chrome "
+                "trace event format"
+            ),
+            metavar="TRACE_FILE",
+            dest="profile",
+            required=False,
+        )
+
+        parser.add_argument(
+            "--cprofile",
+            help="Profile the run with cProfile and write the stats to STATS_FILE",
+            metavar="STATS_FILE",
+            dest="cprofile",
+            required=False,
+        )
+
         subparsers = parser.add_subparsers(dest="subparser_name")
 
         tv = subparsers.add_parser(
@@ -16,16 +130,80 @@ class Cli:
             help="Subcommand for working with TV shows",
         )
 
+        movie = subparsers.add_parser(
+            "movie",
+            help="Subcommand for working with movies",
+        )
+
         subparsers.add_parser(
             "configure",
             help="Configure Seasonwatch for use",
         )
 
+        subparsers.add_parser(
+            "report",
+            help="Report what the last checks found, without contacting TMDB",
+        )
+
+        migrate = subparsers.add_parser(
+            "migrate",
+            help="Move TV shows with IMDb IDs to TMDB",
+        )
+
+        migrate.add_argument(
+            "-r",
+            "--review",
+            help="Interactively move the TV shows that couldn't be moved automatically",
+            action="store_true",
+            dest="review",
+            required=False,
+        )
+
+        team = subparsers.add_parser(
+            "team",
+            help=(
+                "Check the watchlists in several users' databases, looking up "
+                "each TV show on TMDB only once"
+            ),
+        )
+
+        team.add_argument(
+            "databases",
+            help=(
+                "Database file, or directory searched for 'database.sqlite' files, "
+                "e.g. one per user"
+            ),
+            nargs="+",
+            type=Path,
+            metavar="DATABASE",
+        )
+
+        daemon = subparsers.add_parser(
+            "daemon",
+            help="Keep running and check for new seasons regularly",
+        )
+
+        daemon.add_argument(
+            "-i",
+            "--interval",
+            help="Minutes between checks (default: 60)",
+            type=Cli.positive_int,
+            default=60,
+            metavar="MINUTES",
+            dest="interval",
+            required=False,
+        )
+
         tv.add_argument(
             "-r",
             "--remove",
-            help="Interactively remove a TV show",
-            action="store_true",
+            help=(
+                "Interactively remove TV shows, only offering those with titles "
+                "matching TITLE if given"
+            ),
+            nargs="?",
+            const="",
+            metavar="TITLE",
             dest="remove",
             required=False,
         )
@@ -33,8 +211,13 @@ class Cli:
         tv.add_argument(
             "-s",
             "--step-up",
-            help="Step up last watched season number of TV shows",
-            action="store_true",
+            help=(
+                "Step up last watched season number of TV shows, only offering "
+                "those with titles matching TITLE if given"
+            ),
+            nargs="?",
+            const="",
+            metavar="TITLE",
             dest="step_up",
             required=False,
         )
@@ -42,8 +225,13 @@ class Cli:
         tv.add_argument(
             "-a",
             "--add",
-            help="Add tv-shows",
-            action="store_true",
+            help=(
+                "Add tv-shows, or search for TITLE on TMDB and add one of the TV "
+                "shows found"
+            ),
+            nargs="?",
+            const="",
+            metavar="TITLE",
             dest="add",
             required=False,
         )
@@ -57,4 +245,65 @@ class Cli:
             required=False,
         )
 
+        tv.add_argument(
+            "-u",
+            "--upcoming",
+            help=(
+                "List the TV shows with a next season airing within DAYS days, as "
+                "found by previous checks"
+            ),
+            type=Cli.positive_int,
+            metavar="DAYS",
+            dest="upcoming",
+            required=False,
+        )
+
+        movie.add_argument(
+            "-a",
+            "--add",
+            help="Add a movie to check the release dates of",
+            action="store_true",
+            dest="add",
+            required=False,
+        )
+
+        movie.add_argument(
+            "-r",
+            "--remove",
+            help="Interactively remove movies",
+            action="store_true",
+            dest="remove",
+            required=False,
+        )
+
+        movie.add_argument(
+            "-l",
+            "--list",
+            help="List stored movies",
+            action="store_true",
+            dest="list_movies",
+            required=False,
+        )
+
+        tv.add_argument(
+            "--import",
+            help=(
+                "Add or update the TV shows in FILE, a CSV or JSON Lines file with "
+                "the fields id, title, last_season and optionally id_source"
+            ),
+            type=Path,
+            metavar="FILE",
+            dest="import_file",
+            required=False,
+        )
+
+        tv.add_argument(
+            "--export",
+            help="Write all TV shows to FILE, as CSV or JSON Lines",
+            type=Path,
+            metavar="FILE",
+            dest="export_file",
+            required=False,
+        )
+
         return parser.parse_args()
@@ -0,0 +1,222 @@
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Final
+
+from seasonwatch.exceptions import TmdbException, TransportException
+from seasonwatch.profiling import Profiler
+from seasonwatch.transport import HttpResponse, Transport
+
+# TMDB allows around 50 requests per second, so stay a bit below.
+DEFAULT_RATE: Final[float] = 40.0
+DEFAULT_BURST: Final[int] = 40
+MAX_RETRIES: Final[int] = 5
+# Seconds to wait before the first retry, doubled for every retry after.
+BACKOFF_BASE: Final[float] = 0.5
+BACKOFF_MAX: Final[float] = 30.0
+# Longer waits asked for by TMDB make the request fail instead.
+MAX_RETRY_AFTER: Final[float] = 120.0
+RETRY_STATUSES: Final[set[int]] = {429, 500, 502, 503, 504}
+# Requests in a row that may fail before TMDB is considered down.
+FAILURE_THRESHOLD: Final[int] = 5
+# Seconds without requests once TMDB is considered down.
+COOLDOWN: Final[float] = 30.0
+
+
+class RateLimiter:
+    """Token bucket limiting how often requests are made.
+
+    The bucket holds up to ``burst`` tokens and is refilled at ``rate``
+    tokens per second. Every request takes a token, waiting for one if
+    the bucket is empty. It is shared by all threads.
+    """
+
+    def __init__(self, rate: float = DEFAULT_RATE, burst: int = DEFAULT_BURST) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        # No tokens are handed out before this time.
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take a token, waiting until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds``, e.g. when TMDB asks so."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0
+
+
+class CircuitBreaker:
+    """Stop making requests for a while when TMDB seems to be down.
+
+    After ``threshold`` failed requests in a row, the circuit opens and
+    requests fail right away for ``cooldown`` seconds. Then a single
+    request is let through, which closes the circuit again if it
+    succeeds.
+    """
+
+    def __init__(
+        self, threshold: int = FAILURE_THRESHOLD, cooldown: float = COOLDOWN
+    ) -> None:
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Return whether a request may be made now."""
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running:
+                return False
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return False
+            self._trial_running = True
+            return True
+
+    def succeeded(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def failed(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._opened_at is not None or self._failures >= self.threshold:
+                if self._opened_at is None:
+                    logging.warning(
+                        "TMDB keeps failing, pausing requests for "
+                        f"{self.cooldown:.0f} seconds"
+                    )
+                self._opened_at = time.monotonic()
+
+
+class TmdbClient:
+    """Shared layer for all requests made to TMDB.
+
+    Requests are rate limited to stay within the limits of TMDB, and
+    retried with exponential backoff when TMDB is busy or unavailable,
+    waiting as long as TMDB asks for in Retry-After. If TMDB keeps
+    failing, the circuit breaker makes further requests fail right away
+    instead of waiting for every one of them to time out.
+
+    It is safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        rate: float | None = DEFAULT_RATE,
+        max_retries: int = MAX_RETRIES,
+    ) -> None:
+        """Wrap ``transport`` for making requests to TMDB.
+
+        :param transport: Transport with authentication set up for TMDB.
+        :param rate: Maximum number of requests per second, or None for
+            no limit.
+        :param max_retries: Number of times a request is retried.
+        """
+        self.transport = transport
+        self.limiter = (
+            None if rate is None else RateLimiter(rate, burst=max(1, int(rate)))
+        )
+        self.breaker = CircuitBreaker()
+        self.max_retries = max_retries
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        """Make a GET request to TMDB, retrying it if needed.
+
+        :param url: URL to get.
+        :param headers: Extra headers for the request.
+        :raises TmdbException: If TMDB couldn't be reached, or was busy
+            or failing for every retry.
+        :return: The response, which may have any status that is not
+            worth retrying, like 404.
+        """
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise TmdbException(f"Not fetching {url}, TMDB seems to be down")
+            # The breaker is told how every attempt went, however it
+            # ends, or a trial request would keep the circuit open.
+            up = False
+            try:
+                if self.limiter is not None:
+                    self.limiter.acquire()
+                try:
+                    response = self.transport.get(url, headers=headers)
+                except TransportException as e:
+                    error = str(e)
+                    wait = self._backoff(attempt)
+                else:
+                    if response.status_code not in RETRY_STATUSES:
+                        up = True
+                        return response
+                    error = f"TMDB responded with {response.status_code} for {url}"
+                    # Being told to slow down means that TMDB is up, but
+                    # all threads should slow down, not just this one.
+                    up = response.status_code == 429
+                    retry_after = self._retry_after(response)
+                    if retry_after is not None and retry_after > MAX_RETRY_AFTER:
+                        break
+                    if retry_after is None:
+                        wait = self._backoff(attempt)
+                    else:
+                        wait = retry_after
+                    if up and self.limiter is not None:
+                        self.limiter.pause(wait)
+            finally:
+                if up:
+                    self.breaker.succeeded()
+                else:
+                    self.breaker.failed()
+            if attempt < self.max_retries:
+                with Profiler.span("backoff", "http", seconds=wait):
+                    time.sleep(wait)
+        raise TmdbException(error)
+
+    def _backoff(self, attempt: int) -> float:
+        """Return the time to wait before retry number ``attempt + 1``.
+
+        The time is random up to the exponential backoff, so that the
+        threads that failed at the same time don't retry together.
+        """
+        return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2**attempt))
+
+    @staticmethod
+    def _retry_after(response: HttpResponse) -> float | None:
+        """Return the seconds to wait according to Retry-After, if any."""
+        value = response.headers.get("Retry-After")
+        if value is None:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        return max(0.0, retry_at.timestamp() - time.time())
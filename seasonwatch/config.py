@@ -1,63 +1,149 @@
+from typing import TYPE_CHECKING, Callable
+
 from seasonwatch.constants import Source
 from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.search import Search
 from seasonwatch.sql import Sql
 
+if TYPE_CHECKING:
+    from seasonwatch.client import TmdbClient
+
 
 class Configure:
-    """Class for modifying the shows to check."""
+    """Class for modifying the shows and movies to check."""
 
     @staticmethod
-    def step_up_series() -> None:
-        """Increase 'current season' of a TV show by 1."""
-        shows = Sql.read_all_series()
-        menu_data: list[dict[str, str]] = []
-        for i, show in enumerate(shows):
-            menu_data.append(
-                {
-                    "index": str(i),
-                    "id": show["id"],
-                    "title": show["title"],
-                }
-            )
-        for item in menu_data:
-            print(f"[{item['index']}] {item['title']}")
-        selection: list[str] = input(
-            "Select the shows you want to step up the current season of, separated by "
-            "commas: "
-        ).split(",")
+    def select_series(title: str | None, prompt: str) -> list[str]:
+        """Let the user select TV shows from a numbered list.
 
-        shows_to_step_up = [s["id"] for s in menu_data if s["index"] in selection]
+        :param title: Only list the TV shows with titles matching the
+            words in ``title``, looked up in the title index, if given.
+        :param prompt: Question asked about the listed TV shows.
+        :return: The IDs of the selected TV shows.
+        """
+        if title:
+            shows = Sql.find_series(title)
+            if not shows:
+                print(f"No TV shows matching '{title}'.")
+                return []
+        else:
+            shows = [(show.id, show.title) for show in Sql.iter_series()]
+        for i, (_, show_title) in enumerate(shows):
+            print(f"[{i}] {show_title}")
+        selection = [s.strip() for s in input(prompt).split(",")]
+        return [id for i, (id, _) in enumerate(shows) if str(i) in selection]
+
+    @staticmethod
+    def step_up_series(title: str | None = None) -> None:
+        """Increase 'current season' of TV shows by 1.
+
+        :param title: Only offer the TV shows matching ``title``.
+        """
+        shows_to_step_up = Configure.select_series(
+            title,
+            "Select the shows you want to step up the current season of, separated by "
+            "commas: ",
+        )
 
         for show_id in shows_to_step_up:
-            title = Sql.read_series(show_id).get("title")
+            show_title = Sql.read_series(show_id).get("title")
             Sql.step_up_series(show_id)
-            print(f"Successfully stepped up '{title}'.")
+            print(f"Successfully stepped up '{show_title}'.")
 
     @staticmethod
-    def remove_series() -> None:
-        """Remove a TV show."""
-        shows = Sql.read_all_series()
-        menu_data: list[dict[str, str]] = []
-        for i, show in enumerate(shows):
-            menu_data.append(
-                {
-                    "index": str(i),
-                    "id": show["id"],
-                    "title": show["title"],
-                }
-            )
-        for item in menu_data:
-            print(f"[{item['index']}] {item['title']}")
-        selection: list[str] = input(
-            "Select the shows you want to remove, separated by commas: "
-        ).split(",")
-
-        shows_to_remove = [s["id"] for s in menu_data if s["index"] in selection]
+    def remove_series(title: str | None = None) -> None:
+        """Remove TV shows.
+
+        :param title: Only offer the TV shows matching ``title``.
+        """
+        shows_to_remove = Configure.select_series(
+            title, "Select the shows you want to remove, separated by commas: "
+        )
 
         for show_id in shows_to_remove:
-            title = Sql.read_series(show_id).get("title")
+            show_title = Sql.read_series(show_id).get("title")
             Sql.remove_series(show_id)
-            print(f"Successfully deleted '{title}'.")
+            print(f"Successfully deleted '{show_title}'.")
+
+    @staticmethod
+    def add_found_series(title: str, client: Callable[[], "TmdbClient"]) -> None:
+        """Interactively add a TV show found by searching for its title.
+
+        TV shows found by earlier searches are offered first, answered
+        from the database, with the option of searching TMDB instead.
+
+        :param title: Title of the TV show, or the start of it.
+        :param client: Function returning the client for requests to
+            TMDB, only called if TMDB has to be asked.
+        :raises SeasonwatchException: If TMDB can't be searched, or the
+            last watched season is not a number.
+        """
+        results, from_tmdb = Search.find(title, client)
+        while True:
+            if not results:
+                print(f"No TV shows found for '{title}'.")
+                return
+            for i, result in enumerate(results):
+                year = (
+                    f" ({result.first_air_date[:4]})" if result.first_air_date else ""
+                )
+                print(f"[{i}] {result.title}{year}")
+            if not from_tmdb:
+                print("[s] None of these, search TMDB")
+            choice = input("Select the show to add (empty cancels): ").strip()
+            if choice == "s" and not from_tmdb:
+                results, from_tmdb = Search.find(title, client, local=False)
+                continue
+            if choice == "":
+                print("Data was not saved")
+                return
+            if choice.isdigit() and int(choice) < len(results):
+                break
+            print(f"'{choice}' is not in the list")
+
+        found = results[int(choice)]
+        last_season = input("Last watched season (default: 0): ").strip() or "0"
+        try:
+            last_season_int = int(last_season)
+        except ValueError:
+            raise SeasonwatchException(f"Couldn't parse '{last_season}' as an int")
+        Sql.update_series(
+            found.id,
+            found.title,
+            last_season_int,
+            0,
+            "1970-01-01 00:00:00",
+            "1970-01-01 00:00:00",
+            Source.TMDB,
+        )
+        print(f"Successfully added '{found.title}' with TMDB ID {found.id}.")
+
+    @staticmethod
+    def add_movie() -> None:
+        """Interactively add a movie to check the release dates of.
+
+        :raises SeasonwatchException: If the ID is not a TMDB ID, or
+            another movie has the same title.
+        """
+        title = input("What the movie should be called: ")
+        id = input("ID of the movie (after 'movie/' in the URL on TMDB): ").strip()
+        if not id.isdigit():
+            raise SeasonwatchException(f"'{id}' is not a TMDB ID")
+        Sql.add_movie(id, title)
+        print(f"Successfully added '{title}'.")
+
+    @staticmethod
+    def remove_movies() -> None:
+        """Interactively remove movies."""
+        movies = list(Sql.iter_movies())
+        for i, movie in enumerate(movies):
+            print(f"[{i}] {movie.title}")
+        prompt = "Select the movies you want to remove, separated by commas: "
+        selection = [s.strip() for s in input(prompt).split(",")]
+        for i, movie in enumerate(movies):
+            if str(i) in selection:
+                Sql.remove_movie(movie.id)
+                print(f"Successfully deleted '{movie.title}'.")
 
     @staticmethod
     def add_series() -> None:
@@ -15,7 +15,27 @@ class Constants:
     CONFIG_PATH: Final[Path] = CONFIG_DIRECTORY / CONFIG_FILE
 
     API_VERSION: Final[str] = "3"
-    API_BASE_URL: Final[str] = f"https://api.themoviedb.org/{API_VERSION}"
+    # Can be pointed at a stand-in for TMDB, e.g. when benchmarking.
+    API_BASE_URL: Final[str] = os.environ.get(
+        "SEASONWATCH_API_BASE_URL",
+        default=f"https://api.themoviedb.org/{API_VERSION}",
+    )
+
+    DEFAULT_CONCURRENCY: Final[int] = 8
+
+    # The longest period TMDB reports changes for.
+    CHANGES_MAX_DAYS: Final[int] = 14
+
+
+class Lookup(Enum):
+    """Ways of finding the next season of a TV show on TMDB."""
+
+    # The details of the whole TV show, of which only the list of
+    # seasons is decoded.
+    SHOW = "show"
+    # The details of only the next season, which don't exist until TMDB
+    # knows about it.
+    SEASON = "season"
 
 
 class Source(Enum):
@@ -23,3 +43,12 @@ class Source(Enum):
 
     IMDB = "IMDb"
     TMDB = "TMDB"
+
+
+class Release(Enum):
+    """Releases of a movie that Seasonwatch keeps track of."""
+
+    # In cinemas, limited or wide.
+    THEATRICAL = "theatrical"
+    # Available to buy or rent online.
+    DIGITAL = "digital"
@@ -0,0 +1,131 @@
+import logging
+import signal
+import threading
+from configparser import ConfigParser
+from datetime import timedelta
+from types import FrameType
+from typing import Callable, Final
+
+from seasonwatch.backup import Backup, BackupSettings
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.lock import RunLock
+from seasonwatch.runner import Runner
+from seasonwatch.sql import Sql
+
+# Seconds between attempts to take the lock while another check runs.
+LOCK_POLL_INTERVAL: Final[float] = 1.0
+
+
+class Daemon:
+    """Check for new seasons on a schedule in a long-running process.
+
+    The connections to TMDB, the database connection, the response cache
+    and libnotify are set up once and reused for every check, so a
+    check only costs what is actually fetched. Like any other check,
+    every check of the daemon holds the run lock, so it never overlaps
+    with a check started from cron or by hand.
+
+    SIGTERM and SIGINT stop the daemon once the ongoing check, if any,
+    is done, also while it waits for another check. SIGHUP makes it read
+    the configuration file again before the next check, which is made
+    right away. A check that fails is logged, and the daemon carries on
+    with the next one.
+    """
+
+    def __init__(
+        self,
+        runner: Runner,
+        interval: timedelta,
+        read_config: Callable[[], ConfigParser],
+    ) -> None:
+        """Prepare the daemon.
+
+        :param runner: Runner used for every check.
+        :param interval: Time between the start of two checks.
+        :param read_config: Function returning the current configuration.
+        """
+        self.runner = runner
+        self.interval = interval
+        self.read_config = read_config
+        self.backup = BackupSettings.from_config(read_config())
+        self.lock = RunLock()
+        self._wake_up = threading.Event()
+        self._stopping = False
+        self._reload = False
+
+    def stop(self, signum: int, frame: FrameType | None) -> None:
+        """Stop the daemon after the ongoing check."""
+        self._stopping = True
+        self._wake_up.set()
+
+    def reload(self, signum: int, frame: FrameType | None) -> None:
+        """Read the configuration again and check right away."""
+        self._reload = True
+        self._wake_up.set()
+
+    def run(self) -> int:
+        """Check for new seasons until stopped.
+
+        :return: Exit code, 0 when stopped by a signal.
+        """
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGHUP, self.reload)
+
+        try:
+            while not self._stopping:
+                if self._reload:
+                    self._reload = False
+                    self._reload_config()
+
+                # Checks started by hand or from cron wait for the check
+                # of the daemon, and the other way around.
+                if not self._acquire_lock():
+                    break
+                try:
+                    Backup.backup_database(self.backup.compress, self.backup.policy)
+                    self.runner.run()
+                except SeasonwatchException as e:
+                    logging.error(f"Seasonwatch failed checking for new seasons: {e}")
+                except Exception:
+                    # Whatever went wrong, like a database or disk error,
+                    # may be gone by the next check.
+                    logging.exception("Seasonwatch failed checking for new seasons")
+                    Sql.close()
+                finally:
+                    self.lock.release()
+
+                if not self._stopping:
+                    self._wake_up.wait(self.interval.total_seconds())
+                    self._wake_up.clear()
+        finally:
+            self.runner.close()
+        return 0
+
+    def _acquire_lock(self) -> bool:
+        """Take the run lock, waiting for another check to finish.
+
+        The lock is polled rather than waited for, so that the daemon
+        can still be stopped while another check runs.
+
+        :return: Whether the lock was taken, False if the daemon was
+            stopped first.
+        """
+        while not self.lock.acquire(wait=False):
+            if self._stopping:
+                return False
+            self._wake_up.wait(LOCK_POLL_INTERVAL)
+            self._wake_up.clear()
+        return True
+
+    def _reload_config(self) -> None:
+        """Apply the configuration file, keeping the old one if invalid."""
+        try:
+            config = self.read_config()
+            backup = BackupSettings.from_config(config)
+            self.runner.configure(config)
+        except (SeasonwatchException, ValueError) as e:
+            logging.error(f"Keeping the old configuration: {e}")
+            return
+        self.backup = backup
+        logging.info("Reloaded the configuration")
@@ -11,3 +11,27 @@ class ConfigException(SeasonwatchException):
     """
     Raised when the configuration cannot be parsed
     """
+
+
+class TmdbException(SeasonwatchException):
+    """
+    Raised when TMDB can't be reached, or keeps failing, even after
+    retrying
+    """
+
+
+class TransportException(SeasonwatchException):
+    """
+    Raised when a request can't be made, e.g. because the connection
+    fails or times out
+    """
+
+
+class HttpException(SeasonwatchException):
+    """
+    Raised when TMDB responds with an error status
+    """
+
+    def __init__(self, message: str, status_code: int) -> None:
+        super().__init__(message)
+        self.status_code = status_code
@@ -0,0 +1,69 @@
+import fcntl
+import os
+from pathlib import Path
+from typing import IO, Final
+
+from seasonwatch.sql import DATA_DIRECTORY
+
+LOCK_FILE: Final[str] = "check.lock"
+
+
+class RunLock:
+    """Lock making sure that only one check runs at a time.
+
+    The lock is an flock on a file next to the database, which the
+    kernel releases when the process holding it exits, so a check that
+    crashed never leaves it held. While a check runs, the file holds
+    its PID, and it is emptied when the check is done. A PID found in
+    it when taking the lock means that the last check didn't finish.
+    """
+
+    def __init__(self, path: Path = DATA_DIRECTORY / LOCK_FILE) -> None:
+        self.path = path
+        self._file: IO[str] | None = None
+        # PID of the last check, if it died while holding the lock.
+        self.crashed: int | None = None
+
+    def acquire(self, wait: bool = True) -> bool:
+        """Take the lock.
+
+        :param wait: Wait for the lock if another check holds it,
+            instead of giving up right away.
+        :return: Whether the lock was taken.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        file = open(self.path, "a+")
+        try:
+            fcntl.flock(file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            return False
+        file.seek(0)
+        self.crashed = RunLock._parse_pid(file.read())
+        file.truncate(0)
+        file.write(f"{os.getpid()}\n")
+        file.flush()
+        self._file = file
+        return True
+
+    def release(self) -> None:
+        """Mark the check as done and release the lock, if held."""
+        if self._file is None:
+            return
+        self._file.truncate(0)
+        self._file.flush()
+        fcntl.flock(self._file, fcntl.LOCK_UN)
+        self._file.close()
+        self._file = None
+
+    def holder(self) -> int | None:
+        """Return the PID of the check holding the lock, if known."""
+        try:
+            return RunLock._parse_pid(self.path.read_text())
+        except OSError:
+            return None
+
+    @staticmethod
+    def _parse_pid(content: str) -> int | None:
+        content = content.strip()
+        return int(content) if content.isdigit() else None
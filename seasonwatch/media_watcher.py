@@ -1,155 +1,374 @@
-import sys
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, timedelta
+from itertools import islice
+from typing import Any, Callable, Final, Iterable, Iterator, TypeVar
 
-from dateutil.parser import parse
-from requests import HTTPError, RequestException, Session
-
-from seasonwatch.constants import Constants, Source
+from seasonwatch.cache import ResponseCache
+from seasonwatch.client import TmdbClient
+from seasonwatch.constants import Constants, Lookup, Source
 from seasonwatch.exceptions import SeasonwatchException
-from seasonwatch.sql import Sql
+from seasonwatch.notifier import News
+from seasonwatch.profiling import Profiler
+from seasonwatch.report import Report, ReportLines
+from seasonwatch.scheduler import SOON_WINDOW, Scheduler
+from seasonwatch.sql import (
+    NEVER,
+    DBRecord,
+    NotifiedMark,
+    SeriesUpdate,
+    SeriesUpdates,
+    Sql,
+)
 from seasonwatch.utils import Utils
 
+# Categories of news that the user is notified about.
+NOTIFIED_CATEGORIES: Final[list[str]] = ["new", "soon"]
+# Lookups queued per thread ahead of the series being categorized.
+QUEUED_PER_THREAD: Final[int] = 4
+# Results categorized at a time.
+CLASSIFY_BATCH: Final[int] = 500
+# Results written to the database per transaction.
+WRITE_BATCH: Final[int] = 5000
+
+NextSeason = dict[str, Any] | SeasonwatchException | None
+Item = TypeVar("Item")
+Found = TypeVar("Found")
+
 
 class MediaWatcher:
     """
     Class for checking for new media given a config
     """
 
-    def __init__(self) -> None:
-        self.series: dict[str, dict[str, str]] = {
-            "new": {},
-            "soon": {},
-            "later": {},
-            "nothing": {},
-        }
-
-    def translate_imdb_id(
-        self,
-        session: Session,
-        imdb_id: str,
-    ) -> tuple[str | None, str | None]:
-        """Suggest TMDB ID with corresponding name for given IMDb ID."""
-        imdb_id = f"tt{imdb_id:0>7}"
-        url = f"{Constants.API_BASE_URL}/find/{imdb_id}?external_source=imdb_id"
-        try:
-            response = session.get(url)
-            response.raise_for_status()
-        except HTTPError as e:
-            raise SeasonwatchException(
-                f"Failure connecting to TMDB for converting IMDb ID: {e}"
-            )
-        except RequestException as e:
-            print(f"There was an error fetching {url}: {e}")
-            sys.exit(1)
-        response = response.json()
-        if not isinstance(response, dict):
-            raise SeasonwatchException(
-                "Malformed data returned from TMDB when attemping to find TMDB ID."
-            )
-        tv_results_list = response.get("tv_results")
-        if not tv_results_list or not len(tv_results_list) > 0:
-            return None, None
-        tv_result = tv_results_list[0]
+    def __init__(self, soon_window: timedelta = SOON_WINDOW) -> None:
+        """Prepare a check.
 
-        title = tv_result.get("original_name")
-        id = tv_result.get("id")
-        return id, title
+        :param soon_window: How far ahead a season counts as soon.
+        """
+        self.soon_window = soon_window
+        self.report = ReportLines()
+        # Only the news that the user hasn't been notified about yet.
+        self.news = News()
+        # Number of series skipped since they still have IMDb IDs.
+        self.unmigrated = 0
 
+    @Profiler.traced("seasonwatch")
     def check_for_new_seasons(
         self,
-        session: Session,
+        client: TmdbClient,
+        concurrency: int = Constants.DEFAULT_CONCURRENCY,
+        cache: ResponseCache | None = None,
+        force: bool = False,
+        changed_ids: set[str] | None = None,
+        lookup: Lookup = Lookup.SHOW,
     ) -> None:
         """
-        Look through the seasons in the database, and check on IMDb
+        Look through the seasons in the database, and check on TMDB
         whether there is a new season coming up, or one that has already
-        come out. This is notified as desktop notification for the more
-        important ones, and information about all series is also
-        returned for further use.
+        come out. Information about all series is kept in ``report``,
+        and the seasons that are out or coming out soon are also kept in
+        ``news`` unless the user has already been notified about them.
+
+        The check streams the series through its stages: they are read
+        from the database a page at a time, looked up on TMDB by up to
+        ``concurrency`` threads at the same time sharing ``client``, and
+        categorized and written back in batches in the order they are
+        stored. Only a bounded number of series is in flight between the
+        stages, so memory use doesn't grow with the watchlist.
+
+        A series that can't be checked, because TMDB can't be reached or
+        responds with an error, is put in the "failed" category and made
+        due for a check again on the next run, while the rest of the
+        series are still checked.
+
+        Only series that are due for a check according to their schedule
+        are looked up, unless ``force`` is True. If ``changed_ids`` is
+        given, the series among them are also looked up, bypassing the
+        freshness of cached responses. Due series that were checked before
+        and haven't changed on TMDB since aren't looked up at all, but
+        what the last check found is categorized again for today. Series
+        with IMDb IDs are skipped until migrated.
+
+        :param client: Client for making requests to TMDB.
+        :param concurrency: Maximum number of simultaneous lookups.
+        :param cache: Cache for the responses from TMDB, if any.
+        :param force: Check all series, whether they are due or not.
+        :param changed_ids: TMDB IDs of the series changed on TMDB since
+            the last check.
+        :param lookup: Whether to get the details of the whole series,
+            or only of the next season.
         """
-        series_data = Sql.read_all_series()
-        last_change = Utils.sql_today()
-        last_notify = Utils.sql_today()
-        for series in series_data:
-            last_watched_season = int(series["last_season"])
-            checks = int(series.get("last_check", 0)) + 1
-            next_season_no = last_watched_season + 1
-            name = series["title"]
-            id = series["id"]
-            source = series["id_source"]
-            if source == Source.IMDB:
-                tmdb_id, tmdb_name = self.translate_imdb_id(session, id)
-                print(f"Attempting to convert ID from IMDb to TMDB for series: {name}")
-                looks_ok = False
-                if tmdb_id:
-                    print(f"Found TMDB ID {tmdb_id} with associated name '{tmdb_name}'")
-                    looks_ok = input("Does it look okay? [Y/n]: ") not in ["n", "N"]
-                if not looks_ok or not tmdb_id:
-                    print("Couldn't automatically find the ID for above series.")
-                    print("Please enter it manually (after tv/ in TMDB URL): ")
-                    tmdb_id = input("TMDB ID (empty skips for now): ")
-                    if tmdb_id == "":
-                        print(f"Skipping '{name}'...")
-                        continue
-                id = tmdb_id
-                source = Source.TMDB
-                Sql.update_series(
-                    id=id,
-                    title=name,
-                    last=last_watched_season,
-                    checks=checks,
-                    last_change=last_change,
-                    last_notify=last_notify,
-                    id_source=source,
-                    full_replace=True,
+
+        def fetch(series: DBRecord) -> NextSeason:
+            changed = changed_ids is not None and series.id in changed_ids
+            if (
+                changed_ids is not None
+                and not changed
+                and series.status is not None
+                and series.next_check != NEVER
+            ):
+                # Nothing changed on TMDB since the last check, so only
+                # the date has moved on since.
+                return MediaWatcher.stored_next_season(series)
+            try:
+                return Utils.get_next_season(
+                    series.id,
+                    series.last_season,
+                    client,
+                    cache,
+                    lookup,
+                    revalidate=changed,
                 )
-                print(f"Successfully migrated series '{name}' from IMDb to TMDB")
+            except SeasonwatchException as e:
+                return e
 
-            next_season = Utils.get_next_season(id, last_watched_season, session)
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            self.record(
+                MediaWatcher.fetch_in_order(
+                    executor,
+                    fetch,
+                    self.due_series(force, changed_ids),
+                    queued=concurrency * QUEUED_PER_THREAD,
+                )
+            )
+        finally:
+            executor.shutdown(cancel_futures=True)
 
-            if not next_season:
-                message = f"No season {next_season_no} found for {name}"
-                self.series["nothing"][name] = message
-                continue
+    @staticmethod
+    def fetch_in_order(
+        executor: ThreadPoolExecutor,
+        fetch: Callable[[Item], Found],
+        items: Iterable[Item],
+        queued: int,
+    ) -> Iterator[tuple[Item, Found]]:
+        """Look up series or movies in ``executor``, yielding them in order.
 
-            next_air_date_raw = next_season.get("air_date")
-            if not next_air_date_raw:
-                message = (
-                    f"Season {next_season_no} of {name} coming up, the release "
-                    "date is unknown"
-                )
-                self.series["nothing"][name] = message
+        Unlike ``executor.map``, which takes all items at once, only
+        ``queued`` items are handed to the executor ahead of the one
+        that is yielded next.
+
+        :return: Every item with what was found about it, in the order
+            of ``items`` regardless of which lookup finishes first.
+        """
+        pending: deque[tuple[Item, Future[Found]]] = deque()
+        for item in items:
+            if len(pending) >= queued:
+                done, future = pending.popleft()
+                yield done, future.result()
+            pending.append((item, executor.submit(fetch, item)))
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+    def due_series(
+        self, force: bool = False, changed_ids: set[str] | None = None
+    ) -> Iterator[DBRecord]:
+        """Yield the series to check, counting those left unmigrated.
+
+        :param force: Return all series, whether they are due or not.
+        :param changed_ids: TMDB IDs of the series changed on TMDB since
+            the last check, if known. These are returned even if they
+            aren't due.
+        """
+        today = Utils.sql_today()
+        due_by = None if force or changed_ids is not None else today
+        for series in Sql.iter_series(due_by=due_by):
+            if series.id_source == Source.IMDB:
+                # Has to be migrated first, which may need the user.
+                self.unmigrated += 1
                 continue
+            if (
+                changed_ids is not None
+                and series.id not in changed_ids
+                and series.next_check > today
+            ):
+                continue
+            yield series
 
-            if not isinstance(next_air_date_raw, str):
-                raise SeasonwatchException(
-                    f"Malformed air date returned from TMDB: {next_air_date_raw}"
-                )
-            next_air_date = parse(next_air_date_raw)
-
-            # The new season is out
-            if next_air_date < datetime.now():
-                message = f"Season {next_season_no} of {name} is out already!"
-                self.series["new"][name] = message
-            # The new season is not yet out
-            elif next_air_date < datetime.now() + timedelta(days=90):
-                message = (
-                    f"Season {next_season_no} of {name} is not yet out but "
-                    f"will be released on {next_air_date.strftime('%B %-d, %Y')}."
-                )
-                self.series["soon"][name] = message
-            else:
-                message = (
-                    f"Season {next_season_no} of {name} coming up, in more "
-                    "than three months"
+    @staticmethod
+    def stored_next_season(series: DBRecord) -> dict[str, Any] | None:
+        """Return the next season of a series as its last check found it.
+
+        :return: The next season like TMDB describes it, with only
+            'air_date', or None if TMDB didn't know of it.
+        """
+        if not series.season_found:
+            return None
+        return {"air_date": series.next_air_date}
+
+    def record(self, results: Iterable[tuple[DBRecord, NextSeason]]) -> None:
+        """Categorize what was found about series and store it.
+
+        The results are written in batches of ``WRITE_BATCH`` as they
+        come in.
+
+        :param results: Every series as read from the database, with its
+            next season as returned by TMDB, if any, or why it couldn't
+            be looked up.
+        """
+        # One reference date for the whole run, even if it passes
+        # midnight.
+        today = date.today()
+        sql_today = Utils.python_date_to_sql_date(today)
+        updates = SeriesUpdates(max_pending=WRITE_BATCH)
+        results_iter = iter(results)
+        try:
+            while chunk := list(islice(results_iter, CLASSIFY_BATCH)):
+                with Profiler.span("classify", count=len(chunk)):
+                    air_dates: list[date | SeasonwatchException | None] = []
+                    for _, next_season in chunk:
+                        try:
+                            air_dates.append(MediaWatcher._air_date(next_season))
+                        except SeasonwatchException as e:
+                            air_dates.append(e)
+                    categories = Scheduler.categorize_many(
+                        (d if isinstance(d, date) else None for d in air_dates),
+                        today,
+                        self.soon_window,
+                    )
+                    for (series, next_season), air_date, category in zip(
+                        chunk, air_dates, categories
+                    ):
+                        if isinstance(next_season, SeasonwatchException):
+                            update = self._handle_failure(series, next_season)
+                        elif isinstance(air_date, SeasonwatchException):
+                            update = self._handle_failure(series, air_date)
+                        else:
+                            update = self._handle_next_season(
+                                series,
+                                next_season,
+                                air_date,
+                                category,
+                                today,
+                                sql_today,
+                            )
+                        updates.add(update)
+        finally:
+            # Keep the results of the shows that were checked even if
+            # the run was interrupted.
+            with Profiler.span("write results", count=len(updates)):
+                updates.flush()
+
+    @staticmethod
+    def _air_date(next_season: NextSeason) -> date | None:
+        """Return the air date of a season as returned by TMDB, if any.
+
+        :raises SeasonwatchException: If the air date is malformed.
+        """
+        if (
+            isinstance(next_season, SeasonwatchException)
+            or not next_season
+            or not next_season.get("air_date")
+        ):
+            return None
+        raw = next_season["air_date"]
+        if not isinstance(raw, str):
+            raise SeasonwatchException(f"Malformed air date returned from TMDB: {raw}")
+        return Scheduler.parse_air_date(raw)
+
+    def _handle_failure(
+        self, series: DBRecord, error: SeasonwatchException
+    ) -> SeriesUpdate:
+        """Record that a series couldn't be checked.
+
+        :param series: The series as read from the database.
+        :param error: Why the series couldn't be checked.
+        :return: The database record of the series, unchanged except for
+            being due for a check right away. What the previous check
+            found is kept.
+        """
+        name = series.title
+        self.report.add("failed", f"Couldn't check {name}: {error}")
+        return SeriesUpdate(
+            id=series.id,
+            title=name,
+            last_season=series.last_season,
+            checks=series.checks,
+            last_change=series.last_changed,
+            last_notify=series.last_notified,
+            id_source=series.id_source,
+            next_check=NEVER,
+            status=series.status,
+            next_air_date=series.next_air_date,
+            season_found=series.season_found,
+            notified=series.notified,
+        )
+
+    def _handle_next_season(
+        self,
+        series: DBRecord,
+        next_season: dict[str, Any] | None,
+        next_air_date: date | None,
+        category: str,
+        today: date,
+        sql_today: str,
+    ) -> SeriesUpdate:
+        """Record what was found about the next season of a series.
+
+        :param series: The series as read from the database.
+        :param next_season: The season following the last watched one
+            as returned by TMDB, if any.
+        :param next_air_date: Air date of ``next_season``, if known.
+        :param category: What ``next_air_date`` means to the user.
+        :param today: Date of the check.
+        :param sql_today: ``today`` as stored in the database.
+        :return: The new database record of the series.
+        """
+        last_watched_season = series.last_season
+        checks = series.checks + 1
+        next_season_no = last_watched_season + 1
+        name = series.title
+        id = series.id
+        source = series.id_source
+        message = Report.describe(
+            name,
+            next_season_no,
+            category,
+            next_air_date,
+            season_found=next_season is not None,
+            soon_window=self.soon_window,
+        )
+        self.report.add(category, message)
+
+        # The user is notified once when a season is coming out soon,
+        # and once more when it is out, instead of on every check. What
+        # the user was notified about is only stored once the digest has
+        # been shown, so news that couldn't be shown is shown next time.
+        notified = None
+        if category in NOTIFIED_CATEGORIES:
+            notified = f"{category}:{next_season_no}"
+            if notified != series.notified:
+                self.news.add(
+                    category,
+                    message,
+                    NotifiedMark(id, notified, sql_today, last_watched_season),
                 )
-                self.series["later"][name] = message
-
-            Sql.update_series(
-                id,
-                name,
-                last_watched_season,
-                checks,
-                last_change,
-                last_notify,
-                source,
-            )
+                notified = series.notified
+
+        next_check = Scheduler.next_check(
+            category,
+            next_air_date,
+            today,
+            season_found=next_season is not None,
+            soon_window=self.soon_window,
+        )
+        return SeriesUpdate(
+            id=id,
+            title=name,
+            last_season=last_watched_season,
+            checks=checks,
+            last_change=sql_today,
+            last_notify=series.last_notified,
+            id_source=source,
+            next_check=Utils.python_date_to_sql_date(next_check),
+            status=category,
+            season_found=next_season is not None,
+            notified=notified,
+            next_air_date=(
+                None
+                if next_air_date is None
+                else Utils.python_date_to_sql_date(next_air_date)
+            ),
+        )
@@ -0,0 +1,189 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from seasonwatch.client import TmdbClient
+from seasonwatch.constants import Constants, Source
+from seasonwatch.exceptions import HttpException, SeasonwatchException
+from seasonwatch.sql import DBRecord, IdMapping, MigrationStatus, Sql
+
+
+class MigrationResult(NamedTuple):
+    migrated: list[str]
+    pending: list[str]
+    unmatched: list[str]
+    failed: dict[str, str]
+
+
+class Migrator:
+    """Move TV shows from IMDb IDs to TMDB IDs.
+
+    The IMDb API is no longer working, so TV shows added before
+    Seasonwatch used TMDB have to be moved to their TMDB IDs before they
+    can be checked. All of them are looked up on TMDB at the same time,
+    and what TMDB finds is kept in the database so that every IMDb ID is
+    only looked up once. A TV show is moved right away if TMDB finds one
+    with the same title, and the rest are left for the user to review.
+    """
+
+    def __init__(
+        self,
+        client: TmdbClient,
+        concurrency: int = Constants.DEFAULT_CONCURRENCY,
+    ) -> None:
+        """Prepare the migration.
+
+        :param client: Client for making requests to TMDB.
+        :param concurrency: Maximum number of simultaneous lookups.
+        """
+        self.client = client
+        self.concurrency = concurrency
+
+    @staticmethod
+    def imdb_series() -> list[DBRecord]:
+        """Return the TV shows that still have IMDb IDs."""
+        return [s for s in Sql.iter_series() if s.id_source == Source.IMDB]
+
+    def find(self, series: DBRecord) -> IdMapping:
+        """Look up the TMDB ID of a TV show with an IMDb ID.
+
+        :param series: The TV show as read from the database.
+        :raises SeasonwatchException: If TMDB can't be reached, or
+            responds with an error or malformed data.
+        :return: The TV show found on TMDB, if any. Its title is the one
+            matching the title of ``series``, if any does.
+        """
+        imdb_id = series.id
+        url = f"{Constants.API_BASE_URL}/find/tt{imdb_id:0>7}?external_source=imdb_id"
+        try:
+            response = self.client.get(url)
+            response.raise_for_status()
+            response_json = response.json()
+        except HttpException as e:
+            raise SeasonwatchException(
+                f"Failure connecting to TMDB for converting IMDb ID: {e}"
+            )
+        except ValueError as e:
+            raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
+        if not isinstance(response_json, dict):
+            raise SeasonwatchException(
+                "Malformed data returned from TMDB when attemping to find TMDB ID."
+            )
+
+        tv_results = response_json.get("tv_results")
+        if not tv_results or not isinstance(tv_results[0], dict):
+            return IdMapping(imdb_id, MigrationStatus.UNMATCHED)
+        tv_result = tv_results[0]
+        if tv_result.get("id") is None:
+            return IdMapping(imdb_id, MigrationStatus.UNMATCHED)
+
+        titles = [
+            str(title)
+            for title in [tv_result.get("name"), tv_result.get("original_name")]
+            if title
+        ]
+        matching = [t for t in titles if Migrator.same_title(t, series.title)]
+        return IdMapping(
+            imdb_id,
+            MigrationStatus.PENDING,
+            str(tv_result["id"]),
+            next(iter(matching + titles), None),
+        )
+
+    @staticmethod
+    def same_title(title: str, other: str) -> bool:
+        """Return whether two titles are the same, ignoring case."""
+        return title.strip().casefold() == other.strip().casefold()
+
+    def run(self) -> MigrationResult:
+        """Move every TV show that TMDB has an exact match for.
+
+        IMDb IDs that haven't been looked up before are looked up on
+        TMDB. Lookups that fail are tried again on the next run.
+
+        :return: The titles of the TV shows that were moved, those that
+            need review and those that TMDB found nothing for, and why
+            lookups failed.
+        """
+        series = Migrator.imdb_series()
+        mappings = Sql.read_id_mappings()
+        to_look_up = [s for s in series if s.id not in mappings]
+
+        def find(series: DBRecord) -> IdMapping | SeasonwatchException:
+            try:
+                return self.find(series)
+            except SeasonwatchException as e:
+                return e
+
+        result = MigrationResult([], [], [], {})
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            found = list(executor.map(find, to_look_up))
+        for looked_up, outcome in zip(to_look_up, found):
+            if isinstance(outcome, SeasonwatchException):
+                result.failed[looked_up.title] = str(outcome)
+            else:
+                mappings[outcome.imdb_id] = outcome
+        Sql.write_id_mappings(m for m in found if isinstance(m, IdMapping))
+
+        resolved: list[IdMapping] = []
+        for s in series:
+            mapping = mappings.get(s.id)
+            if mapping is None:
+                continue
+            if mapping.tmdb_id is None:
+                result.unmatched.append(s.title)
+                continue
+            if mapping.tmdb_title is None or not Migrator.same_title(
+                mapping.tmdb_title, s.title
+            ):
+                result.pending.append(s.title)
+                continue
+            try:
+                Sql.migrate_series(s.id, mapping.tmdb_id)
+            except SeasonwatchException:
+                # Most likely added again with its TMDB ID already.
+                result.pending.append(s.title)
+                continue
+            resolved.append(mapping._replace(status=MigrationStatus.RESOLVED))
+            result.migrated.append(s.title)
+        Sql.write_id_mappings(resolved)
+        return result
+
+    @staticmethod
+    def review() -> None:
+        """Interactively move the TV shows without an exact match."""
+        mappings = Sql.read_id_mappings()
+        for series in Migrator.imdb_series():
+            title = series.title
+            imdb_id = series.id
+            mapping = mappings.get(imdb_id, IdMapping(imdb_id, MigrationStatus.PENDING))
+            print(f"{title} (https://www.imdb.com/title/tt{imdb_id:0>7})")
+
+            tmdb_id = mapping.tmdb_id
+            tmdb_title = mapping.tmdb_title
+            if tmdb_id is not None:
+                print(
+                    f"Found TMDB ID {tmdb_id} with associated name "
+                    f"'{mapping.tmdb_title}'"
+                )
+                if input("Does it look okay? [Y/n]: ") in ["n", "N"]:
+                    tmdb_id = None
+            if tmdb_id is None:
+                tmdb_title = None
+                print("Please enter the ID manually (after tv/ in TMDB URL): ")
+                tmdb_id = input("TMDB ID (empty skips for now): ").strip()
+                if tmdb_id == "":
+                    print(f"Skipping '{title}'...\n")
+                    continue
+                if not tmdb_id.isdigit():
+                    print(f"'{tmdb_id}' is not a TMDB ID, skipping '{title}'...\n")
+                    continue
+
+            try:
+                Sql.migrate_series(imdb_id, tmdb_id)
+            except SeasonwatchException as e:
+                print(f"Couldn't migrate '{title}': {e}\n")
+                continue
+            Sql.write_id_mappings(
+                [IdMapping(imdb_id, MigrationStatus.RESOLVED, tmdb_id, tmdb_title)]
+            )
+            print(f"Successfully migrated series '{title}' from IMDb to TMDB\n")
@@ -0,0 +1,249 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from typing import Any, Final, Iterable
+
+from seasonwatch.cache import ResponseCache
+from seasonwatch.client import TmdbClient
+from seasonwatch.constants import Constants, Release
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.media_watcher import (
+    NOTIFIED_CATEGORIES,
+    QUEUED_PER_THREAD,
+    WRITE_BATCH,
+    MediaWatcher,
+)
+from seasonwatch.notifier import News
+from seasonwatch.profiling import Profiler
+from seasonwatch.report import Report, ReportLines
+from seasonwatch.scheduler import NOTHING_INTERVAL, SOON_WINDOW, Scheduler
+from seasonwatch.sql import NEVER, MovieRecord, MovieUpdates, NotifiedMark, Sql
+from seasonwatch.utils import Utils
+
+# Release types of TMDB that Seasonwatch keeps track of.
+RELEASE_TYPES: Final[dict[int, Release]] = {
+    2: Release.THEATRICAL,  # Limited theatrical release
+    3: Release.THEATRICAL,
+    4: Release.DIGITAL,
+}
+
+ReleaseDates = list[Any] | SeasonwatchException
+
+
+class MovieWatcher:
+    """Check for the releases of movies.
+
+    A movie is first followed to its release in theaters, and then to
+    its digital release. The results go into the same report and news
+    as those of the TV shows checked by ``MediaWatcher``, so a run that
+    checks both prints one report and shows one notification.
+    """
+
+    def __init__(
+        self,
+        report: ReportLines,
+        news: News,
+        region: str | None = None,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> None:
+        """Prepare a check.
+
+        :param report: Where to add the messages about every movie.
+        :param news: Where to add the news to notify the user about.
+        :param region: Only use the release dates in this country, as an
+            ISO 3166-1 code like "US". The earliest release anywhere is
+            used if None.
+        :param soon_window: How far ahead a release counts as soon.
+        """
+        self.report = report
+        self.news = news
+        self.region = region
+        self.soon_window = soon_window
+
+    @Profiler.traced("seasonwatch")
+    def check_for_releases(
+        self,
+        client: TmdbClient,
+        concurrency: int = Constants.DEFAULT_CONCURRENCY,
+        cache: ResponseCache | None = None,
+        force: bool = False,
+    ) -> None:
+        """Check the release dates of the movies on TMDB.
+
+        Movies go through the same stages as TV shows in a check: they
+        are read from the database a page at a time, looked up by up to
+        ``concurrency`` threads sharing ``client`` and ``cache``, and
+        written back in batches.
+
+        :param client: Client for making requests to TMDB.
+        :param concurrency: Maximum number of simultaneous lookups.
+        :param cache: Cache for the responses from TMDB, if any.
+        :param force: Check all movies, whether they are due or not.
+        """
+
+        def fetch(movie: MovieRecord) -> ReleaseDates:
+            try:
+                return Utils.get_release_dates(movie.id, client, cache)
+            except SeasonwatchException as e:
+                return e
+
+        due_by = None if force else Utils.sql_today()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            self.record(
+                MediaWatcher.fetch_in_order(
+                    executor,
+                    fetch,
+                    Sql.iter_movies(due_by=due_by),
+                    queued=concurrency * QUEUED_PER_THREAD,
+                )
+            )
+        finally:
+            executor.shutdown(cancel_futures=True)
+
+    def record(self, results: Iterable[tuple[MovieRecord, ReleaseDates]]) -> None:
+        """Categorize what was found about movies and store it.
+
+        :param results: Every movie as read from the database, with its
+            releases as returned by TMDB, or why they couldn't be looked
+            up.
+        """
+        today = date.today()
+        sql_today = Utils.python_date_to_sql_date(today)
+        updates = MovieUpdates(max_pending=WRITE_BATCH)
+        try:
+            for movie, releases in results:
+                try:
+                    if isinstance(releases, SeasonwatchException):
+                        raise releases
+                    dates = MovieWatcher.release_dates(releases, self.region)
+                except SeasonwatchException as e:
+                    updates.add(self._handle_failure(movie, e))
+                    continue
+                updates.add(self._handle_release(movie, dates, today, sql_today))
+        finally:
+            with Profiler.span("write results", count=len(updates)):
+                updates.flush()
+
+    @staticmethod
+    def release_dates(releases: list[Any], region: str | None) -> dict[Release, date]:
+        """Return the earliest date of every kind of release of a movie.
+
+        :param releases: Releases per country as returned by TMDB.
+        :param region: Only use the releases in this country, if given.
+        :raises SeasonwatchException: If a release date is malformed.
+        """
+        dates: dict[Release, date] = {}
+        for country in releases:
+            if not isinstance(country, dict):
+                continue
+            if region is not None and country.get("iso_3166_1") != region:
+                continue
+            for release in country.get("release_dates") or []:
+                if not isinstance(release, dict):
+                    continue
+                type = release.get("type")
+                kind = RELEASE_TYPES.get(type) if isinstance(type, int) else None
+                raw = release.get("release_date")
+                if kind is None or not isinstance(raw, str):
+                    continue
+                released = Scheduler.parse_air_date(raw)
+                if kind not in dates or released < dates[kind]:
+                    dates[kind] = released
+        return dates
+
+    @staticmethod
+    def next_release(
+        dates: dict[Release, date], today: date
+    ) -> tuple[Release | None, date | None]:
+        """Return the release of a movie that matters to the user now.
+
+        That is the digital release once the movie is in theaters or if
+        it is released digitally first, and otherwise the release in
+        theaters. A movie in theaters without a known digital release
+        stays about the release in theaters.
+        """
+        theatrical = dates.get(Release.THEATRICAL)
+        digital = dates.get(Release.DIGITAL)
+        if digital is not None and (
+            digital <= today
+            or theatrical is None
+            or theatrical <= today
+            or digital < theatrical
+        ):
+            return Release.DIGITAL, digital
+        if theatrical is not None:
+            return Release.THEATRICAL, theatrical
+        return None, None
+
+    def _handle_failure(
+        self, movie: MovieRecord, error: SeasonwatchException
+    ) -> MovieRecord:
+        """Record that a movie couldn't be checked.
+
+        :return: The record of the movie, unchanged except for being due
+            for a check right away.
+        """
+        self.report.add("failed", f"Couldn't check {movie.title}: {error}")
+        return movie._replace(next_check=NEVER)
+
+    def _handle_release(
+        self,
+        movie: MovieRecord,
+        dates: dict[Release, date],
+        today: date,
+        sql_today: str,
+    ) -> MovieRecord:
+        """Record what was found about the releases of a movie.
+
+        :param movie: The movie as read from the database.
+        :param dates: Earliest date of every kind of release.
+        :param today: Date of the check.
+        :param sql_today: ``today`` as stored in the database.
+        :return: The new record of the movie.
+        """
+        release, release_date = MovieWatcher.next_release(dates, today)
+        category = Scheduler.categorize(release_date, today, self.soon_window)
+        message = Report.describe_movie(
+            movie.title, category, release, release_date, self.soon_window
+        )
+        self.report.add(category, message)
+
+        # Like for seasons, the user is notified once when a release is
+        # coming soon, and once more when it is out, which is stored once
+        # the digest has been shown.
+        notified = None
+        if category in NOTIFIED_CATEGORIES and release is not None:
+            notified = f"{category}:{release.value}"
+            if notified != movie.notified:
+                self.news.add(
+                    category, message, NotifiedMark(movie.id, notified, sql_today)
+                )
+                notified = movie.notified
+
+        if category == "new" and release == Release.DIGITAL:
+            # Nothing more to come, but the release date may be moved.
+            next_check = today + NOTHING_INTERVAL
+        else:
+            next_check = Scheduler.next_check(
+                category,
+                release_date,
+                today,
+                season_found=release is not None,
+                soon_window=self.soon_window,
+            )
+        return MovieRecord(
+            id=movie.id,
+            title=movie.title,
+            checks=movie.checks + 1,
+            last_notified=movie.last_notified,
+            last_changed=sql_today,
+            next_check=Utils.python_date_to_sql_date(next_check),
+            status=category,
+            release=None if release is None else release.value,
+            release_date=(
+                None
+                if release_date is None
+                else Utils.python_date_to_sql_date(release_date)
+            ),
+            notified=notified,
+        )
@@ -0,0 +1,168 @@
+import logging
+import threading
+from typing import Any, Final
+
+from seasonwatch.profiling import Profiler
+from seasonwatch.sql import NotifiedMark
+
+APP_NAME: Final[str] = "Seasonwatch"
+# Seasons listed in the digest, the rest are only counted.
+DIGEST_MAX_LINES: Final[int] = 8
+# Milliseconds to show a digest with seasons that are out already.
+NEW_TIMEOUT: Final[int] = 10000
+# Seconds to wait for the notification to be shown before exiting.
+DISPATCH_TIMEOUT: Final[float] = 5.0
+
+_notify: Any = None
+
+
+class News:
+    """Seasons and movies to notify the user about, by category.
+
+    Only the messages that fit in the digest are kept, and the rest are
+    counted. What to store about every season and movie once the digest
+    has been shown is kept in ``marks``.
+    """
+
+    __slots__ = ("counts", "messages", "marks")
+
+    def __init__(self) -> None:
+        self.counts = {"new": 0, "soon": 0}
+        self.messages: dict[str, list[str]] = {"new": [], "soon": []}
+        self.marks: list[NotifiedMark] = []
+
+    def add(
+        self, category: str, message: str, mark: NotifiedMark | None = None
+    ) -> None:
+        """Add news about a season that is "new" or coming "soon".
+
+        :param mark: What to store with ``Sql.mark_notified`` once the
+            user has been notified.
+        """
+        self.counts[category] += 1
+        if len(self.messages[category]) < DIGEST_MAX_LINES:
+            self.messages[category].append(message)
+        if mark is not None:
+            self.marks.append(mark)
+
+
+class Dispatch(threading.Thread):
+    """Thread showing a notification, telling whether it was shown."""
+
+    def __init__(self, summary: str, body: str, timeout: int | None) -> None:
+        super().__init__(name="notify", daemon=True)
+        self.summary = summary
+        self.body = body
+        self.timeout = timeout
+        self.shown = False
+
+    def run(self) -> None:
+        try:
+            Notifier.notify(self.summary, self.body, timeout=self.timeout)
+        except Exception as e:
+            logging.error(f"Couldn't show the notification: {e}")
+        else:
+            self.shown = True
+
+
+class Notifier:
+    """Desktop notifications through libnotify.
+
+    GObject introspection is slow to load, so libnotify is only loaded
+    and initialized when the first notification is actually sent.
+    """
+
+    @staticmethod
+    def load() -> Any:
+        """Return the initialized libnotify module, loading it if needed."""
+        global _notify
+        if _notify is None:
+            import gi
+
+            gi.require_version("Notify", "0.7")
+            from gi.repository import Notify
+
+            Notify.init(APP_NAME)
+            _notify = Notify
+        return _notify
+
+    @staticmethod
+    def notify(title: str, message: str, timeout: int | None = None) -> None:
+        """Show a desktop notification.
+
+        :param title: Summary of the notification.
+        :param message: Body of the notification.
+        :param timeout: Milliseconds to show the notification for, or
+            None to let the notification server decide.
+        """
+        with Profiler.span("notify", "notify", title=title):
+            notification = Notifier.load().Notification.new(title, message)
+            if timeout is not None:
+                notification.set_timeout(timeout)
+            notification.show()
+
+    @staticmethod
+    def digest(news: News, label: str | None = None) -> tuple[str, str] | None:
+        """Sum up the news about all TV shows and movies in one notification.
+
+        :param news: Seasons and movies that are "new" or coming "soon".
+        :param label: Whose news it is, put before the summary.
+        :return: Summary and body of the notification, or None if there
+            is no news.
+        """
+        new = news.counts["new"]
+        soon = news.counts["soon"]
+        if not new and not soon:
+            return None
+
+        counts = []
+        if new:
+            counts.append(f"{new} out now")
+        if soon:
+            counts.append(f"{soon} coming soon")
+        lines = (news.messages["new"] + news.messages["soon"])[:DIGEST_MAX_LINES]
+        if new + soon > DIGEST_MAX_LINES:
+            lines.append(
+                f"...and {new + soon - DIGEST_MAX_LINES} more, "
+                "see 'seasonwatch report'"
+            )
+        summary = ", ".join(counts)
+        if label is not None:
+            summary = f"{label}: {summary}"
+        return summary, "\n".join(lines)
+
+    @staticmethod
+    def dispatch(news: News, label: str | None = None) -> Dispatch | None:
+        """Show the digest of ``news`` without waiting for it.
+
+        Showing a notification is a round trip to the notification
+        server, so it is done in a background thread to not hold up the
+        run. Pass the returned thread to ``wait`` before exiting.
+
+        :return: The thread showing the notification, or None if there
+            is no news.
+        """
+        digest = Notifier.digest(news, label)
+        if digest is None:
+            return None
+        summary, body = digest
+        timeout = NEW_TIMEOUT if news.counts["new"] else None
+        thread = Dispatch(summary, body, timeout)
+        thread.start()
+        return thread
+
+    @staticmethod
+    def wait(thread: Dispatch | None) -> bool:
+        """Wait a while for a dispatched notification to be shown.
+
+        :return: Whether the notification was shown, True if there was
+            nothing to show. A notification that wasn't shown in time is
+            taken as not shown, so the news is shown again next time.
+        """
+        if thread is None:
+            return True
+        thread.join(DISPATCH_TIMEOUT)
+        if thread.is_alive():
+            logging.warning("The notification server didn't respond in time")
+            return False
+        return thread.shown
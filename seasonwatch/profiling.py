@@ -0,0 +1,101 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Iterator, ParamSpec, TypeVar
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_enabled: bool = False
+_events: list[dict[str, Any]] = []
+_thread_names: dict[int, str] = {}
+_lock = threading.Lock()
+
+
+class Profiler:
+    """Timings of the phases of a run, in Chrome trace event format.
+
+    Nothing is recorded unless the profiler has been enabled, so spans
+    can be left in place at no noticeable cost. The written trace can
+    be opened in for example chrome://tracing or https://ui.perfetto.dev.
+    """
+
+    @staticmethod
+    def enable() -> None:
+        """Start recording spans."""
+        global _enabled
+        _enabled = True
+
+    @staticmethod
+    def enabled() -> bool:
+        return _enabled
+
+    @staticmethod
+    @contextmanager
+    def span(name: str, category: str = "seasonwatch", **args: Any) -> Iterator[None]:
+        """Record the time spent in the block as a complete event.
+
+        :param name: Name of the span.
+        :param category: Category of the span, e.g. "http" or "sql".
+        :param args: Extra data to show for the span.
+        """
+        if not _enabled:
+            yield
+            return
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end = time.perf_counter_ns()
+            thread_id = threading.get_ident()
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": "X",
+                "ts": start / 1000,
+                "dur": (end - start) / 1000,
+                "pid": os.getpid(),
+                "tid": thread_id,
+                "args": args,
+            }
+            with _lock:
+                _events.append(event)
+                _thread_names[thread_id] = threading.current_thread().name
+
+    @staticmethod
+    def traced(category: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+        """Decorate a function to record every call to it as a span."""
+
+        def decorator(function: Callable[P, R]) -> Callable[P, R]:
+            @wraps(function)
+            def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+                if not _enabled:
+                    return function(*args, **kwargs)
+                with Profiler.span(function.__qualname__, category):
+                    return function(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+    @staticmethod
+    def write(path: str) -> None:
+        """Write the recorded spans as a JSON trace to ``path``."""
+        with _lock:
+            events = list(_events)
+            thread_names = dict(_thread_names)
+        metadata = [
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "tid": tid,
+                "args": {"name": name},
+            }
+            for tid, name in thread_names.items()
+        ]
+        with open(path, mode="w") as fp:
+            json.dump({"traceEvents": metadata + events}, fp)
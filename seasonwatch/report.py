@@ -0,0 +1,230 @@
+import sys
+from datetime import date, timedelta
+from tempfile import SpooledTemporaryFile
+from typing import Final, Iterator
+
+from seasonwatch.constants import Release
+from seasonwatch.scheduler import SOON_WINDOW, Scheduler
+from seasonwatch.sql import Sql
+
+# Categories of the report, in the order they are printed.
+CATEGORIES: Final[list[str]] = ["new", "soon", "later", "nothing", "failed"]
+# Bytes of messages kept in memory per category before spilling to disk.
+SPOOL_SIZE: Final[int] = 1024 * 1024
+# Lines printed per write.
+PRINT_BATCH: Final[int] = 1000
+# Numbers spelled out in messages.
+NUMBER_WORDS: Final[
+    list[str]
+] = "zero one two three four five six seven eight nine ten eleven twelve".split()
+
+
+class ReportLines:
+    """Messages of a report by category, for printing them in order.
+
+    The messages of each category are kept in memory up to
+    ``SPOOL_SIZE`` bytes and in a temporary file beyond that, so a
+    report on a watchlist of any size takes the same memory. Use it as
+    a context manager, or call ``close``, to remove the files when done.
+    """
+
+    def __init__(self) -> None:
+        self._files = {
+            category: SpooledTemporaryFile(max_size=SPOOL_SIZE)
+            for category in CATEGORIES
+        }
+        self._counts = dict.fromkeys(CATEGORIES, 0)
+
+    def add(self, category: str, message: str) -> None:
+        """Add a message to the end of ``category``."""
+        self._files[category].write(message.encode() + b"\n")
+        self._counts[category] += 1
+
+    def count(self, category: str | None = None) -> int:
+        """Return the number of messages in ``category``, or in all."""
+        if category is None:
+            return sum(self._counts.values())
+        return self._counts[category]
+
+    def messages(self, category: str) -> Iterator[str]:
+        """Yield the messages of ``category`` in the order added."""
+        file = self._files[category]
+        file.seek(0)
+        for line in file:
+            yield line[:-1].decode()
+        file.seek(0, 2)
+
+    def close(self) -> None:
+        """Throw away the messages, removing any temporary file."""
+        for file in self._files.values():
+            file.close()
+
+    def __enter__(self) -> "ReportLines":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class Report:
+    """What is known about the next seasons of the TV shows.
+
+    The messages are the same whether they come from a check that was
+    just made, or from what the last checks stored in the database.
+    """
+
+    @staticmethod
+    def describe(
+        title: str,
+        season: int,
+        category: str,
+        air_date: date | None,
+        season_found: bool,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> str:
+        """Return the message about the next season of a TV show.
+
+        :param title: Title of the TV show.
+        :param season: Number of the next season.
+        :param category: One of "new", "soon", "later" or "nothing".
+        :param air_date: Air date of the next season, if known.
+        :param season_found: Whether TMDB knows about the next season.
+        :param soon_window: How far ahead a season counts as soon.
+        """
+        if category == "new":
+            return f"Season {season} of {title} is out already!"
+        if category == "soon" and air_date is not None:
+            return (
+                f"Season {season} of {title} is not yet out but "
+                f"will be released on {air_date.strftime('%B %-d, %Y')}."
+            )
+        if category == "later":
+            return (
+                f"Season {season} of {title} coming up, "
+                f"in more than {Report.describe_window(soon_window)}"
+            )
+        if season_found:
+            return f"Season {season} of {title} coming up, the release date is unknown"
+        return f"No season {season} found for {title}"
+
+    @staticmethod
+    def describe_movie(
+        title: str,
+        category: str,
+        release: Release | None,
+        release_date: date | None,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> str:
+        """Return the message about the next release of a movie.
+
+        :param title: Title of the movie.
+        :param category: One of "new", "soon", "later" or "nothing".
+        :param release: Which release ``category`` is about, if any.
+        :param release_date: Date of ``release``, if known.
+        :param soon_window: How far ahead a release counts as soon.
+        """
+        how = "in theaters" if release == Release.THEATRICAL else "digitally"
+        if category == "new":
+            return f"{title} is out {how}!"
+        if category == "soon" and release_date is not None:
+            return (
+                f"{title} is not yet out {how} but will be released on "
+                f"{release_date.strftime('%B %-d, %Y')}."
+            )
+        if category == "later":
+            return (
+                f"{title} coming out {how}, "
+                f"in more than {Report.describe_window(soon_window)}"
+            )
+        return f"No release date found for {title}"
+
+    @staticmethod
+    def describe_window(window: timedelta) -> str:
+        """Return ``window`` in words, like "three months".
+
+        Whole months are counted as 30 days.
+        """
+        days = window.days
+        for unit, length in [("month", 30), ("week", 7), ("day", 1)]:
+            if days % length == 0:
+                count = days // length
+                break
+        number = NUMBER_WORDS[count] if count < len(NUMBER_WORDS) else str(count)
+        return f"{number} {unit}{'' if count == 1 else 's'}"
+
+    @staticmethod
+    def from_database(today: date, soon_window: timedelta = SOON_WINDOW) -> ReportLines:
+        """Rebuild the report from what the last checks found.
+
+        The categories are worked out again for ``today``, so a season
+        that was coming out soon at the last check may be out now. TV
+        shows and movies that haven't been checked yet are left out. TV
+        shows come first, then movies, like in a check.
+
+        :param soon_window: How far ahead a season or release counts as
+            soon.
+        """
+        lines = ReportLines()
+        for title, last_season, next_air_date, season_found in Sql.iter_statuses():
+            # Much faster than strptime, which adds up for long watchlists.
+            air_date = (
+                None
+                if next_air_date is None
+                else date.fromisoformat(next_air_date[:10])
+            )
+            category = Scheduler.categorize(air_date, today, soon_window)
+            lines.add(
+                category,
+                Report.describe(
+                    title,
+                    last_season + 1,
+                    category,
+                    air_date,
+                    season_found,
+                    soon_window,
+                ),
+            )
+        for title, release, release_date in Sql.iter_movie_statuses():
+            released = (
+                None if release_date is None else date.fromisoformat(release_date[:10])
+            )
+            category = Scheduler.categorize(released, today, soon_window)
+            lines.add(
+                category,
+                Report.describe_movie(
+                    title,
+                    category,
+                    None if release is None else Release(release),
+                    released,
+                    soon_window,
+                ),
+            )
+        return lines
+
+    @staticmethod
+    def show(lines: ReportLines) -> None:
+        """Print the report.
+
+        :param lines: Messages about TV shows, by category.
+        """
+        from colorama import Fore, Style, just_fix_windows_console
+
+        # Unlike init, safe to call on every report, e.g. by the daemon,
+        # and leaves stdout alone everywhere but on old Windows consoles.
+        just_fix_windows_console()
+        # Printed in large batches, since colorama handles every write
+        # to old Windows consoles separately, which is slow for long
+        # watchlists.
+        batch: list[str] = []
+        for category, color in zip(
+            CATEGORIES, [Fore.BLUE, Fore.GREEN, "", "", Fore.RED]
+        ):
+            reset = Style.RESET_ALL if color else ""
+            for message in lines.messages(category):
+                batch.append(color + message + reset)
+                if len(batch) >= PRINT_BATCH:
+                    sys.stdout.write("\n".join(batch) + "\n")
+                    batch = []
+        if batch:
+            sys.stdout.write("\n".join(batch) + "\n")
+        sys.stdout.flush()
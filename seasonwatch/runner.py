@@ -0,0 +1,198 @@
+import logging
+from argparse import Namespace
+from configparser import ConfigParser
+from datetime import date, datetime, timezone
+
+from seasonwatch.cache import DEFAULT_MAX_AGE, MAX_SIZE, ResponseCache
+from seasonwatch.client import TmdbClient
+from seasonwatch.constants import Constants
+from seasonwatch.exceptions import ConfigException, SeasonwatchException
+from seasonwatch.media_watcher import MediaWatcher
+from seasonwatch.movie_watcher import MovieWatcher
+from seasonwatch.notifier import Notifier
+from seasonwatch.profiling import Profiler
+from seasonwatch.report import Report
+from seasonwatch.scheduler import Scheduler
+from seasonwatch.sql import TV_CHANGES_SYNCED_KEY, Sql
+from seasonwatch.transport import Transport, TransportSettings
+from seasonwatch.utils import Utils
+
+
+class Runner:
+    """Check for new seasons and report them.
+
+    The connections to TMDB and the response cache are kept between
+    checks, so that a long-running process only sets them up once.
+    """
+
+    def __init__(self, args: Namespace, config: ConfigParser) -> None:
+        """Set up the transport and cache used for checks.
+
+        :param args: The parsed command line arguments.
+        :param config: The parsed configuration file.
+        :raises ConfigException: If no TMDB token is configured, or the
+            network or schedule settings are invalid.
+        """
+        self.args = args
+        # Every worker checking TV shows should be able to keep its own
+        # connection to TMDB alive instead of waiting for a free one.
+        self.settings = TransportSettings.from_config(config, args.concurrency)
+        self.transport = Transport.create(self.settings)
+        # Shared by all checks, so that the rate limit holds across them.
+        self.client = TmdbClient(self.transport)
+        self.cache: ResponseCache | None = None
+        self.configure(config)
+
+    def configure(self, config: ConfigParser) -> None:
+        """Apply the token, network, cache, schedule and movie settings.
+
+        :raises ConfigException: If no TMDB token is configured, or the
+            network or schedule settings are invalid.
+        """
+        tmdb_token = config.get("Tokens", "tmdb_token", fallback=None)
+        if tmdb_token is None:
+            raise ConfigException("No TMDB token is configured")
+        settings = TransportSettings.from_config(config, self.args.concurrency)
+        if settings != self.settings:
+            transport = Transport.create(settings)
+            self.transport.close()
+            self.settings = settings
+            self.transport = transport
+            self.client = TmdbClient(self.transport)
+        self.transport.headers.update(
+            {
+                "accept": "application/json",
+                "Authorization": f"Bearer {tmdb_token}",
+            }
+        )
+
+        self.region = config.get("Movies", "region", fallback=None)
+        self.soon_window = Scheduler.soon_window_from_config(config)
+
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        if self.args.use_cache:
+            self.cache = ResponseCache(
+                max_age=config.getint("Cache", "max_age", fallback=DEFAULT_MAX_AGE),
+                max_size=config.getint("Cache", "max_size", fallback=MAX_SIZE),
+            )
+
+    def close(self) -> None:
+        """Close the connections and the cache."""
+        if self.cache is not None:
+            self.cache.close()
+            self.cache = None
+        self.transport.close()
+
+    def run(self) -> int:
+        """Check for new seasons and movie releases once.
+
+        TV shows and movies are checked one after the other with the
+        same connections and cache, and their results are printed in
+        one report and notified in one notification. What the user is
+        notified about is only stored once the notification has been
+        shown.
+
+        :return: Exit code, 0 if the check succeeded.
+        """
+        watcher = MediaWatcher(self.soon_window)
+        # Removes the temporary files of a large report when done.
+        with watcher.report:
+            try:
+                return self._check(watcher)
+            finally:
+                if self.cache is not None:
+                    with Profiler.span("evict"):
+                        self.cache.evict()
+
+    def _check(self, watcher: MediaWatcher) -> int:
+        """Make the check of ``run``, collecting the results in ``watcher``.
+
+        :return: Exit code, 0 if the check succeeded.
+        """
+        # TMDB reports changes per day in UTC, and the day of the last
+        # sync is included again since it might not have been over then.
+        sync_started = datetime.now(timezone.utc).date()
+        changed_ids: set[str] | None = None
+        check_all = False
+        synced = False
+        try:
+            if self.args.delta:
+                last_sync = Sql.read_meta(TV_CHANGES_SYNCED_KEY)
+                since = None if last_sync is None else date.fromisoformat(last_sync)
+                if (
+                    since is None
+                    or (sync_started - since).days >= Constants.CHANGES_MAX_DAYS
+                ):
+                    print("No recent sync with TMDB changes, checking all TV shows.")
+                    check_all = True
+                    synced = True
+                else:
+                    try:
+                        with Profiler.span("read changes"):
+                            changed_ids = Utils.get_changed_series(
+                                since, sync_started, self.client
+                            )
+                        synced = True
+                    except SeasonwatchException as e:
+                        # Without knowing what changed, any TV show may
+                        # have a new season.
+                        logging.error(
+                            "Couldn't get the TV shows changed on TMDB, checking "
+                            f"all TV shows instead: {e}"
+                        )
+                        check_all = True
+
+            watcher.check_for_new_seasons(
+                client=self.client,
+                concurrency=self.args.concurrency,
+                cache=self.cache,
+                force=self.args.force or check_all,
+                changed_ids=changed_ids,
+                lookup=self.args.lookup,
+            )
+            # TMDB only reports changes of TV shows, so movies are
+            # always checked when they are due.
+            MovieWatcher(
+                watcher.report,
+                watcher.news,
+                region=self.region,
+                soon_window=self.soon_window,
+            ).check_for_releases(
+                client=self.client,
+                concurrency=self.args.concurrency,
+                cache=self.cache,
+                force=self.args.force,
+            )
+        except SeasonwatchException as e:
+            logging.error(
+                f"Seasonwatch encountered an error when checking for new seasons: {e}"
+            )
+            return 1
+
+        if synced:
+            Sql.write_meta(TV_CHANGES_SYNCED_KEY, sync_started.isoformat())
+
+        # Shown while the report is printed, and only waited for at the
+        # end, so a slow notification server doesn't hold up the run.
+        notification = Notifier.dispatch(watcher.news)
+        with Profiler.span("report"):
+            Report.show(watcher.report)
+
+        if watcher.unmigrated:
+            print(
+                f"{watcher.unmigrated} TV shows still have IMDb IDs and were not "
+                "checked. Run 'seasonwatch migrate' to move them to TMDB."
+            )
+
+        if Notifier.wait(notification):
+            Sql.mark_notified(watcher.news.marks)
+        failed = watcher.report.count("failed")
+        if failed:
+            logging.error(
+                f"{failed} TV shows or movies couldn't be checked, they will be "
+                "checked again on the next run"
+            )
+            return 1
+        return 0
@@ -0,0 +1,157 @@
+from configparser import ConfigParser
+from datetime import date, timedelta
+from typing import Final, Iterable
+
+from seasonwatch.exceptions import ConfigException, SeasonwatchException
+
+# Seasons that are out are checked daily so that the user keeps being
+# reminded until the last watched season is stepped up.
+NEW_INTERVAL: Final[timedelta] = timedelta(days=1)
+# Seasons coming out soon are checked once a week, and daily during the
+# last two weeks before the air date, to catch postponements.
+SOON_INTERVAL: Final[timedelta] = timedelta(days=7)
+SOON_DAILY_WINDOW: Final[timedelta] = timedelta(days=14)
+# Seasons coming out later are checked at most once a month, and around
+# the time they start counting as coming out soon.
+LATER_MIN_INTERVAL: Final[timedelta] = timedelta(days=7)
+LATER_MAX_INTERVAL: Final[timedelta] = timedelta(days=30)
+# Seasons count as coming out soon this far ahead, unless configured.
+SOON_WINDOW: Final[timedelta] = timedelta(days=90)
+# An announced season without an air date usually gets one within weeks,
+# while an unannounced season is unlikely to appear from one day to the
+# next.
+UNKNOWN_DATE_INTERVAL: Final[timedelta] = timedelta(days=7)
+NOTHING_INTERVAL: Final[timedelta] = timedelta(days=14)
+
+
+class Scheduler:
+    """Decide when a TV show needs to be checked again."""
+
+    @staticmethod
+    def soon_window_from_config(config: ConfigParser) -> timedelta:
+        """Read how far ahead a season counts as soon from [Schedule].
+
+        :raises ConfigException: If the setting is not a positive number
+            of days.
+        """
+        try:
+            days = config.getint("Schedule", "soon_days", fallback=SOON_WINDOW.days)
+        except ValueError as e:
+            raise ConfigException(f"Invalid setting in [Schedule]: {e}")
+        if days < 1:
+            raise ConfigException(
+                f"Invalid setting in [Schedule]: soon_days must be at least 1: {days}"
+            )
+        return timedelta(days=days)
+
+    @staticmethod
+    def categorize(
+        air_date: date | None, today: date, soon_window: timedelta = SOON_WINDOW
+    ) -> str:
+        """Return what the next season of a TV show means to the user.
+
+        :param air_date: Air date of the next season, if known.
+        :param today: Date to categorize for.
+        :param soon_window: How far ahead a season counts as soon.
+        :return: "new" if the season is out, "soon" if it comes out
+            within ``soon_window``, "later" if it comes out after that,
+            and "nothing" if there is no air date.
+        """
+        if air_date is None:
+            return "nothing"
+        if air_date <= today:
+            return "new"
+        if air_date <= today + soon_window:
+            return "soon"
+        return "later"
+
+    @staticmethod
+    def categorize_many(
+        air_dates: Iterable[date | None],
+        today: date,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> list[str]:
+        """Categorize the air dates of many seasons in one pass.
+
+        Gives the same result as ``categorize`` for every air date, but
+        the limits of the categories are worked out once for all of
+        them.
+
+        :param air_dates: Air dates of the next seasons, where known.
+        :param today: Date to categorize for.
+        :param soon_window: How far ahead a season counts as soon.
+        :return: The category of every air date, in the same order.
+        """
+        soon_until = today + soon_window
+        return [
+            "nothing"
+            if air_date is None
+            else "new"
+            if air_date <= today
+            else "soon"
+            if air_date <= soon_until
+            else "later"
+            for air_date in air_dates
+        ]
+
+    @staticmethod
+    def parse_air_date(raw: str) -> date:
+        """Parse an air date as returned by TMDB.
+
+        TMDB uses ISO 8601 dates, which are parsed directly. Anything
+        else goes through dateutil, which is much slower.
+
+        :raises SeasonwatchException: If ``raw`` is not a date.
+        """
+        try:
+            return date.fromisoformat(raw[:10])
+        except ValueError:
+            pass
+        from dateutil.parser import ParserError, parse
+
+        try:
+            return parse(raw).date()
+        except (ParserError, OverflowError):
+            raise SeasonwatchException(f"Malformed air date returned from TMDB: {raw}")
+
+    @staticmethod
+    def next_check(
+        category: str,
+        air_date: date | None,
+        today: date,
+        season_found: bool = True,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> date:
+        """Return the first date when a TV show is due for a new check.
+
+        The interval depends on how close the next season is to being
+        released. Shows with nothing coming up back off, while shows
+        with a season coming out soon are checked more often the closer
+        the air date gets.
+
+        :param category: What the last check found, one of "new",
+            "soon", "later" or "nothing".
+        :param air_date: Air date of the next season, if known.
+        :param today: Date of the check.
+        :param season_found: Whether TMDB knows about the next season at
+            all, even if it has no air date yet.
+        :param soon_window: How far ahead a season counts as soon.
+        :return: Date of the next check.
+        """
+        if category == "new":
+            return today + NEW_INTERVAL
+
+        if category == "soon" and air_date is not None:
+            if air_date - today <= SOON_DAILY_WINDOW:
+                return today + NEW_INTERVAL
+            return min(today + SOON_INTERVAL, air_date - SOON_DAILY_WINDOW)
+
+        if category == "later" and air_date is not None:
+            until_soon = air_date - soon_window - today
+            interval = max(LATER_MIN_INTERVAL, min(LATER_MAX_INTERVAL, until_soon))
+            return today + interval
+
+        if not season_found:
+            return today + NOTHING_INTERVAL
+
+        return today + UNKNOWN_DATE_INTERVAL
@@ -0,0 +1,85 @@
+from typing import TYPE_CHECKING, Callable
+from urllib.parse import quote
+
+from seasonwatch.constants import Constants
+from seasonwatch.exceptions import HttpException, SeasonwatchException
+from seasonwatch.profiling import Profiler
+from seasonwatch.sql import SearchResult, Sql
+
+if TYPE_CHECKING:
+    from seasonwatch.client import TmdbClient
+
+
+class Search:
+    """Find TV shows by title, on TMDB or among those found before.
+
+    Everything TMDB finds is kept in a full-text index in the database,
+    so searching for the same TV show again, or for the start of its
+    title, is answered right away without contacting TMDB.
+    """
+
+    @staticmethod
+    def find(
+        text: str, client: Callable[[], "TmdbClient"], local: bool = True
+    ) -> tuple[list[SearchResult], bool]:
+        """Find TV shows with titles matching ``text``.
+
+        :param text: Words of the title, or the starts of them.
+        :param client: Function returning the client for requests to
+            TMDB, only called if TMDB has to be asked.
+        :param local: Look among the TV shows found before first.
+        :raises SeasonwatchException: If TMDB has to be asked but can't
+            be reached, or responds with an error or malformed data.
+        :return: The TV shows found, best matches first, and whether they
+            were found by TMDB just now.
+        """
+        if local:
+            results = Sql.search_results(text)
+            if results:
+                return results, False
+        results = Search.tmdb(text, client())
+        Sql.write_search_results(results)
+        return results, True
+
+    @staticmethod
+    @Profiler.traced("http")
+    def tmdb(text: str, client: "TmdbClient") -> list[SearchResult]:
+        """Search for TV shows on TMDB.
+
+        :param text: Title, or part of it, to search for.
+        :param client: Client for making requests to TMDB.
+        :raises SeasonwatchException: If TMDB can't be reached, or
+            responds with an error or malformed data.
+        :return: The first page of TV shows found, best matches first.
+        """
+        url = (
+            f"{Constants.API_BASE_URL}/search/tv"
+            f"?query={quote(text)}&include_adult=false&page=1"
+        )
+        try:
+            response = client.get(url)
+            response.raise_for_status()
+            response_json = response.json()
+        except HttpException as e:
+            raise SeasonwatchException(f"Failure searching for TV shows on TMDB: {e}")
+        except ValueError as e:
+            raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
+        if not isinstance(response_json, dict) or not isinstance(
+            response_json.get("results"), list
+        ):
+            raise SeasonwatchException(
+                "Malformed data returned from TMDB when searching for TV shows."
+            )
+
+        return [
+            SearchResult(
+                id=str(result["id"]),
+                title=str(result.get("name") or result.get("original_name")),
+                original_title=result.get("original_name") or None,
+                first_air_date=result.get("first_air_date") or None,
+            )
+            for result in response_json["results"]
+            if isinstance(result, dict)
+            and result.get("id") is not None
+            and (result.get("name") or result.get("original_name"))
+        ]
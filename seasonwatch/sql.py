@@ -1,13 +1,26 @@
 import os
-import shutil
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+from enum import Enum
 from pathlib import Path
-from typing import Any, Final, TypedDict
+from typing import (
+    Any,
+    Callable,
+    Final,
+    Generic,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    TypeVar,
+)
 
 import apsw
-from prettytable.prettytable import from_db_cursor
 
 from seasonwatch.constants import Source
 from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.profiling import Profiler
+from seasonwatch.scheduler import SOON_WINDOW, Scheduler
 from seasonwatch.utils import Utils
 
 DATA_DIRECTORY: Final[Path] = Path(
@@ -19,23 +32,295 @@ DATA_DIRECTORY: Final[Path] = Path(
 DATABASE_FILE: Final[str] = "database.sqlite"
 DATABASE_PATH: Final[str] = str(DATA_DIRECTORY / DATABASE_FILE)
 
-N_BACKUPS: Final[int] = 10
+NEVER: Final[str] = "1970-01-01 00:00:00"
 
 SERIES_TABLE: Final[str] = "series"
 MOVIES_TABLE: Final[str] = "movies"
+META_TABLE: Final[str] = "meta"
+MIGRATIONS_TABLE: Final[str] = "imdb_migrations"
+SEARCH_TABLE: Final[str] = "tv_search_results"
+# Full-text indexes of the titles in the series and search tables.
+SERIES_TITLES_INDEX: Final[str] = "series_titles"
+SEARCH_TITLES_INDEX: Final[str] = "tv_search_titles"
+
+# Most matches returned when looking up titles.
+SEARCH_LIMIT: Final[int] = 20
+
+# Rows read from the series table at a time when streaming it.
+READ_PAGE_SIZE: Final[int] = 1000
+# Milliseconds to wait for another process to finish writing, before
+# giving up with a busy error.
+BUSY_TIMEOUT: Final[int] = 10_000
+
+DATA_VERSION_KEY: Final[str] = "data_version"
+# Version of the schema that ``Sql.ensure_table`` migrates databases to.
+# Has to be increased whenever it changes the schema.
+SCHEMA_VERSION: Final[int] = 1
+SCHEMA_VERSION_KEY: Final[str] = "schema_version"
+TV_CHANGES_SYNCED_KEY: Final[str] = "tv_changes_synced"
+
+_connection: apsw.Connection | None = None
+_database_path: str = DATABASE_PATH
+
+
+class DBRecord(NamedTuple):
+    """A series as read from the series table.
 
+    A tuple rather than a dict, since a check may hold many of them at
+    once.
+    """
 
-class DBRecord(TypedDict):
     id: str
     title: str
-    last_season: str
-    last_check: str
+    last_season: int
+    checks: int
     last_notified: str
     last_changed: str
     id_source: Source
+    next_check: str
+    status: str | None
+    next_air_date: str | None
+    season_found: bool | None
+    notified: str | None
+
+
+class SeriesUpdate(NamedTuple):
+    """Complete new record of a series, as written to the series table.
+
+    ``update_many_series`` only writes what a check finds, and uses the
+    last watched season to tell whether the user has changed the series
+    since the check read it.
+    """
+
+    id: str
+    title: str
+    last_season: int
+    checks: int
+    last_change: str
+    last_notify: str
+    id_source: Source
+    next_check: str = NEVER
+    # What the last check found, the air date of the next season, and
+    # whether TMDB knew about the next season at all.
+    status: str | None = None
+    next_air_date: str | None = None
+    season_found: bool | None = None
+    # What the user was last notified about, as "<status>:<season>".
+    notified: str | None = None
+
+
+class MovieRecord(NamedTuple):
+    """A movie as read from and written to the movies table."""
+
+    id: str
+    title: str
+    checks: int = 0
+    last_notified: str = NEVER
+    last_changed: str = NEVER
+    next_check: str = NEVER
+    # What the last check found, and about which release: "theatrical"
+    # or "digital". The release date is of that release.
+    status: str | None = None
+    release: str | None = None
+    release_date: str | None = None
+    # What the user was last notified about, as "<status>:<release>".
+    notified: str | None = None
+
+
+class NotifiedMark(NamedTuple):
+    """What the user is being notified about for a series or movie.
+
+    Stored with ``mark_notified`` once the notification has been shown.
+    """
+
+    id: str
+    # As "<status>:<season>" for a series, "<status>:<release>" for a movie.
+    notified: str
+    date: str
+    # Last watched season of a series as read for the check, None for a
+    # movie.
+    last_season: int | None = None
+
+
+class WatchlistEntry(NamedTuple):
+    """What the user has entered about a series, as imported and exported."""
+
+    id: str
+    title: str
+    last_season: int
+    id_source: Source = Source.TMDB
+
+
+class SearchResult(NamedTuple):
+    """A TV show found on TMDB by searching for its title."""
+
+    id: str
+    title: str
+    original_title: str | None = None
+    first_air_date: str | None = None
+
+
+class MigrationStatus(Enum):
+    """How far the migration of a series from IMDb to TMDB has come."""
+
+    # The series has been moved to its TMDB ID.
+    RESOLVED = "resolved"
+    # TMDB found a series, but its title doesn't match. Needs review.
+    PENDING = "pending"
+    # TMDB found no series. Needs the TMDB ID from the user.
+    UNMATCHED = "unmatched"
+
+
+class IdMapping(NamedTuple):
+    """What TMDB knows about the IMDb ID of a series."""
+
+    imdb_id: str
+    status: MigrationStatus
+    tmdb_id: str | None = None
+    tmdb_title: str | None = None
+
+
+Update = TypeVar("Update")
+
+
+class PendingWrites(Generic[Update]):
+    """Unit of work collecting updates to write all at once.
+
+    Writing every record in its own transaction means waiting for the
+    disk once per record. Instead, the updates from for example a check
+    run are collected here and written in a single transaction when
+    ``flush`` is called.
+    """
+
+    def __init__(
+        self, write: Callable[[list[Update]], None], max_pending: int | None = None
+    ) -> None:
+        """Start collecting updates.
+
+        :param write: Function writing updates in one transaction.
+        :param max_pending: Flush whenever this many updates are queued,
+            so that long runs write in batches of bounded size. Only
+            flushed by ``flush`` if None.
+        """
+        self._write = write
+        self._pending: list[Update] = []
+        self.max_pending = max_pending
+        # Number of updates written so far.
+        self.written = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, update: Update) -> None:
+        """Queue an update to be written on the next flush."""
+        self._pending.append(update)
+        if self.max_pending is not None and len(self._pending) >= self.max_pending:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all queued updates to the database in one transaction."""
+        if not self._pending:
+            return
+        self._write(self._pending)
+        self.written += len(self._pending)
+        self._pending = []
+
+
+class SeriesUpdates(PendingWrites[SeriesUpdate]):
+    """Series updates collected to be written to the series table."""
+
+    def __init__(self, max_pending: int | None = None) -> None:
+        super().__init__(Sql.update_many_series, max_pending)
+
+
+class MovieUpdates(PendingWrites[MovieRecord]):
+    """Movie updates collected to be written to the movies table."""
+
+    def __init__(self, max_pending: int | None = None) -> None:
+        super().__init__(Sql.update_many_movies, max_pending)
 
 
 class Sql:
+    @staticmethod
+    def open(path: str) -> apsw.Connection:
+        """Open a connection to the database at ``path``.
+
+        The database is put in WAL mode, so that reading it never waits
+        for a check that is writing to it, or the other way around.
+        Writers still take turns, and wait up to ``BUSY_TIMEOUT`` for
+        each other. In WAL mode, syncing to disk at every checkpoint
+        rather than every commit can only lose the latest transactions
+        on a power failure, never corrupt the database.
+        """
+        connection = apsw.Connection(path)
+        connection.setbusytimeout(BUSY_TIMEOUT)
+        cursor = connection.cursor()
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        return connection
+
+    @staticmethod
+    def connection() -> apsw.Connection:
+        """Return the connection to the Seasonwatch database.
+
+        The connection is opened on first use and then shared by all
+        database operations, so that SQLite can reuse its cache of
+        prepared statements. Statements are serialized by apsw, so the
+        connection can be used from several threads, but transactions
+        should only be made from one of them.
+        """
+        global _connection
+        if _connection is None:
+            _connection = Sql.open(_database_path)
+        return _connection
+
+    @staticmethod
+    def use_database(path: str) -> None:
+        """Use the database at ``path`` instead of the user's own.
+
+        The connection to the current database is closed, and the next
+        database operation opens ``path``. Meant for working with the
+        databases of several users in turn.
+        """
+        global _database_path
+        Sql.close()
+        _database_path = path
+
+    @staticmethod
+    def database_path() -> Path:
+        """Return the path of the database in use."""
+        return Path(_database_path)
+
+    @staticmethod
+    def close() -> None:
+        """Close the connection to the Seasonwatch database, if open."""
+        global _connection
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+    @staticmethod
+    @contextmanager
+    def transaction() -> Iterator[apsw.Cursor]:
+        """Run the statements of the block in a single transaction.
+
+        The transaction is committed when the block finishes and rolled
+        back if it raises an exception. It takes the write lock right
+        away, since a transaction that only asks for it at its first
+        write fails instead of waiting if another process wrote to the
+        database in the meantime.
+
+        :return: A cursor on the shared database connection.
+        """
+        cursor = Sql.connection().cursor()
+        cursor.execute("BEGIN IMMEDIATE TRANSACTION")
+        try:
+            yield cursor
+        except BaseException:
+            cursor.execute("ROLLBACK TRANSACTION")
+            raise
+        cursor.execute("COMMIT TRANSACTION")
+
     @staticmethod
     def ensure_id_source_exist(connection: apsw.Connection) -> None:
         """Add id_source column if missing.
@@ -46,7 +331,6 @@ class Sql:
         table_info = cursor.execute(f"""PRAGMA table_info({SERIES_TABLE})""")
         column_names = [row[1] for row in table_info]
         if "id_source" not in column_names:
-            cursor.execute("BEGIN TRANSACTION")
             cursor.execute(
                 f"""
                 ALTER TABLE {SERIES_TABLE}
@@ -60,27 +344,143 @@ class Sql:
                 SET id_source = '{Source.IMDB.value}';
                 """
             )
-            cursor.execute("COMMIT TRANSACTION")
             print(
                 "Column 'id_source' was missing from TV Series table. "
                 "All existing series have been given the ID source 'IMDb'"
             )
 
     @staticmethod
+    def ensure_next_check_exist(connection: apsw.Connection) -> None:
+        """Add next_check_at column if missing.
+
+        Ensure that 'next_check_at' column exists in the TV Series
+        table. Existing series are due for a check right away.
+        """
+        cursor = connection.cursor()
+        table_info = cursor.execute(f"""PRAGMA table_info({SERIES_TABLE})""")
+        column_names = [row[1] for row in table_info]
+        if "next_check_at" not in column_names:
+            cursor.execute(
+                f"""
+                ALTER TABLE {SERIES_TABLE}
+                ADD COLUMN next_check_at TEXT
+                DEFAULT '{NEVER}';
+                """
+            )
+
+    @staticmethod
+    def ensure_status_exist(connection: apsw.Connection) -> None:
+        """Add columns for the status of series, and indexes, if missing.
+
+        Ensure that the TV Series table can hold what the last check
+        found and what the user was notified about, and be queried by
+        it. Existing series have no status until they are checked.
+        """
+        cursor = connection.cursor()
+        table_info = cursor.execute(f"""PRAGMA table_info({SERIES_TABLE})""")
+        column_names = [row[1] for row in table_info]
+        for column, type in [
+            ("status", "TEXT"),
+            ("next_air_date", "TEXT"),
+            ("season_found", "INTEGER"),
+            ("notified", "TEXT"),
+        ]:
+            if column not in column_names:
+                cursor.execute(
+                    f"""
+                    ALTER TABLE {SERIES_TABLE}
+                    ADD COLUMN {column} {type};
+                    """
+                )
+        for column in ["status", "next_air_date"]:
+            cursor.execute(
+                f"""
+                CREATE INDEX IF NOT EXISTS {SERIES_TABLE}_{column}
+                ON {SERIES_TABLE} ({column});
+                """
+            )
+
+    @staticmethod
+    def ensure_movie_status_exist(connection: apsw.Connection) -> None:
+        """Add columns for checking movies, if missing.
+
+        Ensure that the movies table can hold when a movie is due for a
+        check, what the last check found and what the user was notified
+        about. Existing movies are due for a check right away.
+        """
+        cursor = connection.cursor()
+        table_info = cursor.execute(f"""PRAGMA table_info({MOVIES_TABLE})""")
+        column_names = [row[1] for row in table_info]
+        for column, definition in [
+            ("next_check_at", f"TEXT DEFAULT '{NEVER}'"),
+            ("status", "TEXT"),
+            ("release", "TEXT"),
+            ("release_date", "TEXT"),
+            ("notified", "TEXT"),
+        ]:
+            if column not in column_names:
+                cursor.execute(
+                    f"""
+                    ALTER TABLE {MOVIES_TABLE}
+                    ADD COLUMN {column} {definition};
+                    """
+                )
+
+    @staticmethod
+    @Profiler.traced("sql")
     def ensure_table() -> None:
         """Ensure that all expected tables exist in database.
 
         Ensure that all tables supported by Seasonwatch is present in
-        the Seasonwatch database.
+        the Seasonwatch database. The version of the schema is read
+        first, and the database is only locked for writing if it has to
+        be migrated, so that an up to date database is never waited for.
+        All of the migration is done in one transaction.
         """
-        if not DATA_DIRECTORY.exists():
-            DATA_DIRECTORY.mkdir(parents=True, exist_ok=True)
+        Path(_database_path).parent.mkdir(parents=True, exist_ok=True)
+        if Sql.schema_current():
+            return
 
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
+        connection = Sql.connection()
+        with Sql.transaction() as cursor:
+            # Another process may have migrated the database while this
+            # one was waiting for the write lock.
+            if Sql.schema_current():
+                return
+            Sql._create_tables(cursor)
+            Sql.ensure_id_source_exist(connection)
+            Sql.ensure_next_check_exist(connection)
+            Sql.ensure_status_exist(connection)
+            Sql.ensure_movie_status_exist(connection)
+            Sql.ensure_data_version_triggers(connection)
+            Sql.ensure_title_index(
+                connection, SERIES_TITLES_INDEX, SERIES_TABLE, ["title"]
+            )
+            Sql.ensure_title_index(
+                connection,
+                SEARCH_TITLES_INDEX,
+                SEARCH_TABLE,
+                ["title", "original_title"],
+            )
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES(?, ?);",
+                (SCHEMA_VERSION_KEY, SCHEMA_VERSION),
+            )
 
-        cursor.execute("BEGIN TRANSACTION")
+    @staticmethod
+    def schema_current() -> bool:
+        """Return whether the database is up to date with this version.
+
+        Only reads the database, and doesn't create it if missing.
+        """
+        if not Path(_database_path).exists():
+            return False
+        version = Sql.read_meta(SCHEMA_VERSION_KEY)
+        return version is not None and int(version) >= SCHEMA_VERSION
 
+    @staticmethod
+    def _create_tables(cursor: apsw.Cursor) -> None:
+        """Create the tables that are missing, using ``cursor``."""
         cursor.execute(
             f"""
             CREATE TABLE IF NOT EXISTS {MOVIES_TABLE} (
@@ -88,7 +488,12 @@ class Sql:
                 title TEXT NOT NULL UNIQUE,
                 number_of_checks INGEGER DEFAULT 0,
                 last_notified_date TEXT DEFAULT '1970-01-01 00:00:00',
-                last_change_date TEXT DEFAULT '1970-01-01 00:00:00'
+                last_change_date TEXT DEFAULT '1970-01-01 00:00:00',
+                next_check_at TEXT DEFAULT '{NEVER}',
+                status TEXT,
+                release TEXT,
+                release_date TEXT,
+                notified TEXT
             );
             """
         )
@@ -102,44 +507,306 @@ class Sql:
                 number_of_checks INGEGER DEFAULT 0,
                 last_notified_date TEXT DEFAULT '1970-01-01 00:00:00',
                 last_change_date TEXT DEFAULT '1970-01-01 00:00:00',
-                id_source TEXT DEFAULT '{Source.TMDB.value}'
+                id_source TEXT DEFAULT '{Source.TMDB.value}',
+                next_check_at TEXT DEFAULT '{NEVER}',
+                status TEXT,
+                next_air_date TEXT,
+                season_found INTEGER,
+                notified TEXT
             );
             """
         )
 
-        cursor.execute("COMMIT TRANSACTION")
-        connection.close()
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {META_TABLE} (
+                key TEXT NOT NULL PRIMARY KEY,
+                value
+            );
+            """
+        )
+
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} (
+                imdb_id TEXT NOT NULL PRIMARY KEY,
+                status TEXT NOT NULL,
+                tmdb_id TEXT,
+                tmdb_title TEXT,
+                looked_up_at TEXT NOT NULL
+            );
+            """
+        )
 
-        # Can the previous connection be reused instead?
-        connection = apsw.Connection(DATABASE_PATH)
-        Sql.ensure_id_source_exist(connection)
-        connection.close()
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (
+                id TEXT NOT NULL PRIMARY KEY,
+                title TEXT NOT NULL,
+                original_title TEXT,
+                first_air_date TEXT,
+                found_at TEXT NOT NULL
+            );
+            """
+        )
 
     @staticmethod
-    def backup_database() -> None:
-        """Backup a dated Seasonwatch database.
+    def ensure_data_version_triggers(connection: apsw.Connection) -> None:
+        """Count changes to the user's data in the meta table.
 
-        Create a backup of the Seasonwatch database and remove the
-        oldest backup if there are more than ``N_BACKUPS`` of them.
+        The 'data_version' value in the meta table is increased whenever
+        a series or movie is added, removed or changed by the user.
+        Bookkeeping done during checks doesn't count as a change.
         """
-        if not DATA_DIRECTORY.exists():
-            # Nothing to backup if data directory doesn't exist
+        cursor = connection.cursor()
+        cursor.execute(
+            f"""
+            INSERT OR IGNORE INTO {META_TABLE} (key, value)
+            VALUES('{DATA_VERSION_KEY}', 0);
+            """
+        )
+        for table, columns in [
+            (SERIES_TABLE, ["id", "title", "last_watched_season", "id_source"]),
+            (MOVIES_TABLE, ["id", "title"]),
+        ]:
+            changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)
+            for event, condition in [
+                ("INSERT", "1"),
+                ("DELETE", "1"),
+                ("UPDATE", changed),
+            ]:
+                cursor.execute(
+                    f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_{event.lower()}_data_version
+                    AFTER {event} ON {table}
+                    WHEN {condition}
+                    BEGIN
+                        UPDATE {META_TABLE}
+                        SET value = value + 1
+                        WHERE key = '{DATA_VERSION_KEY}';
+                    END;
+                    """
+                )
+
+    @staticmethod
+    def ensure_title_index(
+        connection: apsw.Connection, index: str, table: str, columns: list[str]
+    ) -> None:
+        """Add a full-text index of titles in ``table``, if missing.
+
+        The index is an FTS5 table over ``columns`` of ``table``, kept up
+        to date by triggers, so titles can be looked up by words and
+        prefixes of words without reading the whole table. Since checks
+        rewrite every series they check, the index is only touched when
+        a title actually changes.
+
+        :param index: Name of the index.
+        :param table: Table with the titles.
+        :param columns: Columns with titles in ``table``.
+        """
+        cursor = connection.cursor()
+        exists = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;",
+            (index,),
+        ).fetchone()
+        if exists:
             return
-        if Path(DATABASE_PATH).exists():
-            backup_path = Path(
-                DATA_DIRECTORY / str(Utils.timestamp() + "_database.sqlite")
+
+        names = ", ".join(columns)
+        new = ", ".join(f"NEW.{c}" for c in columns)
+        old = ", ".join(f"OLD.{c}" for c in columns)
+        changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)
+        cursor.execute(
+            f"""
+            CREATE VIRTUAL TABLE {index} USING fts5(
+                {names},
+                content='{table}',
+                content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            );
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER {index}_insert AFTER INSERT ON {table}
+            BEGIN
+                INSERT INTO {index} (rowid, {names}) VALUES (NEW.rowid, {new});
+            END;
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER {index}_delete AFTER DELETE ON {table}
+            BEGIN
+                INSERT INTO {index} ({index}, rowid, {names})
+                VALUES ('delete', OLD.rowid, {old});
+            END;
+            """
+        )
+        cursor.execute(
+            f"""
+            CREATE TRIGGER {index}_update AFTER UPDATE ON {table}
+            WHEN {changed}
+            BEGIN
+                INSERT INTO {index} ({index}, rowid, {names})
+                VALUES ('delete', OLD.rowid, {old});
+                INSERT INTO {index} (rowid, {names}) VALUES (NEW.rowid, {new});
+            END;
+            """
+        )
+        # Index what is already in the table.
+        cursor.execute(f"INSERT INTO {index} ({index}) VALUES ('rebuild');")
+
+    @staticmethod
+    def match_query(text: str) -> str | None:
+        """Return a full-text query for titles with the words in ``text``.
+
+        Every word matches words in the title that start with it, so
+        "exp" finds "The Expanse". Punctuation is ignored.
+
+        :return: The query, or None if ``text`` has no words.
+        """
+        words = re.findall(r"\w+", text)
+        if not words:
+            return None
+        return " ".join(f'"{word}"*' for word in words)
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def find_series(text: str, limit: int = SEARCH_LIMIT) -> list[tuple[str, str]]:
+        """Return the TV shows with titles matching the words in ``text``.
+
+        :return: The ID and title of every match, best matches first.
+        """
+        query = Sql.match_query(text)
+        if query is None:
+            return []
+        cursor = Sql.connection().cursor()
+        return [
+            (id, title)
+            for id, title in cursor.execute(
+                f"""
+                SELECT {SERIES_TABLE}.id, {SERIES_TABLE}.title
+                FROM {SERIES_TITLES_INDEX}
+                JOIN {SERIES_TABLE}
+                    ON {SERIES_TABLE}.rowid = {SERIES_TITLES_INDEX}.rowid
+                WHERE {SERIES_TITLES_INDEX} MATCH ?
+                ORDER BY {SERIES_TITLES_INDEX}.rank
+                LIMIT ?;
+                """,
+                (query, limit),
+            )
+        ]
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def search_results(text: str, limit: int = SEARCH_LIMIT) -> list[SearchResult]:
+        """Return the TV shows found on TMDB before that match ``text``.
+
+        Titles and original titles are both matched, like TMDB does.
+
+        :return: The matching results of earlier searches, best first.
+        """
+        query = Sql.match_query(text)
+        if query is None:
+            return []
+        cursor = Sql.connection().cursor()
+        return [
+            SearchResult(id, title, original_title, first_air_date)
+            for id, title, original_title, first_air_date in cursor.execute(
+                f"""
+                SELECT
+                    {SEARCH_TABLE}.id,
+                    {SEARCH_TABLE}.title,
+                    {SEARCH_TABLE}.original_title,
+                    {SEARCH_TABLE}.first_air_date
+                FROM {SEARCH_TITLES_INDEX}
+                JOIN {SEARCH_TABLE}
+                    ON {SEARCH_TABLE}.rowid = {SEARCH_TITLES_INDEX}.rowid
+                WHERE {SEARCH_TITLES_INDEX} MATCH ?
+                ORDER BY {SEARCH_TITLES_INDEX}.rank
+                LIMIT ?;
+                """,
+                (query, limit),
+            )
+        ]
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def write_search_results(results: Iterable[SearchResult]) -> None:
+        """Keep TV shows found on TMDB for answering later searches."""
+        with Sql.transaction() as cursor:
+            # An upsert rather than INSERT OR REPLACE, since the rows
+            # deleted by REPLACE don't fire the triggers of the index.
+            cursor.executemany(
+                f"""
+                INSERT INTO {SEARCH_TABLE} (
+                    id,
+                    title,
+                    original_title,
+                    first_air_date,
+                    found_at
+                )
+                VALUES(?, ?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    original_title = excluded.original_title,
+                    first_air_date = excluded.first_air_date,
+                    found_at = excluded.found_at;
+                """,
+                (
+                    (
+                        result.id,
+                        result.title,
+                        result.original_title,
+                        result.first_air_date,
+                        Utils.sql_today(),
+                    )
+                    for result in results
+                ),
+            )
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def read_meta(key: str) -> str | None:
+        """Return the value stored under ``key`` in the meta table.
+
+        :return: The value, or None if it or the meta table is missing.
+        """
+        try:
+            row = (
+                Sql.connection()
+                .execute(f"SELECT value FROM {META_TABLE} WHERE key = ?;", (key,))
+                .fetchone()
             )
-            shutil.copyfile(DATABASE_PATH, backup_path)
+        except apsw.SQLError:
+            # The meta table doesn't exist before the database is migrated
+            return None
+        return None if row is None else str(row[0])
 
-        dir_content = os.listdir(DATA_DIRECTORY)
-        dir_content.remove(DATABASE_FILE)
-        dir_content.sort(reverse=True)
-        files_to_remove = set(dir_content).difference(set(dir_content[0:N_BACKUPS]))
-        for file in files_to_remove:
-            if "database" in file:
-                os.remove(DATA_DIRECTORY / file)
+    @staticmethod
+    @Profiler.traced("sql")
+    def write_meta(key: str, value: str) -> None:
+        """Store ``value`` under ``key`` in the meta table."""
+        with Sql.transaction() as cursor:
+            cursor.execute(
+                f"INSERT OR REPLACE INTO {META_TABLE} (key, value) VALUES(?, ?);",
+                (key, value),
+            )
 
     @staticmethod
+    def data_version() -> int | None:
+        """Return the number of changes made to the user's data.
+
+        :return: The version, or None for a database that hasn't been
+            migrated to keep track of it yet.
+        """
+        version = Sql.read_meta(DATA_VERSION_KEY)
+        return None if version is None else int(version)
+
+    @staticmethod
+    @Profiler.traced("sql")
     def remove_series(id: str) -> None:
         """Remove the show with the specified ID from the database.
 
@@ -147,20 +814,17 @@ class Sql:
         it will no longer be checked for new seasons or have any traces
         saved by seasonwatch.
         """
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
-
-        cursor.execute("BEGIN TRANSACTION")
-        cursor.execute(
-            f"""
-            DELETE FROM {SERIES_TABLE}
-            WHERE id = {id};
-            """
-        )
-        cursor.execute("COMMIT TRANSACTION")
-        connection.close()
+        with Sql.transaction() as cursor:
+            cursor.execute(
+                f"""
+                DELETE FROM {SERIES_TABLE}
+                WHERE id = ?;
+                """,
+                (id,),
+            )
 
     @staticmethod
+    @Profiler.traced("sql")
     def update_series(
         id: str,
         title: str,
@@ -170,6 +834,7 @@ class Sql:
         last_notify: str,
         id_source: Source,
         full_replace: bool = False,
+        next_check: str = NEVER,
     ) -> None:
         """Add or update a record in the series table.
 
@@ -177,6 +842,12 @@ class Sql:
         doesn't exist. All columns have to be provided. If
         "full_replace" is True, any series with the title ``title`` will
         be deleted, essentially readding the record with the new values.
+        An existing series is updated in place rather than deleted and
+        inserted again, so that the triggers keeping the title index up
+        to date fire.
+
+        The results of checks are written with ``SeriesUpdates``
+        instead.
 
         :param id: The ID of the series.
         :param title: The user-provided name of the series.
@@ -192,73 +863,381 @@ class Sql:
         :param id_source: Where the ID is applicable, eg TMDB.
         :param full_replace: Delete any record with matching ``title``
             value before adding the new data.
+        :param next_check: First date when the series is due for being
+            checked for new seasons again. Due right away by default.
+        :raises SeasonwatchException: If another series has the title.
         """
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
+        update = SeriesUpdate(
+            id=id,
+            title=title,
+            last_season=last,
+            checks=checks + 1,
+            last_change=last_change,
+            last_notify=last_notify,
+            id_source=id_source,
+            next_check=next_check,
+        )
+        with Sql.transaction() as cursor:
+            if full_replace:
+                cursor.execute(
+                    f"""
+                    DELETE FROM {SERIES_TABLE}
+                    WHERE title = ?;
+                    """,
+                    (title,),
+                )
+            try:
+                Sql._write_series(cursor, [update])
+            except apsw.ConstraintError:
+                raise SeasonwatchException(
+                    f"Another TV show is already called '{title}'"
+                )
 
-        source = id_source.value
+    @staticmethod
+    @Profiler.traced("sql")
+    def update_many_series(updates: Iterable[SeriesUpdate]) -> None:
+        """Store what checks found about several series at once.
 
-        checks = checks + 1
+        All records are written in a single transaction. Unlike
+        ``update_series``, the number of checks is stored as given. Only
+        the status of a series and the bookkeeping of checks are
+        written, never what the user has entered. A series that has been
+        removed, or whose last watched season has changed since it was
+        read for the check, is left as it is, since what was found is
+        about a season the user is no longer waiting for.
 
-        cursor.execute("BEGIN TRANSACTION")
-        if full_replace:
-            cursor.execute(
+        :param updates: The new records of the series, with the last
+            watched season as read for the check.
+        """
+        with Sql.transaction() as cursor:
+            cursor.executemany(
                 f"""
-                DELETE FROM {SERIES_TABLE}
-                WHERE title = '{title}';
-                """
+                UPDATE {SERIES_TABLE} SET
+                    number_of_checks = ?,
+                    last_notified_date = ?,
+                    last_change_date = ?,
+                    next_check_at = ?,
+                    status = ?,
+                    next_air_date = ?,
+                    season_found = ?,
+                    notified = ?
+                WHERE id = ? AND last_watched_season = ?;
+                """,
+                (
+                    (
+                        update.checks,
+                        update.last_notify,
+                        update.last_change,
+                        update.next_check,
+                        update.status,
+                        update.next_air_date,
+                        update.season_found,
+                        update.notified,
+                        update.id,
+                        update.last_season,
+                    )
+                    for update in updates
+                ),
             )
-        cursor.execute(
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def mark_notified(marks: Iterable[NotifiedMark]) -> None:
+        """Store that the user has been notified about series and movies.
+
+        Like with ``update_many_series``, a series whose last watched
+        season has changed since the check is left as it is.
+
+        :param marks: What the user has been notified about, and when.
+        """
+        marks = list(marks)
+        with Sql.transaction() as cursor:
+            cursor.executemany(
+                f"""
+                UPDATE {SERIES_TABLE}
+                SET notified = ?, last_notified_date = ?
+                WHERE id = ? AND last_watched_season = ?;
+                """,
+                (
+                    (mark.notified, mark.date, mark.id, mark.last_season)
+                    for mark in marks
+                    if mark.last_season is not None
+                ),
+            )
+            cursor.executemany(
+                f"""
+                UPDATE {MOVIES_TABLE}
+                SET notified = ?, last_notified_date = ?
+                WHERE id = ?;
+                """,
+                (
+                    (mark.notified, mark.date, mark.id)
+                    for mark in marks
+                    if mark.last_season is None
+                ),
+            )
+
+    @staticmethod
+    def _write_series(cursor: apsw.Cursor, updates: Iterable[SeriesUpdate]) -> None:
+        """Write series records using ``cursor``.
+
+        A record with the same ID is updated in place. Not INSERT OR
+        REPLACE, since the rows deleted by REPLACE don't fire the
+        triggers of the title index.
+        """
+        cursor.executemany(
             f"""
-            INSERT OR REPLACE INTO {SERIES_TABLE} (
+            INSERT INTO {SERIES_TABLE} (
                 id,
                 title,
                 last_watched_season,
                 number_of_checks,
                 last_notified_date,
                 last_change_date,
-                id_source
+                id_source,
+                next_check_at,
+                status,
+                next_air_date,
+                season_found,
+                notified
             )
-            VALUES(
-                {id},
-                '{title}',
-                {last},
-                {checks},
-                '{last_notify}',
-                '{last_change}',
-                '{source}'
-            );
-            """
+            VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                title = excluded.title,
+                last_watched_season = excluded.last_watched_season,
+                number_of_checks = excluded.number_of_checks,
+                last_notified_date = excluded.last_notified_date,
+                last_change_date = excluded.last_change_date,
+                id_source = excluded.id_source,
+                next_check_at = excluded.next_check_at,
+                status = excluded.status,
+                next_air_date = excluded.next_air_date,
+                season_found = excluded.season_found,
+                notified = excluded.notified;
+            """,
+            (
+                (
+                    update.id,
+                    update.title,
+                    update.last_season,
+                    update.checks,
+                    update.last_notify,
+                    update.last_change,
+                    update.id_source.value,
+                    update.next_check,
+                    update.status,
+                    update.next_air_date,
+                    update.season_found,
+                    update.notified,
+                )
+                for update in updates
+            ),
         )
-        cursor.execute("COMMIT TRANSACTION")
-        connection.close()
 
     @staticmethod
+    def import_series(cursor: apsw.Cursor, entry: WatchlistEntry) -> None:
+        """Add a series, or update what the user has entered about it.
+
+        The number of checks and dates of an existing series are kept.
+        If its last watched season changed, it is reset like when it is
+        stepped up: it is due for a check right away, without a status,
+        and the user hasn't been notified about the new next season.
+        Meant to be called for many series within one
+        ``Sql.transaction``, one at a time, so that a series with a
+        title that is already taken only fails itself.
+
+        :param cursor: Cursor of the ongoing transaction.
+        :param entry: The series to add or update.
+        :raises SeasonwatchException: If another series has the same
+            title. The transaction can still be committed.
+        """
+        try:
+            cursor.execute(
+                f"""
+                INSERT INTO {SERIES_TABLE} (
+                    id,
+                    title,
+                    last_watched_season,
+                    id_source
+                )
+                VALUES(?, ?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET
+                    title = excluded.title,
+                    last_watched_season = excluded.last_watched_season,
+                    id_source = excluded.id_source,
+                    last_change_date = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN last_change_date
+                        ELSE ?
+                    END,
+                    next_check_at = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN next_check_at
+                        ELSE '{NEVER}'
+                    END,
+                    status = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN status
+                    END,
+                    next_air_date = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN next_air_date
+                    END,
+                    season_found = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN season_found
+                    END,
+                    notified = CASE
+                        WHEN last_watched_season IS excluded.last_watched_season
+                        THEN notified
+                    END;
+                """,
+                (
+                    entry.id,
+                    entry.title,
+                    entry.last_season,
+                    entry.id_source.value,
+                    Utils.sql_today(),
+                ),
+            )
+        except apsw.ConstraintError:
+            raise SeasonwatchException(
+                f"The title '{entry.title}' is already used by another TV show"
+            )
+
+    @staticmethod
+    def iter_watchlist() -> Iterator[WatchlistEntry]:
+        """Yield what the user has entered about every series.
+
+        Rows are read from the database as they are consumed, so the
+        watchlist never has to fit in memory.
+        """
+        cursor = Sql.connection().cursor()
+        for id, title, last, id_source in cursor.execute(
+            f"""
+            SELECT
+                id,
+                title,
+                last_watched_season,
+                id_source
+            FROM
+                {SERIES_TABLE}
+            ORDER BY
+                title;
+            """
+        ):
+            yield WatchlistEntry(
+                id=id,
+                title=title,
+                last_season=last,
+                id_source=Source.IMDB
+                if id_source == Source.IMDB.value
+                else Source.TMDB,
+            )
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def read_id_mappings() -> dict[str, IdMapping]:
+        """Return what has been found out about IMDb IDs, by IMDb ID."""
+        cursor = Sql.connection().cursor()
+        return {
+            imdb_id: IdMapping(imdb_id, MigrationStatus(status), tmdb_id, tmdb_title)
+            for imdb_id, status, tmdb_id, tmdb_title in cursor.execute(
+                f"""
+                SELECT imdb_id, status, tmdb_id, tmdb_title
+                FROM {MIGRATIONS_TABLE};
+                """
+            )
+        }
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def write_id_mappings(mappings: Iterable[IdMapping]) -> None:
+        """Store what has been found out about IMDb IDs."""
+        with Sql.transaction() as cursor:
+            cursor.executemany(
+                f"""
+                INSERT OR REPLACE INTO {MIGRATIONS_TABLE} (
+                    imdb_id,
+                    status,
+                    tmdb_id,
+                    tmdb_title,
+                    looked_up_at
+                )
+                VALUES(?, ?, ?, ?, ?);
+                """,
+                (
+                    (
+                        mapping.imdb_id,
+                        mapping.status.value,
+                        mapping.tmdb_id,
+                        mapping.tmdb_title,
+                        Utils.sql_today(),
+                    )
+                    for mapping in mappings
+                ),
+            )
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def migrate_series(imdb_id: str, tmdb_id: str) -> None:
+        """Move a series from its IMDb ID to its TMDB ID.
+
+        Everything else stored about the series is kept, and it is due
+        for a check right away.
+
+        :raises SeasonwatchException: If another series already has the
+            TMDB ID.
+        """
+        with Sql.transaction() as cursor:
+            try:
+                cursor.execute(
+                    f"""
+                    UPDATE {SERIES_TABLE}
+                    SET id = ?,
+                        id_source = ?,
+                        next_check_at = ?,
+                        status = NULL,
+                        next_air_date = NULL,
+                        season_found = NULL
+                    WHERE id = ? AND id_source = ?;
+                    """,
+                    (tmdb_id, Source.TMDB.value, NEVER, imdb_id, Source.IMDB.value),
+                )
+            except apsw.ConstraintError:
+                raise SeasonwatchException(
+                    f"Another TV show already has the TMDB ID {tmdb_id}"
+                )
+
+    @staticmethod
+    @Profiler.traced("sql")
     def step_up_series(id: str) -> None:
         """Increase last_watched_season value by one for show with id.
 
         Step up the last watched season number for the show with the
         specified id in the database.
         """
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
-
-        cursor.execute("BEGIN TRANSACTION")
-        transaction = f"""
-            UPDATE {SERIES_TABLE}
-            SET last_watched_season = last_watched_season + 1,
-                last_change_date = '{Utils.sql_today()}'
-            WHERE id = {id};
-            """
-        cursor.execute(transaction)
-        cursor.execute("COMMIT TRANSACTION")
-        connection.close()
+        with Sql.transaction() as cursor:
+            cursor.execute(
+                f"""
+                UPDATE {SERIES_TABLE}
+                SET last_watched_season = last_watched_season + 1,
+                    last_change_date = ?,
+                    next_check_at = ?,
+                    status = NULL,
+                    next_air_date = NULL,
+                    season_found = NULL,
+                    notified = NULL
+                WHERE id = ?;
+                """,
+                (Utils.sql_today(), NEVER, id),
+            )
 
     @staticmethod
+    @Profiler.traced("sql")
     def read_series(id: str) -> dict[str, str]:
         """Return data from the database for the season with id `id`"""
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
+        cursor = Sql.connection().cursor()
         values: dict[str, str] = {}
         for _, title, last, check, notified, change, id_source in cursor.execute(
             f"""
@@ -273,8 +1252,9 @@ class Sql:
             FROM
                 {SERIES_TABLE}
             WHERE
-                id = {id};
-            """
+                id = ?;
+            """,
+            (id,),
         ):
             # Safe to assume only one show with a specific ID
             values = {
@@ -286,70 +1266,292 @@ class Sql:
                 "last_changed": change,
                 "id_source": id_source,
             }
-        connection.close()
         return values
 
     @staticmethod
-    def read_all_series() -> list[DBRecord]:
+    @Profiler.traced("sql")
+    def read_all_series(due_by: str | None = None) -> list[DBRecord]:
         """Return data from the database for every TV show registered.
 
         Read all data about TV shows in the database, including data
-        about id, last watched season, number of checks, etc.
+        about id, last watched season, number of checks, etc. Use
+        ``iter_series`` to go through a long watchlist without reading
+        all of it at once.
+
+        :param due_by: Only return TV shows due for a check at this
+            date, if given.
         """
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
-        # Should be TypedDict instead of allowing any value to be Source
-        values: list[DBRecord] = []
-        for id, title, last, check, notified, change, id_source in cursor.execute(
-            f"""
-            SELECT
-                id,
-                title,
-                last_watched_season,
-                number_of_checks,
-                last_notified_date,
-                last_change_date,
-                id_source
-            FROM
-                {SERIES_TABLE}
+        return list(Sql.iter_series(due_by))
+
+    @staticmethod
+    def iter_series(due_by: str | None = None) -> Iterator[DBRecord]:
+        """Yield data from the database for every TV show registered.
+
+        The TV shows are read a page at a time as they are consumed, so
+        memory use doesn't grow with the watchlist. No statement is left
+        open between pages, so the series table can be written to while
+        going through it.
+
+        :param due_by: Only yield TV shows due for a check at this date,
+            if given.
+        """
+        for (
+            id,
+            title,
+            last,
+            check,
+            notified_date,
+            change,
+            id_source,
+            next_check,
+            status,
+            next_air_date,
+            season_found,
+            notified,
+        ) in Sql._iter_pages(
             """
+            id,
+            title,
+            last_watched_season,
+            number_of_checks,
+            last_notified_date,
+            last_change_date,
+            id_source,
+            next_check_at,
+            status,
+            next_air_date,
+            season_found,
+            notified
+            """,
+            "? IS NULL OR next_check_at <= ?",
+            (due_by, due_by),
         ):
-            # Safe to assume only one show with a specific ID
-            values.append(
-                {
-                    "id": id,
-                    "title": title,
-                    "last_season": last,
-                    "last_check": check,
-                    "last_notified": notified,
-                    "last_changed": change,
-                    "id_source": (
-                        Source.IMDB if id_source == Source.IMDB.value else Source.TMDB
-                    ),
-                }
+            yield DBRecord(
+                id=id,
+                title=title,
+                last_season=int(last),
+                checks=int(check or 0),
+                last_notified=notified_date,
+                last_changed=change,
+                id_source=(
+                    Source.IMDB if id_source == Source.IMDB.value else Source.TMDB
+                ),
+                next_check=next_check,
+                status=status,
+                next_air_date=next_air_date,
+                season_found=None if season_found is None else bool(season_found),
+                notified=notified,
             )
-        connection.close()
-        return values
 
     @staticmethod
-    def get_printable_series_table() -> Any:
+    def iter_statuses() -> Iterator[tuple[str, int, str | None, bool]]:
+        """Yield what the last check found about every TV show.
+
+        TV shows that haven't been checked are left out. The rows are
+        read a page at a time, like in ``iter_series``.
+
+        :return: Title, last watched season, air date of the next season
+            if known, and whether TMDB knew about the next season, for
+            every TV show in the order they are checked.
+        """
+        for title, last, next_air_date, season_found in Sql._iter_pages(
+            "title, last_watched_season, next_air_date, season_found",
+            "status IS NOT NULL",
+        ):
+            yield title, int(last), next_air_date, bool(season_found)
+
+    @staticmethod
+    def _iter_pages(
+        columns: str,
+        condition: str,
+        params: tuple[Any, ...] = (),
+        table: str = SERIES_TABLE,
+    ) -> Iterator[tuple[Any, ...]]:
+        """Yield rows of ``table`` in pages of ``READ_PAGE_SIZE``.
+
+        Each page starts after the rowid where the previous one ended,
+        so every page is as quick to find as the first.
+
+        :param columns: Columns to select.
+        :param condition: Condition the rows have to fulfill.
+        :param params: Values for the placeholders in ``condition``.
+        :param table: Table to read, the series table by default.
+        """
+        cursor = Sql.connection().cursor()
+        # Smallest possible rowid, so the first page starts at the top.
+        last_rowid = -(2**63)
+        while True:
+            with Profiler.span("read page", "sql"):
+                rows = cursor.execute(
+                    f"""
+                    SELECT rowid, {columns}
+                    FROM {table}
+                    WHERE rowid > ? AND ({condition})
+                    ORDER BY rowid
+                    LIMIT ?;
+                    """,
+                    (last_rowid, *params, READ_PAGE_SIZE),
+                ).fetchall()
+            for row in rows:
+                yield row[1:]
+            if len(rows) < READ_PAGE_SIZE:
+                return
+            last_rowid = rows[-1][0]
+
+    @staticmethod
+    def iter_movies(due_by: str | None = None) -> Iterator[MovieRecord]:
+        """Yield every movie in the database, a page at a time.
+
+        :param due_by: Only yield movies due for a check at this date,
+            if given.
+        """
+        for row in Sql._iter_pages(
+            """
+            id,
+            title,
+            number_of_checks,
+            last_notified_date,
+            last_change_date,
+            next_check_at,
+            status,
+            release,
+            release_date,
+            notified
+            """,
+            "? IS NULL OR next_check_at <= ?",
+            (due_by, due_by),
+            table=MOVIES_TABLE,
+        ):
+            id, title, checks, *rest = row
+            yield MovieRecord(id, title, int(checks or 0), *rest)
+
+    @staticmethod
+    def iter_movie_statuses() -> Iterator[tuple[str, str | None, str | None]]:
+        """Yield what the last check found about every movie.
+
+        Movies that haven't been checked are left out.
+
+        :return: Title, the release the status is about and its date if
+            known, for every movie in the order they are checked.
+        """
+        for title, release, release_date in Sql._iter_pages(
+            "title, release, release_date",
+            "status IS NOT NULL",
+            table=MOVIES_TABLE,
+        ):
+            yield title, release, release_date
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def add_movie(id: str, title: str) -> None:
+        """Add a movie to check for, or rename it if already added.
+
+        :raises SeasonwatchException: If another movie has the title.
+        """
+        with Sql.transaction() as cursor:
+            try:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {MOVIES_TABLE} (id, title)
+                    VALUES(?, ?)
+                    ON CONFLICT(id) DO UPDATE SET title = excluded.title;
+                    """,
+                    (id, title),
+                )
+            except apsw.ConstraintError:
+                raise SeasonwatchException(f"Another movie is already called '{title}'")
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def remove_movie(id: str) -> None:
+        """Remove the movie with the specified ID from the database."""
+        with Sql.transaction() as cursor:
+            cursor.execute(f"DELETE FROM {MOVIES_TABLE} WHERE id = ?;", (id,))
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def update_many_movies(records: Iterable[MovieRecord]) -> None:
+        """Write what checks found about movies, in one transaction.
+
+        :param records: The complete new records of the movies.
+        """
+        with Sql.transaction() as cursor:
+            cursor.executemany(
+                f"""
+                UPDATE {MOVIES_TABLE}
+                SET title = ?,
+                    number_of_checks = ?,
+                    last_notified_date = ?,
+                    last_change_date = ?,
+                    next_check_at = ?,
+                    status = ?,
+                    release = ?,
+                    release_date = ?,
+                    notified = ?
+                WHERE id = ?;
+                """,
+                ((*record[1:], record.id) for record in records),
+            )
+
+    @staticmethod
+    def current_status(
+        status: str | None,
+        next_air_date: str | None,
+        soon_window: timedelta = SOON_WINDOW,
+    ) -> str:
+        """Return the status of a series as of today.
+
+        The status stored by a check goes stale as the air date comes
+        closer, so it is worked out again from the stored air date.
+
+        :param status: Status stored by the last check, if any.
+        :param next_air_date: Air date of the next season, if known.
+        :param soon_window: How far ahead a season counts as soon.
+        :return: One of "new", "soon", "later" or "nothing", or an empty
+            string for a series that hasn't been checked.
+        """
+        if status is None:
+            return ""
+        if next_air_date is None:
+            return status
+        return Scheduler.categorize(
+            Utils.sql_date_to_python_date(next_air_date).date(),
+            date.today(),
+            soon_window,
+        )
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def get_printable_series_table(soon_window: timedelta = SOON_WINDOW) -> Any:
         """Get a table with data about all saved TV shows.
 
         This function returns a PrettyTable object with the most
-        user-relevant data selected from the database. No styling is
-        performed on the table, except for naming the columns.
+        user-relevant data selected from the database, including what
+        the last check found. No styling is performed on the table,
+        except for naming the columns.
+
+        :param soon_window: How far ahead a season counts as soon.
 
-        :raises SeasonwatchException: If there is an issues with reading
-            the data from the database.
         :return: The table with information about all saved series.
         """
-        connection = apsw.Connection(DATABASE_PATH)
-        cursor = connection.cursor()
-        cursor.execute(
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = [
+            "Title",
+            "Last watched season",
+            "Status",
+            "Next air date",
+            "Hyperlink",
+        ]
+        cursor = Sql.connection().cursor()
+        for title, last, status, next_air_date, hyperlink in cursor.execute(
             f"""
             SELECT
                 title,
                 last_watched_season,
+                status,
+                next_air_date,
                 CASE
                     WHEN id_source = '{Source.IMDB.value}'
                     THEN 'https://www.imdb.com/title/tt' || id
@@ -358,15 +1560,81 @@ class Sql:
             FROM
                 {SERIES_TABLE};
             """
-        )
-        table = from_db_cursor(cursor)
-        if table is None:
-            raise SeasonwatchException("Couldn't create table from database cursor")
+        ):
+            table.add_row(
+                [
+                    title,
+                    last,
+                    Sql.current_status(status, next_air_date, soon_window),
+                    "" if next_air_date is None else next_air_date[:10],
+                    hyperlink,
+                ]
+            )
+        return table
 
-        table.field_names = [
-            "Title",
-            "Last watched season",
-            "Hyperlink",
-        ]
-        connection.close()
+    @staticmethod
+    @Profiler.traced("sql")
+    def get_printable_movies_table(soon_window: timedelta = SOON_WINDOW) -> Any:
+        """Get a table with data about all saved movies.
+
+        Like ``get_printable_series_table``, the status is what the last
+        check found, worked out again for today.
+
+        :param soon_window: How far ahead a release counts as soon.
+
+        :return: The table with information about all saved movies.
+        """
+        from prettytable import PrettyTable
+
+        table = PrettyTable()
+        table.field_names = ["Title", "Status", "Release", "Release date", "Hyperlink"]
+        for movie in Sql.iter_movies():
+            table.add_row(
+                [
+                    movie.title,
+                    Sql.current_status(movie.status, movie.release_date, soon_window),
+                    movie.release or "",
+                    "" if movie.release_date is None else movie.release_date[:10],
+                    f"https://www.themoviedb.org/movie/{movie.id}",
+                ]
+            )
+        return table
+
+    @staticmethod
+    @Profiler.traced("sql")
+    def get_printable_upcoming_table(days: int) -> Any:
+        """Get a table with the TV shows with a season airing soon.
+
+        Only what previous checks have found is used, so nothing is
+        looked up on TMDB.
+
+        :param days: Include seasons airing from today up to this many
+            days from now.
+        :return: The table with the upcoming seasons, by air date.
+        """
+        from prettytable import PrettyTable
+
+        today = date.today()
+        table = PrettyTable()
+        table.field_names = ["Title", "Season", "Air date"]
+        cursor = Sql.connection().cursor()
+        for title, season, next_air_date in cursor.execute(
+            f"""
+            SELECT
+                title,
+                last_watched_season + 1,
+                next_air_date
+            FROM
+                {SERIES_TABLE}
+            WHERE
+                next_air_date BETWEEN ? AND ?
+            ORDER BY
+                next_air_date, title;
+            """,
+            (
+                Utils.python_date_to_sql_date(today),
+                Utils.python_date_to_sql_date(today + timedelta(days=days)),
+            ),
+        ):
+            table.add_row([title, season, next_air_date[:10]])
         return table
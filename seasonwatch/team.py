@@ -0,0 +1,229 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+import apsw
+
+from seasonwatch.backup import Backup, BackupSettings
+from seasonwatch.cache import ResponseCache
+from seasonwatch.client import TmdbClient
+from seasonwatch.constants import Constants, Lookup
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.lock import LOCK_FILE, RunLock
+from seasonwatch.media_watcher import MediaWatcher
+from seasonwatch.notifier import Dispatch, Notifier
+from seasonwatch.profiling import Profiler
+from seasonwatch.report import Report
+from seasonwatch.scheduler import SOON_WINDOW
+from seasonwatch.sql import DATABASE_FILE, DATABASE_PATH, DBRecord, Sql
+from seasonwatch.utils import Utils
+
+# What is looked up on TMDB: the TMDB ID, and the season number when
+# only single seasons are looked up.
+FetchKey = tuple[str, int | None]
+FetchResult = list[Any] | dict[str, Any] | SeasonwatchException | None
+
+
+class Team:
+    """Check the watchlists of several users in a single run.
+
+    Many users follow the same popular TV shows, so the due TV shows of
+    all databases are read first, and every distinct TV show is looked
+    up on TMDB once. What TMDB returns is then handed to every database
+    following the TV show, each of which is categorized, stored, reported
+    and notified about as in a check of a single database. The number of
+    requests grows with the number of distinct TV shows, not with the
+    number of users.
+
+    A database is only written to while holding its run lock, so never
+    at the same time as a check of the user's own, and after backing it
+    up. The notifications are shown to whoever runs the team check, not
+    to the users, so what the users were notified about is left for
+    their own checks.
+    """
+
+    def __init__(
+        self,
+        databases: list[Path],
+        client: TmdbClient,
+        concurrency: int = Constants.DEFAULT_CONCURRENCY,
+        cache: ResponseCache | None = None,
+        lookup: Lookup = Lookup.SHOW,
+        soon_window: timedelta = SOON_WINDOW,
+        backup: BackupSettings = BackupSettings(),
+    ) -> None:
+        """Prepare checking ``databases``.
+
+        :param databases: Database files of the users.
+        :param client: Client for making requests to TMDB.
+        :param concurrency: Maximum number of simultaneous lookups.
+        :param cache: Cache for the responses from TMDB, if any.
+        :param lookup: Whether to get the details of whole series, or
+            only of their next seasons.
+        :param soon_window: How far ahead a season counts as soon.
+        :param backup: How the databases are backed up before they are
+            written to.
+        """
+        self.databases = databases
+        self.client = client
+        self.concurrency = concurrency
+        self.cache = cache
+        self.lookup = lookup
+        self.soon_window = soon_window
+        self.backup = backup
+
+    @staticmethod
+    def find_databases(paths: Iterable[Path]) -> list[Path]:
+        """Return the database files at ``paths``.
+
+        :param paths: Database files, or directories that are searched
+            for Seasonwatch databases, including in subdirectories.
+        :raises SeasonwatchException: If a path doesn't exist, or a
+            directory has no database.
+        :return: Every database once, in the order given.
+        """
+        databases: dict[Path, None] = {}
+        for path in paths:
+            if path.is_dir():
+                found = sorted(path.rglob(DATABASE_FILE))
+                if not found:
+                    raise SeasonwatchException(
+                        f"No '{DATABASE_FILE}' found in directory '{path}'"
+                    )
+                databases.update(dict.fromkeys(p.resolve() for p in found))
+            elif path.is_file():
+                databases[path.resolve()] = None
+            else:
+                raise SeasonwatchException(f"No database found at '{path}'")
+        return list(databases)
+
+    def key(self, series: DBRecord) -> FetchKey:
+        """Return what has to be looked up on TMDB for ``series``."""
+        if self.lookup == Lookup.SEASON:
+            return series.id, series.last_season
+        # The details of the whole series serve any last watched season.
+        return series.id, None
+
+    def fetch(self, key: FetchKey) -> FetchResult:
+        """Look up ``key`` on TMDB.
+
+        :return: The seasons of the series, or its next season, or why
+            it couldn't be looked up.
+        """
+        id, last_season = key
+        try:
+            if last_season is None:
+                return Utils.get_seasons(id, self.client, self.cache)
+            return Utils.get_next_season(
+                id, last_season, self.client, self.cache, Lookup.SEASON
+            )
+        except SeasonwatchException as e:
+            return e
+
+    def next_season(
+        self, series: DBRecord, results: dict[FetchKey, FetchResult]
+    ) -> dict[str, Any] | SeasonwatchException | None:
+        """Pick the next season of ``series`` from what TMDB returned."""
+        result = results[self.key(series)]
+        if isinstance(result, list):
+            return Utils.find_season(result, series.last_season + 1)
+        return result
+
+    @contextmanager
+    def writing(self, database: Path) -> Iterator[None]:
+        """Take the run lock of ``database`` and back it up, to write to it.
+
+        ``database`` must be in use already.
+
+        :raises SeasonwatchException: If a check of ``database`` is
+            running.
+        """
+        lock = RunLock(database.parent / LOCK_FILE)
+        if not lock.acquire(wait=False):
+            raise SeasonwatchException("a check of it is running")
+        try:
+            with Profiler.span("backup", database=str(database)):
+                Backup.backup_database(self.backup.compress, self.backup.policy)
+            yield
+        finally:
+            lock.release()
+
+    @Profiler.traced("seasonwatch")
+    def run(self, force: bool = False) -> int:
+        """Check every database once, and print and notify the results.
+
+        A database that can't be read or written, or that is being
+        checked already, is skipped, while the rest are still checked.
+
+        :param force: Check all series, whether they are due or not.
+        :return: Exit code, 0 if all databases and series were checked.
+        """
+        exit_code = 0
+        due: dict[Path, tuple[MediaWatcher, list[DBRecord]]] = {}
+        notifications: list[Dispatch | None] = []
+        try:
+            for database in self.databases:
+                watcher = MediaWatcher(self.soon_window)
+                try:
+                    Sql.use_database(str(database))
+                    if not Sql.schema_current():
+                        with self.writing(database):
+                            Sql.ensure_table()
+                    due[database] = watcher, list(watcher.due_series(force))
+                except (apsw.Error, OSError, SeasonwatchException) as e:
+                    logging.error(f"Couldn't read '{database}': {e}")
+                    watcher.report.close()
+                    exit_code = 1
+
+            keys = list(
+                dict.fromkeys(
+                    self.key(series)
+                    for _, to_check in due.values()
+                    for series in to_check
+                )
+            )
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                results = dict(zip(keys, executor.map(self.fetch, keys)))
+
+            for database, (watcher, to_check) in due.items():
+                try:
+                    Sql.use_database(str(database))
+                    with self.writing(database):
+                        watcher.record(
+                            (s, self.next_season(s, results)) for s in to_check
+                        )
+                except (apsw.Error, OSError, SeasonwatchException) as e:
+                    logging.error(f"Couldn't store the results in '{database}': {e}")
+                    exit_code = 1
+                    continue
+
+                print(f"{database}:")
+                with Profiler.span("report", database=str(database)):
+                    Report.show(watcher.report)
+                notifications.append(Notifier.dispatch(watcher.news, str(database)))
+                if watcher.unmigrated:
+                    print(
+                        f"{watcher.unmigrated} TV shows still have IMDb IDs and were "
+                        "not checked."
+                    )
+                if watcher.report.count("failed"):
+                    exit_code = 1
+        finally:
+            Sql.use_database(DATABASE_PATH)
+            for watcher, _ in due.values():
+                watcher.report.close()
+            if self.cache is not None:
+                with Profiler.span("evict"):
+                    self.cache.evict()
+
+        checked = sum(len(to_check) for _, to_check in due.values())
+        print(
+            f"Checked {checked} TV shows in {len(due)} databases with "
+            f"{len(keys)} lookups on TMDB."
+        )
+        for notification in notifications:
+            Notifier.wait(notification)
+        return exit_code
@@ -0,0 +1,199 @@
+import csv
+import json
+from pathlib import Path
+from typing import Any, Final, Iterator, NamedTuple
+
+from seasonwatch.constants import Source
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.sql import Sql, WatchlistEntry
+
+CSV_SUFFIXES: Final[set[str]] = {".csv"}
+JSON_LINES_SUFFIXES: Final[set[str]] = {".jsonl", ".ndjson", ".json"}
+
+FIELDS: Final[list[str]] = ["id", "title", "last_season", "id_source"]
+REQUIRED_FIELDS: Final[list[str]] = ["id", "title", "last_season"]
+
+
+class RowError(NamedTuple):
+    """A row of an imported file that couldn't be imported."""
+
+    line: int
+    message: str
+
+
+class ImportResult(NamedTuple):
+    imported: int
+    errors: list[RowError]
+
+
+class Transfer:
+    """Import and export the watchlist as CSV or JSON Lines.
+
+    Both directions stream the rows, so the size of the watchlist is
+    only limited by the disk. The format is decided by the suffix of the
+    file: '.csv' for CSV, and '.jsonl', '.ndjson' or '.json' for JSON
+    Lines with one object per line. Both use the fields 'id', 'title',
+    'last_season' and, optionally, 'id_source'.
+    """
+
+    @staticmethod
+    def is_csv(path: Path) -> bool:
+        """Return whether ``path`` is a CSV file, by its suffix.
+
+        :raises SeasonwatchException: If the suffix is neither for CSV
+            nor for JSON Lines.
+        """
+        suffix = path.suffix.lower()
+        if suffix in CSV_SUFFIXES:
+            return True
+        if suffix in JSON_LINES_SUFFIXES:
+            return False
+        raise SeasonwatchException(
+            f"Can't tell the format of '{path}', use a file ending with '.csv' or "
+            "'.jsonl'"
+        )
+
+    @staticmethod
+    def import_watchlist(path: Path) -> ImportResult:
+        """Add or update every TV show in the file at ``path``.
+
+        All valid rows are written in a single transaction, as they are
+        read. Invalid rows are skipped and reported in the result.
+
+        :param path: CSV or JSON Lines file to import.
+        :raises SeasonwatchException: If the file can't be read, or is
+            not CSV or JSON Lines.
+        :return: The number of imported TV shows and the skipped rows.
+        """
+        rows = Transfer._read_csv if Transfer.is_csv(path) else Transfer._read_jsonl
+        imported = 0
+        errors: list[RowError] = []
+        # Line of the first row with each ID, to point out duplicates.
+        seen: dict[str, int] = {}
+        try:
+            with open(path, newline="", encoding="utf-8") as fp:
+                with Sql.transaction() as cursor:
+                    for line, fields in rows(fp):
+                        try:
+                            if fields is None:
+                                raise SeasonwatchException("Not a JSON object")
+                            entry = Transfer.parse_entry(fields)
+                            if entry.id in seen:
+                                raise SeasonwatchException(
+                                    f"ID {entry.id} is already on line {seen[entry.id]}"
+                                )
+                            Sql.import_series(cursor, entry)
+                        except SeasonwatchException as e:
+                            errors.append(RowError(line, str(e)))
+                            continue
+                        seen[entry.id] = line
+                        imported += 1
+        except (OSError, UnicodeDecodeError, csv.Error) as e:
+            raise SeasonwatchException(f"Couldn't read '{path}': {e}")
+        return ImportResult(imported, errors)
+
+    @staticmethod
+    def export_watchlist(path: Path) -> int:
+        """Write every TV show in the database to the file at ``path``.
+
+        :param path: CSV or JSON Lines file to write, replacing it if it
+            exists.
+        :raises SeasonwatchException: If the file can't be written, or
+            is not CSV or JSON Lines.
+        :return: The number of exported TV shows.
+        """
+        is_csv = Transfer.is_csv(path)
+        exported = 0
+        try:
+            with open(path, mode="w", newline="", encoding="utf-8") as fp:
+                if is_csv:
+                    writer = csv.writer(fp)
+                    writer.writerow(FIELDS)
+                for entry in Sql.iter_watchlist():
+                    row = (
+                        entry.id,
+                        entry.title,
+                        entry.last_season,
+                        entry.id_source.value,
+                    )
+                    if is_csv:
+                        writer.writerow(row)
+                    else:
+                        fp.write(json.dumps(dict(zip(FIELDS, row))) + "\n")
+                    exported += 1
+        except OSError as e:
+            raise SeasonwatchException(f"Couldn't write '{path}': {e}")
+        return exported
+
+    @staticmethod
+    def parse_entry(fields: dict[str, Any]) -> WatchlistEntry:
+        """Validate the fields of a row and turn them into an entry.
+
+        :raises SeasonwatchException: If a field is missing or invalid.
+        """
+        missing = [f for f in REQUIRED_FIELDS if fields.get(f) in (None, "")]
+        if missing:
+            raise SeasonwatchException(f"Missing {', '.join(missing)}")
+
+        source_name = str(fields.get("id_source") or Source.TMDB.value).strip()
+        sources = {source.value.lower(): source for source in Source}
+        if source_name.lower() not in sources:
+            raise SeasonwatchException(
+                f"Unknown ID source '{source_name}', expected TMDB or IMDb"
+            )
+        id_source = sources[source_name.lower()]
+
+        id = str(fields["id"]).strip()
+        if id_source == Source.IMDB:
+            # IMDb IDs are stored without their 'tt' prefix.
+            id = id.removeprefix("tt")
+        if not (id.isascii() and id.isdigit()):
+            raise SeasonwatchException(f"ID '{fields['id']}' is not a number")
+
+        title = str(fields["title"]).strip()
+        if not title:
+            raise SeasonwatchException("Missing title")
+
+        last_season = fields["last_season"]
+        if isinstance(last_season, bool) or not isinstance(last_season, (int, str)):
+            raise SeasonwatchException(f"Last season '{last_season}' is not a number")
+        try:
+            last_season_int = int(last_season)
+        except ValueError:
+            raise SeasonwatchException(f"Last season '{last_season}' is not a number")
+        if last_season_int < 0:
+            raise SeasonwatchException(f"Last season {last_season} is negative")
+
+        return WatchlistEntry(id, title, last_season_int, id_source)
+
+    @staticmethod
+    def _read_csv(fp: Any) -> Iterator[tuple[int, dict[str, Any] | None]]:
+        """Yield the line number and fields of every row of a CSV file.
+
+        :raises SeasonwatchException: If a required column is missing.
+        """
+        reader = csv.DictReader(fp)
+        columns = reader.fieldnames or []
+        missing = [f for f in REQUIRED_FIELDS if f not in columns]
+        if missing:
+            raise SeasonwatchException(
+                f"The CSV file has no column named {', '.join(missing)}"
+            )
+        for fields in reader:
+            yield reader.line_num, fields
+
+    @staticmethod
+    def _read_jsonl(fp: Any) -> Iterator[tuple[int, dict[str, Any] | None]]:
+        """Yield the line number and fields of every line of JSON Lines.
+
+        Lines that aren't JSON objects are yielded with None as fields,
+        so that they are reported as invalid rows.
+        """
+        for line, text in enumerate(fp, start=1):
+            if not text.strip():
+                continue
+            try:
+                fields = json.loads(text)
+            except ValueError:
+                fields = None
+            yield line, fields if isinstance(fields, dict) else None
@@ -0,0 +1,219 @@
+import json
+import socket
+from abc import ABC, abstractmethod
+from configparser import ConfigParser
+from typing import Any, Final, Mapping, NamedTuple
+
+from seasonwatch.exceptions import ConfigException, HttpException, TransportException
+
+# Seconds to wait for a connection, and then for each read from it.
+CONNECT_TIMEOUT: Final[float] = 5.0
+READ_TIMEOUT: Final[float] = 30.0
+# Seconds an idle connection is kept open for reuse, and is probed for
+# being alive when the other end is silent.
+KEEPALIVE: Final[float] = 60.0
+
+
+class HttpResponse(NamedTuple):
+    """A response from TMDB, whichever transport it came through."""
+
+    url: str
+    status_code: int
+    # Case-insensitive, as returned by the transport.
+    headers: Mapping[str, str]
+    content: bytes
+
+    def json(self) -> Any:
+        """Decode the body as JSON.
+
+        :raises ValueError: If the body is not valid JSON.
+        """
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        """Raise if TMDB responded with an error.
+
+        :raises HttpException: If the status is 400 or higher.
+        """
+        if self.status_code >= 400:
+            raise HttpException(
+                f"TMDB responded with {self.status_code} for {self.url}",
+                self.status_code,
+            )
+
+
+class TransportSettings(NamedTuple):
+    """How connections to TMDB are made and kept."""
+
+    # Connections kept open at the same time, typically one per thread.
+    pool_size: int
+    connect_timeout: float = CONNECT_TIMEOUT
+    read_timeout: float = READ_TIMEOUT
+    keepalive: float = KEEPALIVE
+    http2: bool = False
+
+    @staticmethod
+    def from_config(config: ConfigParser, pool_size: int) -> "TransportSettings":
+        """Read the settings from the [Network] section of ``config``.
+
+        :raises ConfigException: If a setting is not a valid value.
+        """
+        try:
+            return TransportSettings(
+                pool_size=pool_size,
+                connect_timeout=config.getfloat(
+                    "Network", "connect_timeout", fallback=CONNECT_TIMEOUT
+                ),
+                read_timeout=config.getfloat(
+                    "Network", "read_timeout", fallback=READ_TIMEOUT
+                ),
+                keepalive=config.getfloat("Network", "keepalive", fallback=KEEPALIVE),
+                http2=config.getboolean("Network", "http2", fallback=False),
+            )
+        except ValueError as e:
+            raise ConfigException(f"Invalid setting in [Network]: {e}")
+
+
+class Transport(ABC):
+    """Makes HTTP requests to TMDB.
+
+    A transport keeps a pool of connections that are reused between
+    requests, and never waits longer than its timeouts for a server. It
+    can be shared by several threads. Use ``Transport.create`` to get
+    the transport matching some settings.
+    """
+
+    def __init__(self, settings: TransportSettings) -> None:
+        self.settings = settings
+        # Sent with every request, e.g. for authentication.
+        self.headers: dict[str, str] = {}
+
+    @staticmethod
+    def create(settings: TransportSettings) -> "Transport":
+        """Return a transport with ``settings``.
+
+        :raises ConfigException: If HTTP/2 is asked for, but httpx with
+            HTTP/2 support is not installed.
+        """
+        if settings.http2:
+            return HttpxTransport(settings)
+        return RequestsTransport(settings)
+
+    @abstractmethod
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        """Make a GET request.
+
+        :param url: URL to get.
+        :param headers: Headers for this request, besides ``headers``.
+        :raises TransportException: If the request couldn't be made or
+            timed out.
+        :return: The response, whatever its status.
+        """
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close all connections."""
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 transport using requests.
+
+    Every thread can keep its own connection alive instead of waiting
+    for a free one, and idle connections are probed with TCP keep-alive
+    so that a silently dropped one fails instead of hanging.
+    """
+
+    def __init__(self, settings: TransportSettings) -> None:
+        from requests import Session
+        from requests.adapters import HTTPAdapter
+        from urllib3.connection import HTTPConnection
+
+        super().__init__(settings)
+        keepalive = max(1, int(settings.keepalive))
+        socket_options = [
+            *HTTPConnection.default_socket_options,
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+        ]
+        for option, value in [
+            ("TCP_KEEPIDLE", keepalive),
+            ("TCP_KEEPINTVL", max(1, keepalive // 4)),
+            ("TCP_KEEPCNT", 4),
+        ]:
+            # Not every platform has all of them.
+            if hasattr(socket, option):
+                socket_options.append(
+                    (socket.IPPROTO_TCP, getattr(socket, option), value)
+                )
+
+        self._session = Session()
+        for scheme in ["https://", "http://"]:
+            # Retries are made by TmdbClient, which knows when to.
+            adapter = HTTPAdapter(max_retries=0)
+            adapter.init_poolmanager(
+                1, settings.pool_size, socket_options=socket_options
+            )
+            self._session.mount(scheme, adapter)
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        from requests import RequestException
+
+        try:
+            response = self._session.get(
+                url,
+                headers={**self.headers, **(headers or {})},
+                timeout=(self.settings.connect_timeout, self.settings.read_timeout),
+            )
+        except RequestException as e:
+            raise TransportException(f"There was an error fetching {url}: {e}")
+        return HttpResponse(
+            url, response.status_code, response.headers, response.content
+        )
+
+    def close(self) -> None:
+        self._session.close()
+
+
+class HttpxTransport(Transport):
+    """HTTP/2 transport using httpx.
+
+    All requests share a single connection to TMDB, over which they are
+    multiplexed, instead of one connection per thread.
+    """
+
+    def __init__(self, settings: TransportSettings) -> None:
+        try:
+            import httpx
+
+            super().__init__(settings)
+            self._client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(
+                    max_connections=settings.pool_size,
+                    max_keepalive_connections=settings.pool_size,
+                    keepalive_expiry=settings.keepalive,
+                ),
+                timeout=httpx.Timeout(
+                    settings.read_timeout, connect=settings.connect_timeout
+                ),
+            )
+        except ImportError:
+            raise ConfigException(
+                "HTTP/2 needs httpx with HTTP/2 support, install it with "
+                "'pip install httpx[http2]'"
+            )
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        import httpx
+
+        try:
+            response = self._client.get(
+                url, headers={**self.headers, **(headers or {})}
+            )
+        except httpx.HTTPError as e:
+            raise TransportException(f"There was an error fetching {url}: {e}")
+        return HttpResponse(
+            url, response.status_code, response.headers, response.content
+        )
+
+    def close(self) -> None:
+        self._client.close()
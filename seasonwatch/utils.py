@@ -1,11 +1,19 @@
-import sys
+import json
+import re
 from datetime import date, datetime
-from typing import Any
+from typing import TYPE_CHECKING, Any, Final
 
-from requests import HTTPError, RequestException, Session
+from seasonwatch.constants import Constants, Lookup
+from seasonwatch.exceptions import HttpException, SeasonwatchException
+from seasonwatch.profiling import Profiler
 
-from seasonwatch.constants import Constants
-from seasonwatch.exceptions import SeasonwatchException
+if TYPE_CHECKING:
+    from seasonwatch.cache import ResponseCache
+    from seasonwatch.client import TmdbClient
+
+# Start of the list of seasons in the details of a TV show.
+SEASONS_ARRAY: Final[re.Pattern[str]] = re.compile(r'"seasons"\s*:\s*\[')
+_decoder: Final[json.JSONDecoder] = json.JSONDecoder()
 
 
 class Utils:
@@ -31,30 +39,255 @@ class Utils:
         return python_date
 
     @staticmethod
+    def python_date_to_sql_date(python_date: date) -> str:
+        """Format a date the way dates are stored in SQLite."""
+        # Much faster than strftime, which adds up for long watchlists.
+        return f"{python_date.isoformat()[:10]} 00:00:00"
+
+    @staticmethod
+    @Profiler.traced("tmdb")
     def get_next_season(
-        id: str, current_season: int, session: Session
+        id: str,
+        current_season: int,
+        client: "TmdbClient",
+        cache: "ResponseCache | None" = None,
+        lookup: Lookup = Lookup.SHOW,
+        revalidate: bool = False,
     ) -> dict[str, Any] | None:
-        """Find the air date of the next season of a series."""
-        url = f"{Constants.API_BASE_URL}/tv/{id}"
+        """Find the air date of the next season of a series.
+
+        If ``cache`` is given, the response from TMDB is reused or
+        revalidated from there instead of always being downloaded.
+
+        :param id: TMDB ID of the series.
+        :param current_season: Last season watched by the user.
+        :param client: Client for making requests to TMDB.
+        :param cache: Cache for the responses from TMDB, if any.
+        :param lookup: Whether to get the details of the whole series,
+            or only of the next season.
+        :param revalidate: Revalidate a cached response even if it is
+            fresh, since the series has changed on TMDB.
+        :raises TmdbException: If TMDB can't be reached.
+        :raises SeasonwatchException: If TMDB responds with an error or
+            malformed data.
+        :return: The next season as described by TMDB, with at least
+            'air_date', or None if TMDB doesn't know of it.
+        """
+        next_season_number = current_season + 1
+        if lookup == Lookup.SHOW:
+            return Utils.find_season(
+                Utils.get_seasons(id, client, cache, revalidate), next_season_number
+            )
+
+        url = f"{Constants.API_BASE_URL}/tv/{id}/season/{next_season_number}"
         try:
-            response = session.get(url)
-            response.raise_for_status()
-            response_json = response.json()
-        except HTTPError as e:
+            body = Utils._fetch(
+                url, "GET /tv/{id}/season/{number}", id, client, cache, revalidate
+            )
+            with Profiler.span("decode JSON", "json", size=len(body)):
+                next_season = json.loads(body)
+        except HttpException as e:
+            if e.status_code == 404:
+                # TMDB doesn't know of the season yet
+                return None
             raise SeasonwatchException(
                 f"Failed connecting to TMDB for new seasons information: {e}"
             )
-        except RequestException as e:
-            print(f"There was an error fetching {url}: {e}")
-            sys.exit(1)
-
-        seasons = response_json["seasons"]
-        next_seasons = [s for s in seasons if s["season_number"] == current_season + 1]
-        if not next_seasons:
-            return None
+        except ValueError as e:
+            raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
 
-        next_season = next_seasons[0]
-        if not isinstance(next_season, dict):
+        if next_season is not None and not isinstance(next_season, dict):
             raise SeasonwatchException(f"Can't pase data from TMDB: {next_season}")
 
         return next_season
+
+    @staticmethod
+    @Profiler.traced("tmdb")
+    def get_seasons(
+        id: str,
+        client: "TmdbClient",
+        cache: "ResponseCache | None" = None,
+        revalidate: bool = False,
+    ) -> list[Any]:
+        """Get all seasons of a series from its details on TMDB.
+
+        :param id: TMDB ID of the series.
+        :param client: Client for making requests to TMDB.
+        :param cache: Cache for the responses from TMDB, if any.
+        :param revalidate: Revalidate a cached response even if it is
+            fresh.
+        :raises TmdbException: If TMDB can't be reached.
+        :raises SeasonwatchException: If TMDB responds with an error or
+            malformed data.
+        :return: The seasons as described by TMDB.
+        """
+        url = f"{Constants.API_BASE_URL}/tv/{id}"
+        try:
+            body = Utils._fetch(url, "GET /tv/{id}", id, client, cache, revalidate)
+            with Profiler.span("decode JSON", "json", size=len(body)):
+                return Utils.extract_seasons(body)
+        except HttpException as e:
+            raise SeasonwatchException(
+                f"Failed connecting to TMDB for new seasons information: {e}"
+            )
+        except ValueError as e:
+            raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
+
+    @staticmethod
+    @Profiler.traced("tmdb")
+    def get_release_dates(
+        id: str,
+        client: "TmdbClient",
+        cache: "ResponseCache | None" = None,
+    ) -> list[Any]:
+        """Get the release dates of a movie in every country from TMDB.
+
+        :param id: TMDB ID of the movie.
+        :param client: Client for making requests to TMDB.
+        :param cache: Cache for the responses from TMDB, if any.
+        :raises TmdbException: If TMDB can't be reached.
+        :raises SeasonwatchException: If TMDB responds with an error or
+            malformed data.
+        :return: The releases per country as described by TMDB.
+        """
+        url = f"{Constants.API_BASE_URL}/movie/{id}/release_dates"
+        try:
+            body = Utils._fetch(url, "GET /movie/{id}/release_dates", id, client, cache)
+            with Profiler.span("decode JSON", "json", size=len(body)):
+                response_json = json.loads(body)
+        except HttpException as e:
+            raise SeasonwatchException(
+                f"Failed connecting to TMDB for release dates: {e}"
+            )
+        except ValueError as e:
+            raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
+
+        results = (
+            response_json.get("results") if isinstance(response_json, dict) else None
+        )
+        if not isinstance(results, list):
+            raise SeasonwatchException("No release dates found in the data from TMDB")
+        return results
+
+    @staticmethod
+    def find_season(seasons: list[Any], number: int) -> dict[str, Any] | None:
+        """Return the season with ``number`` among ``seasons``, if any."""
+        return next(
+            (
+                s
+                for s in seasons
+                if isinstance(s, dict) and s.get("season_number") == number
+            ),
+            None,
+        )
+
+    @staticmethod
+    def _fetch(
+        url: str,
+        span: str,
+        id: str,
+        client: "TmdbClient",
+        cache: "ResponseCache | None",
+        revalidate: bool = False,
+    ) -> bytes:
+        """Return the body of the response for ``url``, using ``cache``.
+
+        :param revalidate: Revalidate a cached response even if fresh.
+        :raises HttpException: If TMDB responds with an error.
+        """
+        if cache is not None:
+            with Profiler.span(span, "http", id=id, cached=True):
+                return cache.fetch(client, url, revalidate)
+        with Profiler.span(span, "http", id=id):
+            response = client.get(url)
+            response.raise_for_status()
+            return response.content
+
+    @staticmethod
+    def extract_seasons(body: bytes) -> list[Any]:
+        """Decode only the list of seasons from the details of a series.
+
+        The details of a TV show on TMDB are mostly cast, networks,
+        production companies and the like. Instead of building objects
+        for all of that, the 'seasons' array is located in the text and
+        only it is decoded. No other key in the details is named
+        'seasons', but the whole document is still decoded if the array
+        can't be found that way.
+
+        :param body: Body of a response from /tv/{id}.
+        :raises ValueError: If the body is not valid JSON.
+        :raises SeasonwatchException: If there is no list of seasons.
+        :return: The seasons as described by TMDB.
+        """
+        text = body.decode()
+        match = SEASONS_ARRAY.search(text)
+        if match is not None:
+            try:
+                seasons, _ = _decoder.raw_decode(text, match.end() - 1)
+            except ValueError:
+                pass
+            else:
+                if isinstance(seasons, list):
+                    return seasons
+
+        response_json = json.loads(text)
+        seasons = (
+            response_json.get("seasons") if isinstance(response_json, dict) else None
+        )
+        if not isinstance(seasons, list):
+            raise SeasonwatchException("No seasons found in the data from TMDB")
+        return seasons
+
+    @staticmethod
+    def get_changed_series(start: date, end: date, client: "TmdbClient") -> set[str]:
+        """Find the IDs of all TV shows changed on TMDB in a period.
+
+        TMDB reports changes for periods of at most
+        ``Constants.CHANGES_MAX_DAYS`` days, and both ``start`` and
+        ``end`` are included.
+
+        :param start: First day of the period.
+        :param end: Last day of the period.
+        :param client: Client for making requests to TMDB.
+        :raises TmdbException: If TMDB can't be reached.
+        :raises SeasonwatchException: If TMDB responds with an error or
+            malformed data.
+        :return: The TMDB IDs of the changed TV shows.
+        """
+        changed: set[str] = set()
+        page = 1
+        total_pages = 1
+        while page <= total_pages:
+            url = (
+                f"{Constants.API_BASE_URL}/tv/changes"
+                f"?start_date={start.isoformat()}&end_date={end.isoformat()}"
+                f"&page={page}"
+            )
+            try:
+                with Profiler.span("GET /tv/changes", "http", page=page):
+                    response = client.get(url)
+                    response.raise_for_status()
+                response_json = response.json()
+            except HttpException as e:
+                raise SeasonwatchException(
+                    f"Failed connecting to TMDB for changed TV shows: {e}"
+                )
+            except ValueError as e:
+                raise SeasonwatchException(f"Malformed data returned from TMDB: {e}")
+
+            if (
+                not isinstance(response_json, dict)
+                or not isinstance(response_json.get("results"), list)
+                or not isinstance(response_json.get("total_pages", 1), int)
+                or not all(
+                    isinstance(result, dict) and result.get("id") is not None
+                    for result in response_json["results"]
+                )
+            ):
+                raise SeasonwatchException(
+                    "Malformed data returned from TMDB when looking for changes."
+                )
+            changed.update(str(result["id"]) for result in response_json["results"])
+            total_pages = response_json.get("total_pages", 1)
+            page += 1
+        return changed
@@ -0,0 +1,16 @@
+from pathlib import Path
+from typing import Iterator
+
+import pytest
+
+from seasonwatch.sql import Sql
+
+
+@pytest.fixture
+def database(tmp_path: Path) -> Iterator[Path]:
+    """Use a new, empty Seasonwatch database for the test."""
+    path = tmp_path / "database.sqlite"
+    Sql.use_database(str(path))
+    Sql.ensure_table()
+    yield path
+    Sql.close()
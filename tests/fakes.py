@@ -0,0 +1,23 @@
+import json
+from typing import Any, cast
+
+from seasonwatch.client import TmdbClient
+from seasonwatch.transport import HttpResponse
+
+
+class FakeTmdb:
+    """Stand-in for ``TmdbClient``, answering from canned JSON bodies."""
+
+    def __init__(self, bodies: dict[str, Any]) -> None:
+        self.bodies = bodies
+        # URLs requested so far, in order.
+        self.requested: list[str] = []
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        self.requested.append(url)
+        if url not in self.bodies:
+            return HttpResponse(url, 404, {}, b"{}")
+        return HttpResponse(url, 200, {}, json.dumps(self.bodies[url]).encode())
+
+    def client(self) -> TmdbClient:
+        return cast(TmdbClient, self)
@@ -0,0 +1,22 @@
+from configparser import ConfigParser
+
+import pytest
+
+from seasonwatch.backup import BackupSettings, RetentionPolicy
+from seasonwatch.exceptions import ConfigException
+
+
+def config(text: str) -> ConfigParser:
+    parser = ConfigParser()
+    parser.read_string(text)
+    return parser
+
+
+def test_backup_settings_are_read_from_config() -> None:
+    assert BackupSettings.from_config(config("")) == BackupSettings()
+    assert BackupSettings.from_config(
+        config("[Backup]\ncompress = yes\nhourly = 0\nweekly = 8\n")
+    ) == BackupSettings(True, RetentionPolicy(hourly=0, daily=7, weekly=8))
+    for setting in ["compress = maybe", "hourly = many", "daily = -1"]:
+        with pytest.raises(ConfigException):
+            BackupSettings.from_config(config(f"[Backup]\n{setting}\n"))
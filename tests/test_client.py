@@ -0,0 +1,155 @@
+import random
+from typing import Iterable
+
+import pytest
+
+from seasonwatch import client as client_module
+from seasonwatch.client import (
+    MAX_RETRY_AFTER,
+    CircuitBreaker,
+    RateLimiter,
+    TmdbClient,
+)
+from seasonwatch.exceptions import TmdbException, TransportException
+from seasonwatch.transport import HttpResponse, Transport, TransportSettings
+
+URL = "https://api.themoviedb.org/3/tv/1"
+
+
+class FakeClock:
+    """Stand-in for the ``time`` module, only moving when slept."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        # Seconds slept so far, in order.
+        self.slept: list[float] = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class FakeTransport(Transport):
+    """Transport answering with a list of responses, or raising errors."""
+
+    def __init__(self, responses: Iterable[HttpResponse | Exception]) -> None:
+        super().__init__(TransportSettings(pool_size=1))
+        self.responses = list(responses)
+        self.requests = 0
+
+    def get(self, url: str, headers: dict[str, str] | None = None) -> HttpResponse:
+        self.requests += 1
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+def response(status_code: int, retry_after: str | None = None) -> HttpResponse:
+    headers = {} if retry_after is None else {"Retry-After": retry_after}
+    return HttpResponse(URL, status_code, headers, b"{}")
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> FakeClock:
+    """Make the client wait on a fake clock, with the longest backoff."""
+    fake = FakeClock()
+    monkeypatch.setattr(client_module, "time", fake)
+    monkeypatch.setattr(random, "uniform", lambda low, high: high)
+    return fake
+
+
+def test_rate_limiter_waits_for_tokens(clock: FakeClock) -> None:
+    limiter = RateLimiter(rate=10, burst=2)
+    for _ in range(3):
+        limiter.acquire()
+    assert clock.slept == [pytest.approx(0.1)]
+
+    limiter.pause(5)
+    limiter.acquire()
+    assert sum(clock.slept) == pytest.approx(5.1)
+
+
+def test_retries_with_exponential_backoff(clock: FakeClock) -> None:
+    transport = FakeTransport(
+        [response(503), TransportException("timed out"), response(200)]
+    )
+    client = TmdbClient(transport, rate=None)
+    assert client.get(URL).status_code == 200
+    assert clock.slept == [0.5, 1.0]
+
+    transport = FakeTransport([response(502)] * 3)
+    client = TmdbClient(transport, rate=None, max_retries=2)
+    with pytest.raises(TmdbException):
+        client.get(URL)
+    assert transport.requests == 3
+
+
+def test_waits_as_long_as_retry_after(clock: FakeClock) -> None:
+    transport = FakeTransport([response(429, "3"), response(404)])
+    client = TmdbClient(transport, rate=None)
+    assert client.get(URL).status_code == 404
+    assert clock.slept == [3.0]
+
+    transport = FakeTransport([response(429, str(MAX_RETRY_AFTER + 1))])
+    client = TmdbClient(transport, rate=None)
+    with pytest.raises(TmdbException):
+        client.get(URL)
+    assert transport.requests == 1
+    assert clock.slept == [3.0]
+
+
+def test_circuit_breaker_opens_and_closes(clock: FakeClock) -> None:
+    breaker = CircuitBreaker(threshold=2, cooldown=10)
+    breaker.failed()
+    assert breaker.allow()
+    breaker.failed()
+    assert not breaker.allow()
+
+    clock.now += 10
+    # A single trial request is let through, and opens it again if it
+    # fails.
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.failed()
+    assert not breaker.allow()
+
+    clock.now += 10
+    assert breaker.allow()
+    breaker.succeeded()
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize(
+    "answer",
+    [
+        response(503, str(MAX_RETRY_AFTER + 1)),
+        RuntimeError("unexpected"),
+    ],
+)
+def test_trial_request_always_settles_the_breaker(
+    clock: FakeClock, answer: HttpResponse | Exception
+) -> None:
+    transport = FakeTransport([answer, response(200)])
+    client = TmdbClient(transport, rate=None, max_retries=0)
+    client.breaker = CircuitBreaker(threshold=1, cooldown=10)
+    client.breaker.failed()
+    clock.now += 10
+
+    with pytest.raises((TmdbException, RuntimeError)):
+        client.get(URL)
+    with pytest.raises(TmdbException):
+        client.get(URL)
+
+    clock.now += 10
+    assert client.get(URL).status_code == 200
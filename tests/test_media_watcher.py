@@ -0,0 +1,149 @@
+import json
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+from fakes import FakeTmdb
+
+from seasonwatch.cache import ResponseCache
+from seasonwatch.constants import Constants, Source
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.media_watcher import MediaWatcher
+from seasonwatch.notifier import Notifier
+from seasonwatch.sql import NEVER, SeriesUpdate, Sql
+from seasonwatch.transport import HttpResponse
+from seasonwatch.utils import Utils
+
+TODAY = date.today()
+
+
+def add_series(
+    id: str,
+    next_check: date | None,
+    status: str | None = None,
+    next_air_date: date | None = None,
+) -> None:
+    """Add a series with season 1 watched, as its last check left it."""
+    Sql.update_series(id, f"Show {id}", 1, 0, NEVER, NEVER, Source.TMDB)
+    if next_check is None:
+        return
+    Sql.update_many_series(
+        [
+            SeriesUpdate(
+                id=id,
+                title=f"Show {id}",
+                last_season=1,
+                checks=1,
+                last_change=NEVER,
+                last_notify=NEVER,
+                id_source=Source.TMDB,
+                next_check=Utils.python_date_to_sql_date(next_check),
+                status=status,
+                next_air_date=(
+                    None
+                    if next_air_date is None
+                    else Utils.python_date_to_sql_date(next_air_date)
+                ),
+                season_found=next_air_date is not None,
+            )
+        ]
+    )
+
+
+def details(season_2_air_date: date) -> dict[str, object]:
+    return {
+        "seasons": [
+            {"season_number": 1, "air_date": "2020-01-01"},
+            {"season_number": 2, "air_date": season_2_air_date.isoformat()},
+        ]
+    }
+
+
+def test_delta_check_looks_up_changed_and_new_series(
+    database: Path, tmp_path: Path
+) -> None:
+    later = TODAY + timedelta(days=30)
+    # Changed on TMDB, but not due.
+    add_series("1", later, "later", TODAY + timedelta(days=200))
+    # Unchanged and due, with the season it waits for out since today.
+    add_series("2", TODAY, "soon", TODAY)
+    # Unchanged and not due.
+    add_series("3", later, "later", TODAY + timedelta(days=200))
+    # Never checked.
+    add_series("4", None)
+    url_1 = f"{Constants.API_BASE_URL}/tv/1"
+    url_4 = f"{Constants.API_BASE_URL}/tv/4"
+    tmdb = FakeTmdb({url_1: details(TODAY), url_4: details(TODAY)})
+    cache = ResponseCache(str(tmp_path / "cache.sqlite"))
+    # Still fresh, but from before the change.
+    cache.store(
+        url_1,
+        HttpResponse(
+            url_1,
+            200,
+            {"Cache-Control": "max-age=86400"},
+            json.dumps(details(TODAY + timedelta(days=200))).encode(),
+        ),
+    )
+
+    watcher = MediaWatcher()
+    watcher.check_for_new_seasons(tmdb.client(), cache=cache, changed_ids={"1"})
+    cache.close()
+
+    assert sorted(tmdb.requested) == [url_1, url_4]
+    assert sorted(watcher.report.messages("new")) == [
+        "Season 2 of Show 1 is out already!",
+        "Season 2 of Show 2 is out already!",
+        "Season 2 of Show 4 is out already!",
+    ]
+    assert watcher.report.count() == 3
+
+
+def test_malformed_changes_are_rejected() -> None:
+    url = (
+        f"{Constants.API_BASE_URL}/tv/changes"
+        f"?start_date={TODAY.isoformat()}&end_date={TODAY.isoformat()}&page=1"
+    )
+    for body in [[], {"page": 1}, {"results": [{"adult": False}]}]:
+        tmdb = FakeTmdb({url: body})
+        with pytest.raises(SeasonwatchException):
+            Utils.get_changed_series(TODAY, TODAY, tmdb.client())
+
+    tmdb = FakeTmdb({url: {"results": [{"id": 1}, {"id": 2}], "total_pages": 1}})
+    assert Utils.get_changed_series(TODAY, TODAY, tmdb.client()) == {"1", "2"}
+
+
+def notified(id: str) -> tuple[str | None, str]:
+    """Return what the user was notified about for a series, and when."""
+    series = next(s for s in Sql.read_all_series() if s.id == id)
+    return series.notified, series.last_notified
+
+
+def test_notified_is_only_stored_once_shown(
+    database: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    add_series("1", None)
+    url = f"{Constants.API_BASE_URL}/tv/1"
+    tmdb = FakeTmdb({url: details(TODAY)})
+
+    def fail(title: str, message: str, timeout: int | None = None) -> None:
+        raise RuntimeError("No D-Bus session")
+
+    monkeypatch.setattr(Notifier, "notify", fail)
+    watcher = MediaWatcher()
+    watcher.check_for_new_seasons(tmdb.client())
+    assert not Notifier.wait(Notifier.dispatch(watcher.news))
+    assert notified("1") == (None, NEVER)
+
+    # Not shown, so it is news again on the next check.
+    monkeypatch.setattr(Notifier, "notify", lambda *args, **kwargs: None)
+    watcher = MediaWatcher()
+    watcher.check_for_new_seasons(tmdb.client(), force=True)
+    assert watcher.news.counts["new"] == 1
+    assert Notifier.wait(Notifier.dispatch(watcher.news))
+    Sql.mark_notified(watcher.news.marks)
+    assert notified("1") == ("new:2", Utils.python_date_to_sql_date(TODAY))
+
+    watcher = MediaWatcher()
+    watcher.check_for_new_seasons(tmdb.client(), force=True)
+    assert watcher.news.counts["new"] == 0
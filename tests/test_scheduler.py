@@ -0,0 +1,91 @@
+from configparser import ConfigParser
+from datetime import date, timedelta
+from pathlib import Path
+
+import pytest
+
+from seasonwatch.constants import Release, Source
+from seasonwatch.exceptions import ConfigException
+from seasonwatch.report import Report
+from seasonwatch.scheduler import SOON_WINDOW, Scheduler
+from seasonwatch.sql import NEVER, SeriesUpdate, Sql
+from seasonwatch.utils import Utils
+
+TODAY = date(2026, 1, 1)
+MONTH = timedelta(days=30)
+
+
+def config(text: str) -> ConfigParser:
+    parser = ConfigParser()
+    parser.read_string(text)
+    return parser
+
+
+def test_soon_window_is_read_from_config() -> None:
+    assert Scheduler.soon_window_from_config(config("")) == SOON_WINDOW
+    assert Scheduler.soon_window_from_config(
+        config("[Schedule]\nsoon_days = 30\n")
+    ) == timedelta(days=30)
+    for value in ["soon", "0", "-5"]:
+        with pytest.raises(ConfigException):
+            Scheduler.soon_window_from_config(
+                config(f"[Schedule]\nsoon_days = {value}\n")
+            )
+
+
+def test_custom_soon_window_categorizes_and_schedules() -> None:
+    in_two_months = TODAY + 2 * MONTH
+
+    assert Scheduler.categorize(in_two_months, TODAY) == "soon"
+    assert Scheduler.categorize(in_two_months, TODAY, MONTH) == "later"
+    assert Scheduler.categorize_many([in_two_months], TODAY, MONTH) == ["later"]
+    # Checked again around when the season starts counting as soon.
+    assert Scheduler.next_check(
+        "later", in_two_months, TODAY, soon_window=MONTH
+    ) == TODAY + timedelta(days=30)
+    assert Scheduler.next_check(
+        "later", TODAY + 100 * timedelta(days=1), TODAY
+    ) == TODAY + timedelta(days=10)
+
+
+def test_custom_soon_window_is_described() -> None:
+    assert Report.describe("Dark", 2, "later", None, True) == (
+        "Season 2 of Dark coming up, in more than three months"
+    )
+    assert Report.describe("Dark", 2, "later", None, True, MONTH) == (
+        "Season 2 of Dark coming up, in more than one month"
+    )
+    assert (
+        Report.describe_movie(
+            "Dune", "later", Release.THEATRICAL, None, timedelta(days=14)
+        )
+        == "Dune coming out in theaters, in more than two weeks"
+    )
+    assert Report.describe_window(timedelta(days=45)) == "45 days"
+
+
+def test_report_from_database_uses_soon_window(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, NEVER, NEVER, Source.TMDB)
+    Sql.update_many_series(
+        [
+            SeriesUpdate(
+                id="1",
+                title="Dark",
+                last_season=1,
+                checks=1,
+                last_change=NEVER,
+                last_notify=NEVER,
+                id_source=Source.TMDB,
+                status="soon",
+                next_air_date=Utils.python_date_to_sql_date(TODAY + 2 * MONTH),
+                season_found=True,
+            )
+        ]
+    )
+
+    lines = Report.from_database(TODAY, MONTH)
+
+    assert list(lines.messages("later")) == [
+        "Season 2 of Dark coming up, in more than one month"
+    ]
+    assert lines.count() == 1
@@ -0,0 +1,162 @@
+from pathlib import Path
+
+import apsw
+import pytest
+
+from seasonwatch.constants import Source
+from seasonwatch.exceptions import SeasonwatchException
+from seasonwatch.sql import NEVER, SeriesUpdate, Sql, WatchlistEntry
+
+EPOCH = "1970-01-01 00:00:00"
+
+
+def check_title_index() -> None:
+    # With a rank of 1, the index is also checked against the table.
+    Sql.connection().cursor().execute(
+        "INSERT INTO series_titles(series_titles) VALUES('integrity-check')"
+    )
+    Sql.connection().cursor().execute(
+        "INSERT INTO series_titles(series_titles, rank) VALUES('integrity-check', 1)"
+    )
+
+
+def test_readding_series_keeps_title_index_intact(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.update_series("2", "Severance", 0, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.update_series("1", "Dark", 2, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.update_series("1", "Dark (2017)", 2, 0, EPOCH, EPOCH, Source.TMDB)
+
+    check_title_index()
+    assert Sql.find_series("dark") == [("1", "Dark (2017)")]
+    assert Sql.find_series("severance") == [("2", "Severance")]
+
+
+def test_adding_series_with_taken_title_fails(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+
+    with pytest.raises(SeasonwatchException):
+        Sql.update_series("2", "Dark", 0, 0, EPOCH, EPOCH, Source.TMDB)
+
+    check_title_index()
+
+
+def found(series_id: str, last_season: int) -> SeriesUpdate:
+    """What a check that read the series at ``last_season`` found."""
+    return SeriesUpdate(
+        id=series_id,
+        title="Title at the check",
+        last_season=last_season,
+        checks=1,
+        last_change="2026-01-01",
+        last_notify=EPOCH,
+        id_source=Source.TMDB,
+        next_check="2026-01-02",
+        status="later",
+        season_found=True,
+    )
+
+
+def test_check_results_are_stored(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+
+    Sql.update_many_series([found("1", 1)])
+
+    (series,) = Sql.iter_series()
+    assert (series.title, series.last_season) == ("Dark", 1)
+    assert (series.checks, series.status, series.next_check) == (
+        1,
+        "later",
+        "2026-01-02",
+    )
+
+
+def test_check_results_dont_readd_removed_series(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.remove_series("1")
+
+    Sql.update_many_series([found("1", 1)])
+
+    assert list(Sql.iter_series()) == []
+
+
+def test_check_results_dont_overwrite_stepped_up_series(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.step_up_series("1")
+
+    Sql.update_many_series([found("1", 1)])
+
+    (series,) = Sql.iter_series()
+    assert (series.last_season, series.status, series.checks) == (2, None, 1)
+    check_title_index()
+
+
+def test_current_schema_is_checked_without_write_lock(database: Path) -> None:
+    other = apsw.Connection(str(database))
+    other.execute("BEGIN IMMEDIATE TRANSACTION")
+    try:
+        Sql.connection().setbusytimeout(0)
+        Sql.ensure_table()
+        assert Sql.schema_current()
+    finally:
+        other.execute("ROLLBACK TRANSACTION")
+        other.close()
+
+
+def test_old_database_is_migrated(tmp_path: Path) -> None:
+    path = tmp_path / "database.sqlite"
+    old = apsw.Connection(str(path))
+    old.execute(
+        """
+        CREATE TABLE series (
+            id TEXT NOT NULL PRIMARY KEY UNIQUE,
+            title TEXT NOT NULL UNIQUE,
+            last_watched_season INTEGER DEFAULT 0,
+            number_of_checks INGEGER DEFAULT 0,
+            last_notified_date TEXT DEFAULT '1970-01-01 00:00:00',
+            last_change_date TEXT DEFAULT '1970-01-01 00:00:00'
+        );
+        INSERT INTO series (id, title, last_watched_season) VALUES ('tt1', 'Dark', 1);
+        """
+    )
+    old.close()
+    Sql.use_database(str(path))
+    try:
+        assert not Sql.schema_current()
+        Sql.ensure_table()
+        assert Sql.schema_current()
+        (series,) = Sql.iter_series()
+        assert (series.id_source, series.next_check) == (Source.IMDB, NEVER)
+        assert Sql.find_series("dark") == [("tt1", "Dark")]
+        check_title_index()
+    finally:
+        Sql.close()
+
+
+def test_import_resets_series_with_changed_season(database: Path) -> None:
+    Sql.update_series("1", "Dark", 1, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.update_series("2", "Severance", 1, 0, EPOCH, EPOCH, Source.TMDB)
+    Sql.update_many_series(
+        [
+            found("1", 1)._replace(notified="soon:2"),
+            found("2", 1)._replace(notified="soon:2"),
+        ]
+    )
+
+    with Sql.transaction() as cursor:
+        Sql.import_series(cursor, WatchlistEntry("1", "Dark", 2))
+        Sql.import_series(cursor, WatchlistEntry("2", "Severance", 1))
+
+    dark, severance = sorted(Sql.iter_series())
+    assert (dark.last_season, dark.next_check, dark.status, dark.notified) == (
+        2,
+        NEVER,
+        None,
+        None,
+    )
+    assert dark.last_changed != "2026-01-01"
+    assert (severance.next_check, severance.status, severance.notified) == (
+        "2026-01-02",
+        "later",
+        "soon:2",
+    )
+    assert severance.last_changed == "2026-01-01"